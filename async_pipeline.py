@@ -0,0 +1,235 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from frame_buffers import FrameBufferPool
+from frame_pipeline import make_error_frame, multipart_chunk, viewer_profiles
+from stream_encoder import AdaptiveStreamController, FrameRateMeter, SharedFrameEncoder
+
+
+def put_latest(stage_queue, item):
+    """Put an item on a bounded queue, dropping the oldest entry when it is full.
+
+    Returns the dropped entry, or None if nothing had to be dropped.
+    """
+    dropped = None
+    if stage_queue.full():
+        dropped = stage_queue.get_nowait()
+    stage_queue.put_nowait(item)
+    return dropped
+
+
+class AsyncFramePipeline:
+    """Asyncio front end that keeps blocking video work off the event loop.
+
+    The capture, recognition and encoding stages of a FramePipeline each run on
+    their own single-thread executor and are exposed as awaitables. Two
+    asyncio tasks chain capture and recognition through a small bounded queue
+    that drops the oldest frame under load, so capture of the next frame
+    overlaps recognition of the previous one while the event loop only
+    shuffles references between stages. Frames in flight live in a
+    FrameBufferPool sized for every queue slot and stage, and are annotated in
+    place. Viewers encode the published frame with their own adaptive stream
+    profile on the encode executor; a SharedFrameEncoder makes that one encode
+    per frame and profile however many viewers there are.
+    """
+
+    STAGES = ('capture', 'recognize', 'encode')
+    # Stages fed through a drop-oldest queue
+    QUEUED_STAGES = ('recognize',)
+
+    def __init__(self, pipeline, queue_size=2):
+        self.pipeline = pipeline
+        self.queue_size = queue_size
+        self.executors = {stage: ThreadPoolExecutor(max_workers=1, thread_name_prefix=stage)
+                          for stage in self.STAGES}
+        self.dropped_frames = {stage: 0 for stage in self.QUEUED_STAGES}
+        self.encoder = SharedFrameEncoder()
+        # Viewers' stream controllers follow the measured publish rate, not the cap
+        max_fps = 1.0 / pipeline.min_interval if pipeline.min_interval else 30
+        self.publish_rate = FrameRateMeter(max_fps)
+        # Created on the first frame, once the frame size is known
+        self.buffer_pool = None
+
+        self.num_subscribers = 0
+        self.viewers = set()
+        self.frame_id = 0
+        self.latest_frame = None
+        self.latest_gesture = None
+
+        self._condition = None
+        self._has_subscribers = None
+        self._tasks = []
+        self._queues = {}
+
+    async def _run_stage(self, stage, func, *args):
+        """Run a blocking stage function on that stage's executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executors[stage], func, *args)
+
+    def _capture_into_buffer(self):
+        """Capture a frame and move it into a pooled buffer.
+
+        Later stages hold on to the frame while the next one is captured, so it
+        can't stay a view into the camera's ring buffer. Returns (slot, frame,
+        capture_timestamp); slot is None when the frame doesn't fit the pool
+        and was copied instead.
+        """
+        frame, timestamp = self.pipeline.capture()
+        if self.buffer_pool is None:
+            # Every queue entry plus one frame per stage can be in flight
+            capacity = self.queue_size + len(self.STAGES)
+            self.buffer_pool = FrameBufferPool(frame.shape, capacity=capacity, dtype=frame.dtype)
+
+        slot = self.buffer_pool.acquire(timeout=0) if self.buffer_pool.fits(frame) else None
+        if slot is None:
+            return None, frame.copy(), timestamp
+        buffer = self.buffer_pool.buffers[slot]
+        np.copyto(buffer, frame)
+        return slot, buffer, timestamp
+
+    def _release(self, slot):
+        """Return a pooled frame buffer"""
+        if slot is not None:
+            self.buffer_pool.release(slot)
+
+    async def capture(self):
+        """Capture the next frame without blocking the event loop; returns (slot, frame, timestamp)"""
+        return await self._run_stage('capture', self._capture_into_buffer)
+
+    async def recognize(self, frame, timestamp=None):
+        """Run gesture recognition and draw the overlay in place without blocking the event loop"""
+        return await self._run_stage('recognize', self.pipeline.recognize, frame, frame, timestamp)
+
+    async def encode(self, frame_id, frame, profile):
+        """JPEG-encode a published frame for a profile (shared between viewers) without blocking the event loop"""
+        return await self._run_stage('encode', self.encoder.encode, frame_id, frame, profile)
+
+    async def publish(self, frame, gesture):
+        """Make a new annotated frame the latest one and wake up waiting viewers"""
+        async with self._condition:
+            self.frame_id += 1
+            self.latest_frame = frame
+            self.latest_gesture = gesture
+            self.publish_rate.tick(time.perf_counter())
+            self._condition.notify_all()
+
+    def start(self):
+        """Start the stage tasks on the running event loop"""
+        if self._tasks:
+            return
+        self._condition = asyncio.Condition()
+        self._has_subscribers = asyncio.Event()
+        if self.num_subscribers > 0:
+            self._has_subscribers.set()
+
+        recognize_queue = asyncio.Queue(maxsize=self.queue_size)
+        self._queues = {'recognize': recognize_queue}
+        self._tasks = [
+            asyncio.create_task(self._capture_loop(recognize_queue)),
+            asyncio.create_task(self._recognize_loop(recognize_queue))
+        ]
+
+    async def stop(self):
+        """Cancel the stage tasks and shut down the executors"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for executor in self.executors.values():
+            executor.shutdown(wait=False)
+
+    async def _capture_loop(self, recognize_queue):
+        """Feed captured frames to the recognition stage"""
+        while True:
+            await self._has_subscribers.wait()
+
+            start_time = time.time()
+            try:
+                slot, frame, timestamp = await self.capture()
+            except Exception as e:
+                print(f"Error generating frame: {e}")
+                await self.publish(make_error_frame(str(e)), None)
+                await asyncio.sleep(1)
+                continue
+
+            dropped = put_latest(recognize_queue, (slot, frame, timestamp))
+            if dropped is not None:
+                self.dropped_frames['recognize'] += 1
+                self._release(dropped[0])
+
+            # Don't outrun the configured frame rate
+            elapsed = time.time() - start_time
+            if elapsed < self.pipeline.min_interval:
+                await asyncio.sleep(self.pipeline.min_interval - elapsed)
+
+    async def _recognize_loop(self, recognize_queue):
+        """Recognize gestures on frames from the capture stage and publish them to viewers"""
+        while True:
+            slot, frame, timestamp = await recognize_queue.get()
+            try:
+                gesture, frame_with_landmarks = await self.recognize(frame, timestamp)
+                # Viewers encode the published frame later, so it can't stay in the pool
+                frame_with_landmarks = frame_with_landmarks.copy()
+            except Exception as e:
+                print(f"Error recognizing frame: {e}")
+                gesture, frame_with_landmarks = None, make_error_frame(str(e))
+            finally:
+                self._release(slot)
+            await self.publish(frame_with_landmarks, gesture)
+
+    def subscribe(self, controller=None):
+        """Register a viewer (and its stream controller), starting the stage tasks on first use"""
+        self.num_subscribers += 1
+        if controller is not None:
+            self.viewers.add(controller)
+        self.start()
+        self._has_subscribers.set()
+
+    def unsubscribe(self, controller=None):
+        """Unregister a viewer; the capture stage pauses once nobody is watching"""
+        self.num_subscribers = max(0, self.num_subscribers - 1)
+        self.viewers.discard(controller)
+        if self.num_subscribers == 0 and self._has_subscribers is not None:
+            self._has_subscribers.clear()
+
+    async def wait_for_frame(self, last_frame_id, stride=1):
+        """Wait for a frame at least stride frames newer than last_frame_id and return (frame_id, frame)"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.frame_id >= last_frame_id + stride)
+            return self.frame_id, self.latest_frame
+
+    async def frames(self):
+        """Yield multipart JPEG chunks for one viewer with an adaptive stream profile.
+
+        Always skips to the latest frame; cheaper profiles also skip published
+        frames to lower the frame rate (see FramePipeline.frames).
+        """
+        controller = AdaptiveStreamController(pipeline_fps=self.publish_rate.fps)
+        self.subscribe(controller)
+        try:
+            frame_id = 0
+            while True:
+                controller.pipeline_fps = self.publish_rate.fps
+                frame_id, frame = await self.wait_for_frame(frame_id, controller.frame_stride)
+                chunk = multipart_chunk(await self.encode(frame_id, frame, controller.profile))
+                sent_at = time.perf_counter()
+                yield chunk
+                now = time.perf_counter()
+                controller.frame_sent(len(chunk), now - sent_at, now)
+        finally:
+            self.unsubscribe(controller)
+
+    def get_stats(self):
+        """Return pipeline statistics"""
+        stats = {
+            'frames_published': self.frame_id,
+            'subscribers': self.num_subscribers,
+            'dropped_frames': dict(self.dropped_frames),
+            'queue_depths': {stage: stage_queue.qsize() for stage, stage_queue in self._queues.items()},
+            'viewer_profiles': viewer_profiles(self.viewers)
+        }
+        stats.update(self.encoder.get_stats())
+        return stats
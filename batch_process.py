@@ -0,0 +1,314 @@
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from hand_landmarks import NUM_LANDMARKS
+from inference_engine import decode_batch
+from startup import DEFAULT_MODEL_PATH
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm', '.m4v')
+
+# Label index stored for frames without a hand or below the confidence threshold
+# (the index decode_batch gives unsure predictions)
+NO_LABEL = -1
+
+
+class PrefetchReader:
+    """Decode a range of video frames on a background thread into a bounded queue.
+
+    Decoding runs ahead of recognition by at most `prefetch` frames, so the
+    two overlap without buffering a whole video in memory. With stride > 1 the
+    skipped frames are only grabbed, not decoded. Iterating yields
+    (frame_index, frame).
+    """
+
+    _END = object()
+
+    def __init__(self, path, start_frame=0, end_frame=None, stride=1, prefetch=8):
+        self.path = path
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.stride = stride
+        self._queue = queue.Queue(maxsize=prefetch)
+        self._running = False
+        self._thread = None
+        self.error = None
+
+    def __iter__(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._read_frames, daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._END:
+                    break
+                yield item
+        finally:
+            self.close()
+        if self.error is not None:
+            raise self.error
+
+    def _read_frames(self):
+        cap = cv2.VideoCapture(self.path)
+        try:
+            if not cap.isOpened():
+                raise ValueError(f"Could not open video {self.path}")
+            if self.start_frame:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, self.start_frame)
+
+            index = self.start_frame
+            while self._running and (self.end_frame is None or index < self.end_frame):
+                if (index - self.start_frame) % self.stride:
+                    if not cap.grab():
+                        break
+                else:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    self._put((index, frame))
+                index += 1
+        except Exception as e:
+            self.error = e
+        finally:
+            cap.release()
+            self._put(self._END)
+
+    def _put(self, item):
+        # Poll so close() can stop a reader blocked on a full queue
+        while self._running:
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def close(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+
+def find_videos(inputs):
+    """Expand files and directories (searched recursively) into sorted (path, name) pairs.
+
+    name is the video's path relative to the input directory it was found in,
+    or its file name for a file given directly; the results are written under
+    the same relative path.
+    """
+    videos = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                videos.extend((os.path.join(root, name),
+                               os.path.relpath(os.path.join(root, name), path))
+                              for name in files if name.lower().endswith(VIDEO_EXTENSIONS))
+        else:
+            videos.append((path, os.path.basename(path)))
+    return sorted(videos)
+
+
+def output_paths(videos, output_dir):
+    """Map find_videos() pairs to result files, rejecting videos that would share one"""
+    paths = [os.path.join(output_dir, os.path.splitext(name)[0] + '.npz') for _, name in videos]
+    sources = {}
+    for (video, _), path in zip(videos, paths):
+        if path in sources:
+            raise ValueError(f"{sources[path]} and {video} would both be written to {path}")
+        sources[path] = video
+    return paths
+
+
+def probe_video(path):
+    """Return (frame_count, fps) of a video; frame_count is 0 if the container doesn't say"""
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video {path}")
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS) or 30.0
+    finally:
+        cap.release()
+
+
+def split_segments(frame_count, fps, segment_seconds, stride):
+    """Split a video into contiguous (start, end) frame ranges, aligned to the stride"""
+    if frame_count <= 0:
+        return [(0, None)]
+    segment_frames = max(stride, int(segment_seconds * fps) // stride * stride)
+    return [(start, min(start + segment_frames, frame_count))
+            for start in range(0, frame_count, segment_frames)]
+
+
+# Per-process recognizer, created by _init_worker
+_recognizer = None
+
+
+def _init_worker(model_path, backend, static_image_mode):
+    """Process pool initializer: build one recognizer per worker process"""
+    global _recognizer
+    from gesture_recognition import GestureRecognition
+    from hand_roi import HandROITracker
+
+    # The ROI crop relies on frame-to-frame tracking, which sparse frames don't have
+    roi_tracker = None if static_image_mode else HandROITracker()
+    _recognizer = GestureRecognition(model_path, backend=backend, roi_tracker=roi_tracker,
+                                     static_image_mode=static_image_mode)
+
+
+def _worker_labels():
+    """Worker: return the recognizer's label list"""
+    return _recognizer.labels
+
+
+def _process_segment(path, start_frame, end_frame, stride, prefetch, batch_size):
+    """Worker: extract landmarks for a segment, then classify them in batches"""
+    recognizer = _recognizer
+    # Segments are independent, and the last one may be from another video:
+    # don't carry tracked hands, a crop or scheduler history over
+    recognizer.reset()
+
+    frame_indices = []
+    landmarks = []
+    for index, frame in PrefetchReader(path, start_frame, end_frame, stride, prefetch):
+        hands = recognizer.extract_all_hands(frame)
+        frame_indices.append(index)
+        landmarks.append(hands.landmarks[0].copy() if hands is not None
+                         else np.full((NUM_LANDMARKS, 3), np.nan, dtype=np.float32))
+
+    num_frames = len(frame_indices)
+    landmarks = (np.stack(landmarks) if landmarks
+                 else np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32))
+    has_hand = ~np.isnan(landmarks[:, 0, 0])
+    labels = np.full(num_frames, NO_LABEL, dtype=np.int16)
+    confidences = np.zeros(num_frames, dtype=np.float32)
+
+    if recognizer.model is not None and has_hand.any():
+        rows = np.flatnonzero(has_hand)
+        features = recognizer.model_features(landmarks[rows].reshape(len(rows), -1))
+        for begin in range(0, len(rows), batch_size):
+            batch_rows = rows[begin:begin + batch_size]
+            probabilities = recognizer.predict_batch(features[begin:begin + batch_size])
+            labels[batch_rows], confidences[batch_rows] = decode_batch(
+                probabilities, recognizer.confidence_threshold)
+
+    return {
+        'frame': np.asarray(frame_indices, dtype=np.int64),
+        'label': labels,
+        'confidence': confidences,
+        'has_hand': has_hand,
+        'landmarks': landmarks
+    }
+
+
+def write_results(output_path, segments, fps, labels, source):
+    """Concatenate segment columns and write them to one .npz file"""
+    columns = {key: np.concatenate([segment[key] for segment in segments])
+               for key in segments[0]}
+    columns['timestamp'] = columns['frame'] / fps
+    np.savez(output_path, labels=np.array(labels), fps=np.array(fps),
+             source=np.array(source), **columns)
+    return len(columns['frame'])
+
+
+def process_videos(videos, output_dir, model_path=DEFAULT_MODEL_PATH, backend=None,
+                   num_workers=None, stride=1, static_image_mode=None, segment_seconds=60.0,
+                   prefetch=8, batch_size=256):
+    """Run recognition over video files in parallel and write one .npz per video.
+
+    videos are (path, name) pairs from find_videos(); each result goes to
+    output_dir/name with an .npz extension. Videos that cannot be read are
+    reported and skipped. Each video is cut into segments of segment_seconds
+    that worker processes handle independently. MediaPipe runs in tracking mode within a segment
+    unless frames are sampled sparsely (stride > 1), where every frame needs
+    a full detection anyway; pass static_image_mode to override.
+    """
+    if static_image_mode is None:
+        static_image_mode = stride > 1
+    video_outputs = output_paths(videos, output_dir)
+
+    # Spawn so workers don't inherit this process's threads and TF state
+    executor = ProcessPoolExecutor(max_workers=num_workers or os.cpu_count(),
+                                   mp_context=mp.get_context('spawn'),
+                                   initializer=_init_worker,
+                                   initargs=(model_path, backend, static_image_mode))
+    start_time = time.perf_counter()
+    total_frames = 0
+    total_seconds = 0.0
+    outputs = []
+    with executor:
+        labels = executor.submit(_worker_labels).result()
+
+        # Queue every segment of every video up front so workers never idle between files
+        jobs = []
+        for (video, _), output_path in zip(videos, video_outputs):
+            try:
+                frame_count, fps = probe_video(video)
+            except ValueError as e:
+                print(f"Skipping {video}: {e}")
+                continue
+            futures = [executor.submit(_process_segment, video, start, end, stride, prefetch,
+                                       batch_size)
+                       for start, end in split_segments(frame_count, fps, segment_seconds, stride)]
+            jobs.append((video, output_path, frame_count, fps, futures))
+
+        for video, output_path, frame_count, fps, futures in jobs:
+            try:
+                segments = [future.result() for future in futures]
+            except ValueError as e:
+                print(f"Skipping {video}: {e}")
+                continue
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            num_frames = write_results(output_path, segments, fps, labels, video)
+
+            video_seconds = (frame_count or num_frames * stride) / fps
+            total_frames += num_frames
+            total_seconds += video_seconds
+            outputs.append(output_path)
+            print(f"{video}: {num_frames} frames -> {output_path}")
+
+    elapsed = time.perf_counter() - start_time
+    print(f"Processed {total_frames} frames ({total_seconds:.1f}s of video) from {len(outputs)} of "
+          f"{len(videos)} videos in {elapsed:.1f}s "
+          f"({total_frames / elapsed:.1f} frames/s, {total_seconds / elapsed:.1f}x real time)")
+    return outputs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run gesture recognition over recorded videos")
+    parser.add_argument('inputs', nargs='+', help="video files or directories of videos")
+    parser.add_argument('--output-dir', default='batch_results',
+                        help="directory for the per-video .npz results")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help="gesture model path")
+    parser.add_argument('--backend', choices=['keras', 'numpy', 'tflite'],
+                        help="classifier backend (default: SIGN2TEXT_BACKEND or keras)")
+    parser.add_argument('--workers', type=int, help="worker processes (default: CPU count)")
+    parser.add_argument('--stride', type=int, default=1, help="process every Nth frame")
+    parser.add_argument('--static-image-mode', action=argparse.BooleanOptionalAction,
+                        help="force MediaPipe detection on every frame "
+                             "(default: only when --stride > 1)")
+    parser.add_argument('--segment-seconds', type=float, default=60.0,
+                        help="length of the video segments handed to workers")
+    parser.add_argument('--prefetch', type=int, default=8,
+                        help="frames decoded ahead of recognition per worker")
+    args = parser.parse_args()
+
+    videos = find_videos(args.inputs)
+    if not videos:
+        parser.error("no video files found")
+    try:
+        output_paths(videos, args.output_dir)
+    except ValueError as e:
+        parser.error(str(e))
+
+    process_videos(videos, args.output_dir, model_path=args.model, backend=args.backend,
+                   num_workers=args.workers, stride=args.stride,
+                   static_image_mode=args.static_image_mode,
+                   segment_seconds=args.segment_seconds, prefetch=args.prefetch)
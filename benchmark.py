@@ -0,0 +1,252 @@
+import argparse
+import http.client
+import json
+import platform
+import resource
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from camera_capture import CameraCapture
+from frame_sources import open_source
+from startup import DEFAULT_MODEL_PATH, ROI_TRACKING
+from stream_encoder import STREAM_PROFILES, encode_jpeg
+
+DEFAULT_SOURCE = 'synthetic:?realtime=0'
+
+
+def load_frames(source, max_frames=60):
+    """Read up to max_frames frames of a frame source into memory, unpaced"""
+    frame_source = open_source(source)
+    frame_source.realtime = False
+    frames = []
+    try:
+        while len(frames) < max_frames:
+            ret, frame, _ = frame_source.read()
+            if not ret:
+                break
+            frames.append(frame)
+    finally:
+        frame_source.release()
+    if not frames:
+        raise ValueError(f"No frames could be read from {source}")
+    return np.stack(frames)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def summarize(latencies, elapsed):
+    """Turn per-iteration latencies (seconds) into throughput and percentiles"""
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        'iterations': len(latencies_ms),
+        'throughput_per_s': round(len(latencies_ms) / elapsed, 2) if elapsed > 0 else 0.0,
+        'mean_ms': round(float(latencies_ms.mean()), 3),
+        'p50_ms': round(float(np.percentile(latencies_ms, 50)), 3),
+        'p99_ms': round(float(np.percentile(latencies_ms, 99)), 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+
+
+def time_calls(func, inputs, iterations, warmup=10):
+    """Call func on inputs (cycled) and summarize per-call latency"""
+    for i in range(warmup):
+        func(inputs[i % len(inputs)])
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        call_start = time.perf_counter()
+        func(inputs[i % len(inputs)])
+        latencies.append(time.perf_counter() - call_start)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def benchmark_video_feed(source, recognizer, num_frames=50, timeout=60.0, max_fps=None):
+    """Serve web_app on a local port, capturing from source, and time /video_feed frames.
+
+    The frames go through web_app's routes, overlay and encoder, but are
+    recognized by the given recognizer (so --backend, --adaptive and --roi apply)
+    and are not paced to web_app's 10 fps unless max_fps is set. Recorded
+    sources are looped, so no timed frame is an error frame from after the
+    end of a file.
+    """
+    from werkzeug.serving import make_server
+    from frame_pipeline import FramePipeline
+    import web_app
+
+    web_app.initialize_components()
+    if not web_app.startup.wait_until_ready(timeout):
+        raise RuntimeError(f"web_app did not start: {web_app.startup.get_status()}")
+
+    # initialize_components() resets the camera, so open the source afterwards
+    frame_source = open_source(source)
+    frame_source.loop = True
+    web_app.camera = CameraCapture(frame_source, threaded=True)
+    web_app.camera.start_capture()
+    web_app.gesture_recognizer = recognizer
+    pipeline = FramePipeline(web_app.read_frame, recognizer, annotate=web_app.draw_overlay,
+                             on_gesture=web_app.speak_gesture, max_fps=max_fps,
+                             landmark_stream=web_app.landmark_stream)
+    with web_app.pipeline_lock:
+        web_app.pipeline = pipeline
+
+    server = make_server('127.0.0.1', 0, web_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=timeout)
+    try:
+        connection.request('GET', '/video_feed')
+        response = connection.getresponse()
+
+        # Each multipart part starts with the boundary; time the gaps between them
+        arrivals = []
+        pending = b''
+        while len(arrivals) <= num_frames:
+            data = response.read1(65536)
+            if not data:
+                break
+            pending += data
+            parts = pending.split(b'--frame\r\n')
+            arrivals.extend([time.perf_counter()] * (len(parts) - 1))
+            pending = parts[-1]
+    finally:
+        connection.close()
+        # The server's viewer thread only notices the closed connection when it
+        # sends the next frame; keep frames coming until it has unsubscribed
+        deadline = time.monotonic() + timeout
+        while pipeline.num_subscribers and time.monotonic() < deadline:
+            time.sleep(0.05)
+        server.shutdown()
+        pipeline.stop()
+        web_app.camera.release()
+
+    if len(arrivals) <= num_frames:
+        raise RuntimeError(f"/video_feed ended after {len(arrivals)} of {num_frames + 1} frames")
+    if pipeline.errors:
+        raise RuntimeError(f"{pipeline.errors} frames failed during the /video_feed benchmark")
+
+    # The first frame includes pipeline start-up; measure steady state after it
+    gaps = np.diff(arrivals[1:])
+    results = summarize(gaps, arrivals[-1] - arrivals[1])
+    results['max_fps'] = max_fps
+    return results
+
+
+def run_benchmarks(source=DEFAULT_SOURCE, model_path=DEFAULT_MODEL_PATH, backend=None,
+                   iterations=200, num_frames=60, adaptive=False, roi=False, http=True):
+    """Run every benchmark on frames from source and return the results as a JSON-serializable dict"""
+    from frame_pipeline import FramePipeline
+    from gesture_recognition import GestureRecognition
+    from hand_roi import HandROITracker
+    from recognition_scheduler import AdaptiveScheduler
+
+    np.random.seed(0)
+    frames = load_frames(source, num_frames)
+    results = {
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+            'machine': platform.machine(),
+            'source': str(source),
+            'frame_shape': list(frames.shape[1:]),
+            'model': model_path,
+            'adaptive': adaptive,
+            'roi': roi
+        },
+        'benchmarks': {}
+    }
+    benchmarks = results['benchmarks']
+
+    recognizer = GestureRecognition(model_path, backend=backend,
+                                    scheduler=AdaptiveScheduler() if adaptive else None,
+                                    roi_tracker=HandROITracker() if roi else None)
+    recognizer.warm_up(frames.shape[1:])
+    results['environment']['model_loaded'] = recognizer.model is not None
+
+    benchmarks['extract_hand_landmarks'] = time_calls(recognizer.extract_hand_landmarks,
+                                                      frames, iterations)
+
+    # Classify landmark vectors shaped like real ones (wrist-relative noise around a hand)
+    landmarks = (0.5 + 0.1 * np.random.randn(64, 63)).astype(np.float32)
+    if recognizer.model is not None:
+        benchmarks['predict_gesture'] = time_calls(recognizer.predict_gesture, landmarks,
+                                                   iterations * 5)
+
+    benchmarks['process_frame'] = time_calls(recognizer.process_frame, frames, iterations)
+
+    pipeline = FramePipeline(None, recognizer)
+    benchmarks['jpeg_encode'] = time_calls(pipeline.encode, frames, iterations)
+    for profile in STREAM_PROFILES:
+        benchmarks[f'jpeg_encode_{profile.name}'] = time_calls(
+            lambda frame: encode_jpeg(frame, profile), frames, iterations)
+
+    if http:
+        benchmarks['video_feed'] = benchmark_video_feed(source, recognizer)
+
+    results['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    return results
+
+
+def compare(results, baseline, tolerance=0.1):
+    """Return regressions: benchmarks whose p50 grew or throughput fell by more than tolerance"""
+    regressions = []
+    for name, current in results['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if previous is None:
+            continue
+        if current['p50_ms'] > previous['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {previous['p50_ms']} -> {current['p50_ms']} ms")
+        if current['throughput_per_s'] < previous['throughput_per_s'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['throughput_per_s']} -> "
+                               f"{current['throughput_per_s']}/s")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the recognition and streaming paths")
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                        help="frame source URI, e.g. 'file:clip.mp4?loop=1&realtime=0' "
+                             "(see frame_sources.py; default: synthetic frames)")
+    parser.add_argument('--frames', type=int, default=60,
+                        help="frames read into memory for the function benchmarks")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help="gesture model path")
+    parser.add_argument('--backend', choices=['keras', 'numpy', 'tflite'],
+                        help="classifier backend (default: SIGN2TEXT_BACKEND or keras)")
+    parser.add_argument('--iterations', type=int, default=200, help="iterations per benchmark")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="skip detection and classification on static frames with the "
+                             "adaptive scheduler, as the web apps do")
+    parser.add_argument('--roi', action='store_true', default=ROI_TRACKING,
+                        help="run hand detection on a crop around the tracked hand "
+                             "(default: SIGN2TEXT_ROI)")
+    parser.add_argument('--no-http', action='store_true', help="skip the /video_feed benchmark")
+    parser.add_argument('--output', help="write the JSON results to this file")
+    parser.add_argument('--compare', help="baseline JSON results to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="allowed relative slowdown before --compare fails")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.source, args.model, args.backend, args.iterations, args.frames,
+                             adaptive=args.adaptive, roi=args.roi, http=not args.no_http)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
@@ -1,38 +1,184 @@
-import cv2
 import numpy as np
+import threading
+import time
+
+from frame_sources import open_source
 
 class CameraCapture:
-    def __init__(self, camera_index=0):
-        self.camera_index = camera_index
+    def __init__(self, source=0, threaded=False, buffer_size=4, width=640, height=480):
+        # A camera index, a path or a frame source URI (see frame_sources.open_source)
+        self.source = source
         self.cap = None
+        self.width = width
+        self.height = height
+
+        # Background grabber mode: a thread keeps reading into a small ring of
+        # preallocated frames and get_frame() hands out the newest one
+        self.threaded = threaded
+        self.buffer_size = max(3, buffer_size)
+        self._buffers = None
+        self._frame_indices = [0] * self.buffer_size
+        self._timestamps = [0.0] * self.buffer_size
+        self._latest_slot = -1
+        self._lent_slot = -1
+        self._last_delivered_index = 0
+        self._condition = threading.Condition()
+        self._grab_thread = None
+        self._running = False
+
+        # Grabber statistics
+        self.frames_captured = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
 
     def start_capture(self):
-        """Initialize camera capture"""
-        self.cap = cv2.VideoCapture(self.camera_index)
-        if not self.cap.isOpened():
-            raise ValueError(f"Could not open camera with index {self.camera_index}")
+        """Open the frame source (raises ValueError if it cannot be opened)"""
+        self.cap = open_source(self.source, self.width, self.height)
+
+        if self.threaded:
+            self._start_grabber()
+
+    def _start_grabber(self):
+        """Allocate the frame ring and start the background grabber thread"""
+        ret, frame, timestamp = self.cap.read()
+        if not ret:
+            raise RuntimeError("Failed to capture frame")
+
+        self._buffers = [np.empty_like(frame) for _ in range(self.buffer_size)]
+        self._store_frame(0, timestamp, frame)
+
+        self._running = True
+        self._grab_thread = threading.Thread(target=self._grab_frames, daemon=True)
+        self._grab_thread.start()
+
+    def _next_slot(self):
+        """Pick a ring slot that holds neither the newest nor the lent-out frame"""
+        slot = (self._latest_slot + 1) % self.buffer_size
+        while slot == self._lent_slot or slot == self._latest_slot:
+            slot = (slot + 1) % self.buffer_size
+        return slot
+
+    def _store_frame(self, slot, timestamp, frame=None):
+        """Publish a ring slot as the newest frame"""
+        with self._condition:
+            if frame is not None:
+                self._buffers[slot][...] = frame
+
+            # The previous newest frame was never handed out
+            if self.frames_captured > self._last_delivered_index:
+                self.frames_dropped += 1
+
+            self.frames_captured += 1
+            self._frame_indices[slot] = self.frames_captured
+            self._timestamps[slot] = timestamp
+            self._latest_slot = slot
+            self._condition.notify_all()
 
-        # Set camera properties for better performance
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        self.cap.set(cv2.CAP_PROP_FPS, 30)
+    def _grab_frames(self):
+        """Continuously read frames into the ring buffer in background thread"""
+        while self._running:
+            with self._condition:
+                # Recorded sources read without pacing wait for the reader
+                # instead of dropping frames, so every frame gets processed
+                if not self.cap.live:
+                    self._condition.wait_for(
+                        lambda: self.frames_captured == self._last_delivered_index or not self._running)
+                    if not self._running:
+                        break
+                slot = self._next_slot()
+            buffer = self._buffers[slot]
+
+            # Decode straight into the preallocated slot
+            ret, frame, timestamp = self.cap.read(buffer)
+            if not ret:
+                if self.cap.exhausted:
+                    # End of a file or directory that does not loop
+                    with self._condition:
+                        self._running = False
+                        self._condition.notify_all()
+                    break
+                self.read_failures += 1
+                time.sleep(0.01)
+                continue
+
+            # Fall back to a copy if the source returned a new array or changed the frame size
+            if frame is not buffer:
+                if frame.shape != buffer.shape:
+                    self._buffers[slot] = buffer = np.empty_like(frame)
+                self._store_frame(slot, timestamp, frame)
+            else:
+                self._store_frame(slot, timestamp)
+
+    def read_latest(self, timeout=1.0):
+        """Return (frame, frame_index, capture_timestamp) for the newest unseen frame.
+
+        In threaded mode the frame is a view into the ring buffer, not a copy;
+        it stays valid until the next call to read_latest() or get_frame().
+        """
+        if self.cap is None:
+            raise RuntimeError("Camera not initialized. Call start_capture() first.")
+
+        if not self.threaded:
+            ret, frame, timestamp = self.cap.read()
+            if not ret:
+                raise RuntimeError("Failed to capture frame")
+            self.frames_captured += 1
+            self.frames_delivered += 1
+            return frame, self.frames_captured, timestamp
+
+        with self._condition:
+            has_frame = self._condition.wait_for(
+                lambda: self.frames_captured > self._last_delivered_index or not self._running,
+                timeout)
+            # After a finite source ends, its last frame is still handed out once
+            if not has_frame or self.frames_captured == self._last_delivered_index:
+                raise RuntimeError("Failed to capture frame")
+
+            slot = self._latest_slot
+            self._lent_slot = slot
+            self._last_delivered_index = self._frame_indices[slot]
+            self.frames_delivered += 1
+            self._condition.notify_all()
+            return self._buffers[slot], self._frame_indices[slot], self._timestamps[slot]
+
+    @property
+    def finished(self):
+        """True once a source that does not loop (a file or directory) has delivered its last frame"""
+        if self.cap is None or not self.cap.exhausted:
+            return False
+        with self._condition:
+            return not self.threaded or self.frames_captured == self._last_delivered_index
 
     def get_frame(self):
         """Capture and return a single frame"""
         if self.cap is None:
             raise RuntimeError("Camera not initialized. Call start_capture() first.")
 
-        ret, frame = self.cap.read()
-        if not ret:
-            raise RuntimeError("Failed to capture frame")
+        return self.read_latest()[0]
 
-        return frame
+    def get_stats(self):
+        """Return grabber statistics"""
+        with self._condition:
+            return {
+                'frames_captured': self.frames_captured,
+                'frames_delivered': self.frames_delivered,
+                'frames_dropped': self.frames_dropped,
+                'read_failures': self.read_failures
+            }
 
     def release(self):
-        """Release camera resources"""
+        """Release the frame source"""
+        if self._grab_thread is not None:
+            with self._condition:
+                self._running = False
+                self._condition.notify_all()
+            self._grab_thread.join(timeout=2)
+            self._grab_thread = None
+
         if self.cap is not None:
             self.cap.release()
             self.cap = None
 
     def __del__(self):
-        self.release()
\ No newline at end of file
+        self.release()
@@ -4,49 +4,142 @@ from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense, Dropout
 from sklearn.model_selection import train_test_split
 import os
+import argparse
+from gesture_labels import labels_path, save_labels
+from inference_backend import NumpyBackend, backend_model_path, check_parity, export_numpy_weights
+from landmark_augmentation import LandmarkAugmenter
+from landmark_dataset import LandmarkDataset, LandmarkDatasetWriter
+from landmark_features import LandmarkTransform, transform_path
+from sequence_classifier import save_sequence_config, window_features
 
-def create_dummy_gesture_data():
+GESTURES = [
+    'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M',
+    'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z',
+    '0', '1', '2', '3', '4', '5', '6', '7', '8', '9',
+    'hello', 'thank you', 'please',
+    'namaste', 'sorry', 'good', 'bad', 'eat', 'drink'
+]
+
+# Signs defined by motion rather than a single hand shape
+DYNAMIC_GESTURES = ['J', 'Z', 'hello', 'thank you', 'please', 'namaste', 'sorry']
+
+def create_dummy_gesture_data(num_samples_per_gesture=100):
     """Create dummy gesture data for demonstration purposes"""
     # This would normally be replaced with actual training data
     # Each gesture has 63 features (21 landmarks * 3 coordinates)
-    num_samples_per_gesture = 100
     num_features = 63  # 21 landmarks * 3 (x, y, z)
 
-    gestures = [
-        'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M',
-        'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z',
-        '0', '1', '2', '3', '4', '5', '6', '7', '8', '9',
-        'hello', 'thank you', 'please',
-        'namaste', 'sorry', 'good', 'bad', 'eat', 'drink'
-    ]
+    gestures = GESTURES
 
     num_classes = len(gestures)
 
-    # Generate dummy data with some variation for each gesture
-    X = []
-    y = []
+    # Base pattern per gesture plus per-sample noise, generated in one shot
+    base_patterns = np.random.rand(num_classes, num_features).astype(np.float32)
+    y = np.repeat(np.arange(num_classes), num_samples_per_gesture)
+    X = base_patterns[y] + np.random.normal(0, 0.1, (len(y), num_features)).astype(np.float32)
+
+    return X, y, gestures
+
+def write_dummy_dataset(dataset_path):
+    """Write the dummy gesture data to a landmark dataset directory"""
+    X, y, gestures = create_dummy_gesture_data()
+    with LandmarkDatasetWriter(dataset_path) as writer:
+        writer.begin_session('dummy')
+        for gesture_idx, gesture in enumerate(gestures):
+            writer.append(X[y == gesture_idx], gesture)
+    print(f"Wrote {len(X)} dummy samples to {dataset_path}")
+
+def configure_cpu_threads(intra_op_threads=0, inter_op_threads=0):
+    """Set TensorFlow's CPU thread pools (0 lets TensorFlow pick)"""
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
 
-    for gesture_idx, gesture in enumerate(gestures):
-        # Create base pattern for each gesture
-        base_pattern = np.random.rand(num_features)
+def make_input_pipeline(inputs, labels, indices, batch_size=32, shuffle=True,
+                        preprocess=None, shuffle_buffer=100000, seed=42):
+    """Build a tf.data pipeline that streams (features, labels) batches.
 
-        for _ in range(num_samples_per_gesture):
-            # Add some noise to create variation
-            pattern = base_pattern + np.random.normal(0, 0.1, num_features)
-            X.append(pattern)
-            y.append(gesture_idx)
+    inputs and labels can be in-memory arrays or LandmarkDataset memmaps. Only
+    row indices go through the shuffle buffer; each batch of rows is gathered
+    and preprocessed (e.g. a LandmarkTransform) as one vectorized NumPy call
+    in parallel map workers, and batches are prefetched while the model trains.
+    """
+    def load_batch(batch_indices):
+        # Sorted reads walk memory-mapped files forward
+        batch_indices = np.sort(batch_indices)
+        batch = np.asarray(inputs[batch_indices], dtype=np.float32)
+        batch = batch.reshape(len(batch_indices), -1)
+        if preprocess is not None:
+            batch = preprocess(batch)
+        return batch.astype(np.float32, copy=False), np.asarray(labels[batch_indices], dtype=np.int32)
 
-    X = np.array(X)
-    y = np.array(y)
+    num_features = load_batch(np.asarray(indices[:1]))[0].shape[1]
 
-    return X, y, gestures
+    def set_shapes(features, batch_labels):
+        features.set_shape([None, num_features])
+        batch_labels.set_shape([None])
+        return features, batch_labels
+
+    dataset = tf.data.Dataset.from_tensor_slices(np.asarray(indices, dtype=np.int64))
+    if shuffle:
+        dataset = dataset.shuffle(min(len(indices), shuffle_buffer), seed=seed,
+                                  reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size)
+    dataset = dataset.map(
+        lambda batch_indices: set_shapes(*tf.numpy_function(
+            load_batch, [batch_indices], (tf.float32, tf.int32))),
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=not shuffle
+    )
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+def create_dummy_sequences(window_size=30, num_samples_per_gesture=100):
+    """Create dummy landmark sequences shaped (N, window_size, 63)"""
+    # Like create_dummy_gesture_data, this stands in for recorded sequences
+    num_features = 63
+    num_classes = len(GESTURES)
+
+    # Each gesture gets a base hand shape; dynamic gestures also move along a path
+    base_patterns = np.random.rand(num_classes, num_features)
+    motions = np.zeros((num_classes, num_features))
+    for gesture in DYNAMIC_GESTURES:
+        motions[GESTURES.index(gesture)] = np.random.normal(0, 0.3, num_features)
+
+    y = np.repeat(np.arange(num_classes), num_samples_per_gesture)
+    progress = np.linspace(0, 1, window_size)[np.newaxis, :, np.newaxis]
+    sequences = (base_patterns[y][:, np.newaxis, :] +
+                 progress * motions[y][:, np.newaxis, :] +
+                 np.random.normal(0, 0.05, (len(y), window_size, num_features)))
+
+    return sequences.astype(np.float32), y, GESTURES
+
+def create_dummy_sequence_data(window_size=30, num_samples_per_gesture=100):
+    """Create dummy landmark sequences and their window features"""
+    sequences, y, gestures = create_dummy_sequences(window_size, num_samples_per_gesture)
+    return window_features(sequences), y, gestures
+
+def create_sequence_model(input_shape, num_classes):
+    """Create a small model over sliding-window sequence features"""
+    model = Sequential([
+        Dense(64, activation='relu', input_shape=(input_shape,)),
+        Dropout(0.2),
+        Dense(32, activation='relu'),
+        Dense(num_classes, activation='softmax')
+    ])
+
+    model.compile(
+        optimizer='adam',
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy']
+    )
+
+    return model
 
 def create_model(input_shape, num_classes):
     """Create a neural network model for gesture recognition"""
+    # Normalized, invariant features (see landmark_features.py) let a smaller
+    # network do the work of the old 128-64-32 one on raw coordinates
     model = Sequential([
-        Dense(128, activation='relu', input_shape=(input_shape,)),
-        Dropout(0.2),
-        Dense(64, activation='relu'),
+        Dense(64, activation='relu', input_shape=(input_shape,)),
         Dropout(0.2),
         Dense(32, activation='relu'),
         Dense(num_classes, activation='softmax')
@@ -60,54 +153,163 @@ def create_model(input_shape, num_classes):
 
     return model
 
-def train_and_save_model():
-    """Train the model and save it"""
-    print("Creating dummy gesture data...")
-    X, y, gestures = create_dummy_gesture_data()
+def train_and_save_model(dataset_path=None, batch_size=32, augment=True,
+                         model_path='gesture_model.h5', epochs=50):
+    """Train the model and save it to model_path.
+
+    With dataset_path, batches are streamed from a landmark dataset directory
+    (see landmark_dataset.py) instead of generating dummy data in memory.
+    Training batches get fresh random augmentation every epoch.
+    """
+    # Same feature transform as GestureRecognition applies at inference time
+    feature_transform = LandmarkTransform()
+    augmenter = LandmarkAugmenter(seed=42)
 
-    print(f"Dataset shape: {X.shape}")
+    def augment_and_transform(batch):
+        return feature_transform.transform(augmenter.augment(batch))
+
+    if dataset_path:
+        dataset = LandmarkDataset(dataset_path)
+        landmarks, labels, gestures = dataset.landmarks, dataset.labels, dataset.label_names
+        train_indices, test_indices = dataset.split(test_size=0.2, seed=42)
+        print(f"Dataset: {len(dataset)} frames from {dataset_path}")
+    else:
+        print("Creating dummy gesture data...")
+        landmarks, labels, gestures = create_dummy_gesture_data()
+        train_indices, test_indices = train_test_split(
+            np.arange(len(labels)), test_size=0.2, random_state=42, stratify=labels
+        )
+        print(f"Dataset shape: {landmarks.shape}")
     print(f"Number of classes: {len(gestures)}")
 
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    # Only the shuffled row indices are held by the pipeline; rows are
+    # gathered and transformed a batch at a time
+    train_data = make_input_pipeline(
+        landmarks, labels, train_indices, batch_size,
+        preprocess=augment_and_transform if augment else feature_transform.transform)
+    test_data = make_input_pipeline(landmarks, labels, test_indices, batch_size, shuffle=False,
+                                    preprocess=feature_transform.transform)
 
     # Create model
-    model = create_model(X.shape[1], len(gestures))
+    model = create_model(feature_transform.num_features, len(gestures))
 
     print("Training model...")
     history = model.fit(
-        X_train, y_train,
-        epochs=50,
-        batch_size=32,
-        validation_data=(X_test, y_test),
+        train_data,
+        epochs=epochs,
+        validation_data=test_data,
         verbose=1
     )
 
     # Evaluate model
-    test_loss, test_accuracy = model.evaluate(X_test, y_test, verbose=0)
-    print(".2f")
+    test_loss, test_accuracy = model.evaluate(test_data, verbose=0)
+    print(f"Test accuracy: {test_accuracy:.2f}")
 
     # Save model
-    model_path = 'gesture_model.h5'
     model.save(model_path)
     print(f"Model saved to {model_path}")
 
-    # Save gesture labels
-    with open('gesture_labels.txt', 'w') as f:
-        for gesture in gestures:
-            f.write(gesture + '\n')
-    print("Gesture labels saved to gesture_labels.txt")
+    # The model is only valid together with the transform it was trained on
+    feature_transform.save(transform_path(model_path))
+    print(f"Feature transform saved to {transform_path(model_path)}")
+
+    # Export weights for the lightweight NumPy inference backend
+    weights_path = export_numpy_weights(model, backend_model_path(model_path, 'numpy'))
+    max_diff = check_parity(model, NumpyBackend(weights_path))
+    print(f"NumPy weights saved to {weights_path} (max diff vs Keras: {max_diff:.2e})")
+
+    # Output i is gestures[i]: the dataset's label order, not GESTURES
+    save_labels(model_path, gestures)
+    print(f"Gesture labels saved to {labels_path(model_path)}")
+
+    return model_path
+
+def train_and_save_sequence_model(window_size=30, batch_size=32, augment=True):
+    """Train the sliding-window model for dynamic signs and save it"""
+    print("Creating dummy gesture sequences...")
+    sequences, y, gestures = create_dummy_sequences(window_size)
+
+    print(f"Dataset shape: {sequences.shape}")
+    print(f"Number of classes: {len(gestures)}")
+
+    # Window features are computed per batch, after augmenting the raw sequences
+    augmenter = LandmarkAugmenter(seed=42)
+
+    def sequence_features(batch):
+        return window_features(batch.reshape(len(batch), window_size, -1))
+
+    def augment_sequence_features(batch):
+        batch = batch.reshape(len(batch), window_size, -1)
+        return window_features(augmenter.augment_sequences(batch))
+
+    train_indices, test_indices = train_test_split(
+        np.arange(len(y)), test_size=0.2, random_state=42, stratify=y
+    )
+    train_data = make_input_pipeline(
+        sequences, y, train_indices, batch_size,
+        preprocess=augment_sequence_features if augment else sequence_features)
+    test_data = make_input_pipeline(sequences, y, test_indices, batch_size, shuffle=False,
+                                    preprocess=sequence_features)
+
+    model = create_sequence_model(window_features(sequences[:1]).shape[1], len(gestures))
+
+    print("Training sequence model...")
+    model.fit(
+        train_data,
+        epochs=50,
+        validation_data=test_data,
+        verbose=1
+    )
+
+    test_loss, test_accuracy = model.evaluate(test_data, verbose=0)
+    print(f"Test accuracy: {test_accuracy:.2f}")
+
+    model_path = 'gesture_sequence_model.h5'
+    model.save(model_path)
+    save_sequence_config(model_path, window_size)
+    save_labels(model_path, gestures)
+    print(f"Sequence model saved to {model_path} (window size {window_size})")
+
+    weights_path = export_numpy_weights(model, backend_model_path(model_path, 'numpy'))
+    max_diff = check_parity(model, NumpyBackend(weights_path))
+    print(f"NumPy weights saved to {weights_path} (max diff vs Keras: {max_diff:.2e})")
 
     return model_path
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the gesture recognition models")
+    parser.add_argument('--dataset',
+                        help="landmark dataset directory to train from (see landmark_dataset.py)")
+    parser.add_argument('--dummy-dataset', action='store_true',
+                        help="first write the dummy data into --dataset")
+    parser.add_argument('--batch-size', type=int, default=32, help="training batch size")
+    parser.add_argument('--threads', type=int, default=0,
+                        help="TensorFlow CPU threads per op (default: let TensorFlow pick)")
+    parser.add_argument('--no-augment', action='store_true',
+                        help="train without random landmark augmentation")
+    parser.add_argument('--sequence', action='store_true',
+                        help="also train the sliding-window model for dynamic signs")
+    parser.add_argument('--window-size', type=int, default=30,
+                        help="frames per window for the sequence model")
+    args = parser.parse_args()
+
+    configure_cpu_threads(args.threads)
+
     # Create models directory if it doesn't exist
     os.makedirs('models', exist_ok=True)
 
+    if args.dummy_dataset:
+        if not args.dataset:
+            parser.error("--dummy-dataset needs --dataset")
+        write_dummy_dataset(args.dataset)
+
     # Train and save model
-    model_path = train_and_save_model()
+    model_path = train_and_save_model(args.dataset, args.batch_size, not args.no_augment)
+
+    if args.sequence:
+        sequence_model_path = train_and_save_sequence_model(args.window_size, args.batch_size,
+                                                            not args.no_augment)
+        print(f"Sequence model saved at: {sequence_model_path}")
 
     print("\nModel training complete!")
     print(f"Model saved at: {model_path}")
@@ -1,13 +1,22 @@
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import StreamingResponse, HTMLResponse
+from fastapi import FastAPI, Request, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse, HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import cv2
 import asyncio
 import json
-import time
 from camera_capture import CameraCapture
+from async_pipeline import AsyncFramePipeline
+from frame_pipeline import FramePipeline, make_error_frame, make_message_frame, multipart_chunk
+from gesture_events import GestureEventEngine, ONSET
 from gesture_recognition import GestureRecognition
+from landmark_stream import LandmarkBroadcaster, sse_message
+from metrics import REGISTRY, register_component_metrics
+from hand_roi import HandROITracker
+from recognition_scheduler import AdaptiveScheduler
+from startup import (CAMERA_SOURCE, DEFAULT_MODEL_PATH, PREDICTION_CACHE, ROI_TRACKING,
+                     SEQUENCE_MODEL_PATH, StartupTracker)
+from stream_encoder import encode_jpeg
 from text_to_speech import TextToSpeech
 
 app = FastAPI(title="Sign2Text API", description="AI-powered sign language recognition with voice output")
@@ -15,81 +24,111 @@ app = FastAPI(title="Sign2Text API", description="AI-powered sign language recog
 # Global variables for shared state
 camera = None
 gesture_recognizer = None
+gesture_events = None
 tts = None
 current_language = "english"
 last_gesture = ""
-last_speech_time = 0
 speech_cooldown = 2
+video_pipeline = None
+startup = StartupTracker()
+# Landmarks, gesture events and status pushed to /landmarks and /ws/landmarks clients
+landmark_stream = LandmarkBroadcaster()
 
-async def initialize_components():
-    """Initialize camera, gesture recognition, and TTS components"""
-    global camera, gesture_recognizer, tts
+register_component_metrics(lambda: camera, lambda: video_pipeline, lambda: tts, startup,
+                           pipeline_stages=AsyncFramePipeline.QUEUED_STAGES,
+                           landmark_stream=landmark_stream,
+                           get_recognizer=lambda: gesture_recognizer)
 
-    try:
-        camera = CameraCapture()
+def publish_status():
+    """Push the language, last gesture and readiness to landmark stream clients"""
+    landmark_stream.publish_status(language=current_language, last_gesture=last_gesture,
+                                   ready=startup.is_ready, phase=startup.phase)
+
+def load_components(tracker):
+    """Open the camera, build and warm up the recognizer and create the video pipeline.
+
+    Runs on the startup thread so the server answers requests meanwhile.
+    """
+    global camera, gesture_recognizer, gesture_events, video_pipeline
+
+    with tracker.step('camera'):
+        camera = CameraCapture(CAMERA_SOURCE or 0, threaded=True)
         camera.start_capture()
-        print("Camera initialized")
-    except Exception as e:
-        print(f"Camera initialization failed: {e}")
-        return False
+    print("Camera initialized")
 
-    gesture_recognizer = GestureRecognition()
+    with tracker.step('recognizer'):
+        gesture_recognizer = GestureRecognition(DEFAULT_MODEL_PATH, scheduler=AdaptiveScheduler(),
+                                                roi_tracker=HandROITracker() if ROI_TRACKING else None)
+        if SEQUENCE_MODEL_PATH:
+            gesture_recognizer.load_sequence_model(SEQUENCE_MODEL_PATH)
+        if PREDICTION_CACHE:
+            gesture_recognizer.enable_prediction_cache()
+
+    with tracker.step('warmup'):
+        gesture_recognizer.warm_up()
     print("Gesture recognition initialized")
 
+    # Smoothed onset/offset events decide when to speak
+    gesture_events = GestureEventEngine(gesture_recognizer.labels, cooldown=speech_cooldown)
+
+    # One producer serves every /video_feed client; capture, recognition and
+    # encoding run on worker threads so control endpoints stay responsive
+    pipeline = FramePipeline(read_frame, gesture_recognizer,
+                             annotate=draw_overlay, on_gesture=speak_gesture,
+                             max_fps=10, landmark_stream=landmark_stream)
+    video_pipeline = AsyncFramePipeline(pipeline)
+
+def read_frame():
+    """Read (frame, capture_timestamp) from the camera"""
+    frame, _, timestamp = camera.read_latest()
+    return frame, timestamp
+
+async def initialize_components():
+    """Initialize TTS and start loading the camera and gesture recognition in the background"""
+    global tts
+
     tts = TextToSpeech()
     print("Text-to-speech initialized")
 
+    publish_status()
+    startup.start(load_components, on_done=lambda tracker: publish_status())
     return True
 
-async def generate_frames():
-    """Generate video frames for web streaming"""
-    global last_gesture, last_speech_time
-
-    while True:
-        try:
-            frame = camera.get_frame()
-            gesture, frame_with_landmarks = gesture_recognizer.process_frame(frame)
-
-            # Display gesture on frame
-            cv2.putText(frame_with_landmarks, f"Gesture: {gesture}",
-                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            cv2.putText(frame_with_landmarks, f"Language: {current_language}",
-                       (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-
-            # Speak gesture if it's different and enough time has passed
-            current_time = time.time()
-            if (gesture != last_gesture and
-                gesture not in ["No model loaded", "Unknown gesture"] and
-                current_time - last_speech_time > speech_cooldown):
-
-                # Translate common gestures to Hindi if needed
-                if current_language == 'hindi':
-                    translations = {
-                        'hello': 'नमस्ते',
-                        'thank you': 'धन्यवाद',
-                        'please': 'कृपया'
-                    }
-                    speech_text = translations.get(gesture.lower(), gesture)
-                else:
-                    speech_text = gesture
+def draw_overlay(frame_with_landmarks, gesture):
+    """Display gesture and language on frame"""
+    cv2.putText(frame_with_landmarks, f"Gesture: {gesture}",
+               (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    cv2.putText(frame_with_landmarks, f"Language: {current_language}",
+               (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
 
-                print(f"Detected: {gesture}")
-                tts.speak(f"This is {speech_text}")
-                last_gesture = gesture
-                last_speech_time = current_time
+def speak_gesture(gesture):
+    """Speak a gesture once it has stably appeared"""
+    global last_gesture
 
-            # Encode frame for web streaming
-            ret, buffer = cv2.imencode('.jpg', frame_with_landmarks)
-            frame_bytes = buffer.tobytes()
+    for event in gesture_events.update(gesture, gesture_recognizer.last_confidence):
+        landmark_stream.publish_event(event)
+        if event.kind == ONSET:
+            print(f"Detected: {event.gesture}")
+            tts.speak_gesture(event.gesture)
+            last_gesture = event.gesture
+            publish_status()
 
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-
-            await asyncio.sleep(0.1)  # Small delay to prevent overwhelming
+async def generate_frames():
+    """Generate video frames for web streaming"""
+    # Show the startup phase until the camera and recognizer are ready; the
+    # wait returns as soon as startup finishes
+    loop = asyncio.get_running_loop()
+    while not await loop.run_in_executor(None, startup.wait_until_ready, 0.5):
+        if startup.failed:
+            frame = make_error_frame(f"startup failed ({startup.error})")
+        else:
+            frame = make_message_frame(f"Starting up: {startup.phase}...")
+        yield multipart_chunk(encode_jpeg(frame))
+        if startup.failed:
+            return
 
-        except Exception as e:
-            print(f"Error generating frame: {e}")
-            break
+    async for chunk in video_pipeline.frames():
+        yield chunk
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
@@ -172,17 +211,20 @@ async def home(request: Request):
                 }
             }
 
-            setInterval(async () => {
-                try {
-                    const response = await fetch('/status');
-                    const data = await response.json();
-                    document.getElementById('current-language').textContent =
-                        data.language === 'english' ? 'English' : 'हिंदी';
-                    document.getElementById('last-gesture').textContent = data.last_gesture || '-';
-                } catch (error) {
-                    console.error('Error updating status:', error);
+            // Status and gesture events are pushed by the server; EventSource reconnects on its own
+            const updates = new EventSource('/landmarks?frames=0');
+            updates.addEventListener('status', (message) => {
+                const data = JSON.parse(message.data);
+                document.getElementById('current-language').textContent =
+                    data.language === 'english' ? 'English' : 'हिंदी';
+                document.getElementById('last-gesture').textContent = data.last_gesture || '-';
+            });
+            updates.addEventListener('gesture', (message) => {
+                const event = JSON.parse(message.data);
+                if (event.event === 'onset') {
+                    document.getElementById('last-gesture').textContent = event.gesture;
                 }
-            }, 1000);
+            });
         </script>
     </body>
     </html>
@@ -194,6 +236,60 @@ async def video_feed():
     return StreamingResponse(generate_frames(),
                            media_type='multipart/x-mixed-replace; boundary=frame')
 
+async def landmark_messages(frames=True):
+    """Yield (type, json) landmark stream messages for one client.
+
+    A client that wants per-frame messages counts as a pipeline subscriber
+    once startup is ready, so recognition runs (without any JPEG encoding)
+    even if nobody watches the video. Events-only clients (frames=False)
+    never start the camera themselves. Yields None after 15 s without
+    messages, for keep-alives.
+    """
+    cursor = landmark_stream.cursor()
+    subscribed = None
+    try:
+        while True:
+            if frames and subscribed is None and startup.is_ready:
+                subscribed = video_pipeline
+                subscribed.subscribe()
+            cursor, messages = await landmark_stream.wait_async(cursor, frames, timeout=15.0)
+            if not messages:
+                yield None
+            for message in messages:
+                yield message
+    finally:
+        if subscribed is not None:
+            subscribed.unsubscribe()
+
+async def generate_landmark_events(frames=True):
+    """Format landmark stream messages as Server-Sent Events"""
+    async for message in landmark_messages(frames):
+        # A comment line keeps proxies from closing an idle connection
+        yield sse_message(message) if message is not None else ": keep-alive\n\n"
+
+@app.get("/landmarks")
+async def landmarks(frames: int = 1):
+    """Push per-frame landmarks, gesture events and status updates as Server-Sent Events.
+
+    ?frames=0 leaves out the per-frame messages (events and status only).
+    """
+    return StreamingResponse(generate_landmark_events(bool(frames)), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.websocket("/ws/landmarks")
+async def landmarks_websocket(websocket: WebSocket, frames: int = 1):
+    """Push the same messages as /landmarks over a WebSocket, one JSON text message each"""
+    await websocket.accept()
+    messages = landmark_messages(bool(frames))
+    try:
+        async for message in messages:
+            # Keep-alives also reveal a closed connection while nothing else is sent
+            await websocket.send_text(message[1] if message is not None else '{"type":"keepalive"}')
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await messages.aclose()
+
 @app.post("/set_language")
 async def set_language(request: Request):
     """Set the language for speech output"""
@@ -205,6 +301,7 @@ async def set_language(request: Request):
         if language in ['english', 'hindi']:
             tts.set_language(language)
             current_language = language
+            publish_status()
             return {"success": True, "language": language}
         else:
             raise HTTPException(status_code=400, detail="Invalid language")
@@ -217,9 +314,16 @@ async def get_status():
     return {
         "language": current_language,
         "last_gesture": last_gesture,
-        "available_languages": tts.get_available_languages() if tts else []
+        "available_languages": tts.get_available_languages() if tts else [],
+        "ready": startup.is_ready,
+        "startup": startup.get_status()
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: per-stage latency histograms, frame and queue counters"""
+    return PlainTextResponse(REGISTRY.render(), media_type='text/plain; version=0.0.4')
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize components on startup"""
@@ -227,6 +331,12 @@ async def startup_event():
     if not success:
         print("Warning: Some components failed to initialize")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the video pipeline on shutdown"""
+    if video_pipeline is not None:
+        await video_pipeline.stop()
+
 if __name__ == "__main__":
     import uvicorn
     print("Starting FastAPI server...")
@@ -0,0 +1,88 @@
+import queue
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class FrameBufferPool:
+    """Fixed pool of preallocated frame buffers that pipeline stages borrow and return.
+
+    All buffers live in one (capacity, *shape) array, optionally backed by a
+    multiprocessing.shared_memory block so other processes can attach to the
+    same frames by name. Stages refer to a buffer by its slot index, which is
+    cheap to pass between threads or processes.
+    """
+
+    def __init__(self, shape, capacity=4, dtype=np.uint8, shared=False, name=None):
+        self.shape = tuple(shape)
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+
+        pool_shape = (capacity,) + self.shape
+        self._shm = None
+        self._owner = name is None
+        if shared or name is not None:
+            size = int(np.prod(pool_shape)) * self.dtype.itemsize
+            if self._owner:
+                self._shm = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                self._shm = shared_memory.SharedMemory(name=name)
+            self.buffers = np.ndarray(pool_shape, dtype=self.dtype, buffer=self._shm.buf)
+        else:
+            self.buffers = np.empty(pool_shape, dtype=self.dtype)
+
+        self._free_slots = queue.Queue()
+        for slot in range(capacity):
+            self._free_slots.put(slot)
+
+    @classmethod
+    def attach(cls, name, shape, capacity, dtype=np.uint8):
+        """Attach to a shared pool created in another process"""
+        return cls(shape, capacity=capacity, dtype=dtype, name=name)
+
+    @property
+    def name(self):
+        """Name of the shared memory block, or None for a process-local pool"""
+        return self._shm.name if self._shm is not None else None
+
+    def fits(self, frame):
+        """Check whether a frame can be stored in this pool's buffers"""
+        return frame.shape == self.shape and frame.dtype == self.dtype
+
+    def acquire(self, timeout=None):
+        """Borrow a free slot, waiting up to timeout seconds; returns None if none is free"""
+        try:
+            if timeout == 0:
+                return self._free_slots.get_nowait()
+            return self._free_slots.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def release(self, slot):
+        """Return a borrowed slot to the pool"""
+        self._free_slots.put(slot)
+
+    def available(self):
+        """Number of slots currently free"""
+        return self._free_slots.qsize()
+
+    @contextmanager
+    def borrow(self, timeout=None):
+        """Borrow a slot for the duration of a with-block, yielding (slot, buffer)"""
+        slot = self.acquire(timeout)
+        if slot is None:
+            raise RuntimeError("No free frame buffer available")
+        try:
+            yield slot, self.buffers[slot]
+        finally:
+            self.release(slot)
+
+    def close(self):
+        """Release shared memory (and unlink it if this pool created it)"""
+        if self._shm is not None:
+            del self.buffers
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+            self._shm = None
@@ -0,0 +1,218 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from metrics import stage_timer
+from stream_encoder import AdaptiveStreamController, FrameRateMeter, SharedFrameEncoder, encode_jpeg
+
+
+def multipart_chunk(frame_bytes):
+    """Wrap JPEG bytes as one part of a multipart/x-mixed-replace stream"""
+    return (b'--frame\r\n'
+            b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+
+
+def make_message_frame(message, color=(255, 255, 255)):
+    """Create a blank frame showing a message"""
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    cv2.putText(frame, message, (50, 240),
+               cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
+    return frame
+
+
+def make_error_frame(message):
+    """Create a frame showing an error message"""
+    return make_message_frame(f"Error: {message}", (0, 0, 255))
+
+
+def viewer_profiles(controllers):
+    """Count viewers per stream profile name"""
+    counts = {}
+    for controller in list(controllers):
+        counts[controller.profile.name] = counts.get(controller.profile.name, 0) + 1
+    return counts
+
+
+class FramePipeline:
+    """Single capture-and-recognize producer shared by every video stream viewer.
+
+    One background thread captures a frame, runs gesture recognition and draws
+    the overlay, then publishes the annotated frame as the latest one. Viewers
+    wait for a newer frame id and always receive the most recent frame, so a
+    slow client skips frames instead of holding back the producer, and the
+    recognition cost does not grow with the number of viewers. Each viewer
+    gets its own adaptive stream profile (JPEG quality, scale, frame rate, see
+    stream_encoder.py) and every frame is encoded once per profile in use. The
+    producer idles while nobody is subscribed.
+    """
+
+    def __init__(self, get_frame, recognizer, annotate=None, on_gesture=None, max_fps=30,
+                 landmark_stream=None):
+        # Returns (frame, capture_timestamp), the timestamp on the time.time() clock
+        self.get_frame = get_frame
+        self.recognizer = recognizer
+        self.annotate = annotate
+        self.on_gesture = on_gesture
+        # Optional LandmarkBroadcaster that gets every frame's landmarks and label
+        self.landmark_stream = landmark_stream
+        self.max_fps = max_fps
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.encoder = SharedFrameEncoder()
+        # Viewers' stream controllers follow the measured publish rate, not max_fps
+        self.publish_rate = FrameRateMeter(max_fps or 30)
+
+        self._condition = threading.Condition()
+        self.num_subscribers = 0
+        self.viewers = set()
+        self.frame_id = 0
+        self.latest_frame = None
+        self.latest_gesture = None
+        self.errors = 0
+
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start the producer thread if it is not already running"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._produce_frames, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the producer thread"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def subscribe(self, controller=None):
+        """Register a viewer (and its stream controller), starting the producer on first use"""
+        with self._condition:
+            self.num_subscribers += 1
+            if controller is not None:
+                self.viewers.add(controller)
+            self._condition.notify_all()
+        self.start()
+
+    def unsubscribe(self, controller=None):
+        """Unregister a viewer"""
+        with self._condition:
+            self.num_subscribers = max(0, self.num_subscribers - 1)
+            self.viewers.discard(controller)
+
+    def capture(self):
+        """Capture stage: grab the next frame; returns (frame, capture_timestamp)"""
+        with stage_timer('capture'):
+            return self.get_frame()
+
+    def recognize(self, frame, out=None, timestamp=None):
+        """Recognition stage: detect the gesture and draw the overlay (into out if given).
+
+        timestamp is the frame's capture time, which its landmark message carries.
+        """
+        gesture, frame_with_landmarks = self.recognizer.process_frame(frame, out=out)
+        if self.landmark_stream is not None:
+            self.landmark_stream.publish_frame(self.recognizer, timestamp)
+        if self.annotate is not None:
+            self.annotate(frame_with_landmarks, gesture)
+        if self.on_gesture is not None:
+            self.on_gesture(gesture)
+        return gesture, frame_with_landmarks
+
+    def encode(self, frame, profile=None):
+        """Encoding stage: compress an annotated frame with a stream profile"""
+        return encode_jpeg(frame, profile)
+
+    def publish(self, frame, gesture):
+        """Make a new annotated frame the latest one and wake up waiting viewers.
+
+        The frame must not be modified afterwards; viewers encode it on their own threads.
+        """
+        with self._condition:
+            self.frame_id += 1
+            self.latest_frame = frame
+            self.latest_gesture = gesture
+            self.publish_rate.tick(time.perf_counter())
+            self._condition.notify_all()
+
+    def _produce_frames(self):
+        """Capture, recognize and publish frames in background thread; viewers encode them"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self.num_subscribers > 0 or not self._running)
+                if not self._running:
+                    break
+
+            start_time = time.time()
+            try:
+                frame, timestamp = self.capture()
+                # Without out, process_frame draws on a new copy: viewers may still
+                # be encoding the previous frame while the camera reuses its buffer
+                gesture, frame_with_landmarks = self.recognize(frame, timestamp=timestamp)
+                self.publish(frame_with_landmarks, gesture)
+            except Exception as e:
+                print(f"Error generating frame: {e}")
+                self.errors += 1
+                self.publish(make_error_frame(str(e)), None)
+                time.sleep(1)
+                continue
+
+            # Don't outrun the configured frame rate (e.g. for placeholder frames)
+            elapsed = time.time() - start_time
+            if elapsed < self.min_interval:
+                time.sleep(self.min_interval - elapsed)
+
+    def wait_for_frame(self, last_frame_id, timeout=1.0, stride=1):
+        """Wait for a frame at least stride frames newer than last_frame_id.
+
+        Returns (frame_id, frame); frame is None if no such frame was
+        published before the timeout.
+        """
+        with self._condition:
+            has_new_frame = self._condition.wait_for(
+                lambda: self.frame_id >= last_frame_id + stride, timeout)
+            if not has_new_frame:
+                return last_frame_id, None
+            return self.frame_id, self.latest_frame
+
+    def frames(self):
+        """Yield multipart JPEG chunks for one viewer, always skipping to the latest frame.
+
+        The viewer's profile adapts to how long its frames take to send;
+        cheaper profiles also skip published frames to lower the frame rate.
+        """
+        controller = AdaptiveStreamController(pipeline_fps=self.publish_rate.fps)
+        self.subscribe(controller)
+        try:
+            frame_id = 0
+            while True:
+                controller.pipeline_fps = self.publish_rate.fps
+                frame_id, frame = self.wait_for_frame(frame_id, stride=controller.frame_stride)
+                if frame is None:
+                    continue
+                chunk = multipart_chunk(self.encoder.encode(frame_id, frame, controller.profile))
+                sent_at = time.perf_counter()
+                yield chunk
+                now = time.perf_counter()
+                controller.frame_sent(len(chunk), now - sent_at, now)
+        finally:
+            self.unsubscribe(controller)
+
+    def get_stats(self):
+        """Return pipeline statistics"""
+        with self._condition:
+            stats = {
+                'frames_published': self.frame_id,
+                'subscribers': self.num_subscribers,
+                'errors': self.errors,
+                'viewer_profiles': viewer_profiles(self.viewers)
+            }
+        stats.update(self.encoder.get_stats())
+        return stats
@@ -0,0 +1,317 @@
+import os
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+# URI scheme -> query options it accepts
+SOURCE_OPTIONS = {
+    'device': {'fps'},
+    'file': {'loop', 'realtime', 'cache'},
+    'images': {'fps', 'loop', 'realtime', 'cache'},
+    'synthetic': {'fps', 'realtime', 'width', 'height', 'frames'}
+}
+
+# Network streams that OpenCV opens like a video file
+STREAM_SCHEMES = ('rtsp', 'rtmp', 'http', 'https', 'udp', 'tcp')
+
+
+class FrameSource:
+    """A stream of BGR frames, each with a timestamp on the time.time() clock.
+
+    read(out) returns (ok, frame, timestamp) and decodes into out when the
+    backend allows it. Recorded sources (video files, image directories,
+    synthetic frames) stamp frame n with start + n / fps, whether or not they
+    are paced; with realtime set they also sleep until that time, so they
+    behave like a camera. Without it frames come as fast as they can be
+    decoded, and CameraCapture stops dropping frames so every frame is
+    processed (see live). cache keeps decoded frames in memory, so looping
+    replays them without decoding again.
+    """
+
+    def __init__(self, fps=30.0, realtime=True, loop=False, cache=False):
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.cache = cache
+        self.position = 0
+        self.exhausted = False
+        self._start_time = None
+        self._cached_frames = []
+        self._replay_index = None
+
+    @property
+    def live(self):
+        """True when frames arrive on their own schedule and a slow reader misses some"""
+        return self.realtime
+
+    def isOpened(self):
+        return True
+
+    def _read_frame(self, out):
+        """Decode the next frame: (ok, frame); frame may or may not be out"""
+        raise NotImplementedError
+
+    def _rewind(self):
+        """Restart from the first frame; return False if that is not possible"""
+        return False
+
+    def _next_frame(self, out):
+        if self._replay_index is not None:
+            if self._replay_index == len(self._cached_frames):
+                return False, None
+            frame = self._cached_frames[self._replay_index]
+            self._replay_index += 1
+            # Cached frames are reused on every loop, so never hand them out
+            if out is not None and out.shape == frame.shape:
+                out[...] = frame
+                return True, out
+            return True, frame.copy()
+
+        ok, frame = self._read_frame(out)
+        if ok and self.cache:
+            self._cached_frames.append(frame.copy())
+        return ok, frame
+
+    def read(self, out=None):
+        if self.exhausted:
+            return False, None, None
+
+        ok, frame = self._next_frame(out)
+        if not ok and self.loop:
+            if self.cache and self._cached_frames:
+                self._replay_index = 0
+                ok, frame = self._next_frame(out)
+            elif self._rewind():
+                ok, frame = self._next_frame(out)
+        if not ok:
+            self.exhausted = True
+            return False, None, None
+
+        timestamp = self._frame_time()
+        self.position += 1
+        return True, frame, timestamp
+
+    def _frame_time(self):
+        """Timestamp of the current frame; sleeps until it when paced in real time"""
+        if self._start_time is None:
+            self._start_time = time.time()
+        timestamp = self._start_time + self.position / self.fps
+        if self.realtime:
+            delay = timestamp - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        return timestamp
+
+    def release(self):
+        self._cached_frames = []
+
+
+class DeviceSource(FrameSource):
+    """A camera device opened with cv2.VideoCapture; timestamps are read times"""
+
+    def __init__(self, index=0, width=640, height=480, fps=30.0):
+        super().__init__(fps=fps)
+        self.index = index
+        self.cap = cv2.VideoCapture(index)
+        if not self.cap.isOpened():
+            raise ValueError(f"Could not open camera with index {index}")
+
+        # Set camera properties for better performance
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.cap.set(cv2.CAP_PROP_FPS, fps)
+        # Keep the driver queue short; CameraCapture's ring buffer takes over buffering
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    @property
+    def live(self):
+        return True
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def read(self, out=None):
+        ret, frame = self.cap.read(out)
+        if not ret:
+            return False, None, None
+        return True, frame, time.time()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class VideoFileSource(FrameSource):
+    """Frames of a video file, paced at its frame rate unless realtime is off"""
+
+    def __init__(self, path, loop=False, realtime=True, cache=False):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise ValueError(f"Could not open video file {path}")
+        super().__init__(fps=self.cap.get(cv2.CAP_PROP_FPS) or 30.0, realtime=realtime,
+                         loop=loop, cache=cache)
+
+    def _read_frame(self, out):
+        return self.cap.read(out)
+
+    def _rewind(self):
+        # Seeking to frame 0 is unreliable for some codecs; reopening is not
+        self.cap.release()
+        self.cap = cv2.VideoCapture(self.path)
+        return self.cap.isOpened()
+
+    def release(self):
+        super().release()
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class ImageDirectorySource(FrameSource):
+    """Image files of a directory in name order, shown at a fixed frame rate"""
+
+    def __init__(self, path, fps=30.0, loop=False, realtime=True, cache=False):
+        super().__init__(fps=fps, realtime=realtime, loop=loop, cache=cache)
+        if not os.path.isdir(path):
+            raise ValueError(f"No image directory at {path}")
+        self.paths = sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.paths:
+            raise ValueError(f"No images found in {path}")
+        self._index = 0
+
+    def _read_frame(self, out):
+        while self._index < len(self.paths):
+            frame = cv2.imread(self.paths[self._index])
+            self._index += 1
+            if frame is not None:
+                return True, frame
+            print(f"Skipping unreadable image {self.paths[self._index - 1]}")
+        return False, None
+
+    def _rewind(self):
+        self._index = 0
+        return True
+
+
+class SyntheticSource(FrameSource):
+    """Endless generated frames: a bright disc moving over a noisy background.
+
+    A fixed set of frames is generated up front and cycled, so reading costs
+    a copy. Contains no hand; it exercises capture, recognition and encoding
+    timing, not recognition results.
+    """
+
+    def __init__(self, width=640, height=480, fps=30.0, num_frames=60, realtime=True, seed=0):
+        super().__init__(fps=fps, realtime=realtime, loop=True)
+        self.frames = synthetic_frames(num_frames, width, height, seed)
+
+    def _read_frame(self, out):
+        frame = self.frames[self.position % len(self.frames)]
+        if out is not None and out.shape == frame.shape:
+            out[...] = frame
+            return True, out
+        return True, frame.copy()
+
+
+def synthetic_frames(num_frames=60, width=640, height=480, seed=0):
+    """Generate frames with a bright disc moving over a noisy background"""
+    rng = np.random.default_rng(seed)
+    frames = rng.integers(0, 60, (num_frames, height, width, 3), dtype=np.uint8)
+    for i, frame in enumerate(frames):
+        center = (int(width * (0.3 + 0.4 * i / num_frames)), height // 2)
+        cv2.circle(frame, center, height // 8, (230, 230, 230), -1)
+    return frames
+
+
+def _flag(source, options, name, default):
+    value = options.get(name)
+    if value is None:
+        return default
+    if value.lower() in ('1', 'true', 'yes', 'on'):
+        return True
+    if value.lower() in ('0', 'false', 'no', 'off'):
+        return False
+    raise ValueError(f"Invalid {name}={value!r} in frame source {source!r} (expected 0 or 1)")
+
+
+def _number(source, options, name, default, cast=int):
+    value = options.get(name)
+    if value is None:
+        return default
+    try:
+        number = cast(value)
+    except ValueError:
+        number = None
+    if number is None or number <= 0:
+        raise ValueError(f"Invalid {name}={value!r} in frame source {source!r} "
+                         f"(expected a positive number)")
+    return number
+
+
+def open_source(source, width=640, height=480, fps=30.0):
+    """Open a frame source from a camera index, a path or a URI.
+
+    Supported forms:
+        0, '1', 'device:0'                      camera device
+        'file:clip.mp4?loop=1&realtime=0'       video file (a plain path also works)
+        'images:frames/?fps=15&loop=1'          image directory (a plain directory also works)
+        'synthetic:?width=320&height=240'       generated frames
+        'rtsp://host/stream'                    network stream opened by OpenCV
+    Options: loop, realtime and cache (0/1) for files and directories, fps for
+    directories and synthetic frames, width/height/frames for synthetic frames.
+    Already opened FrameSource objects are returned as they are. Anything
+    else (an unknown scheme or option, a missing path, a malformed value)
+    raises ValueError.
+    """
+    if isinstance(source, FrameSource):
+        return source
+    if isinstance(source, int) or str(source).lstrip('-').isdigit():
+        return DeviceSource(int(source), width, height, fps)
+
+    parts = urlsplit(source)
+    scheme = parts.scheme
+    path = parts.netloc + parts.path
+    if scheme in SOURCE_OPTIONS:
+        options = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        unknown = sorted(set(options) - SOURCE_OPTIONS[scheme])
+        if unknown:
+            raise ValueError(f"Unknown option {unknown[0]!r} for a {scheme}: frame source "
+                             f"(expected one of {', '.join(sorted(SOURCE_OPTIONS[scheme]))})")
+    # A scheme-less path, or a Windows drive letter that urlsplit took for a scheme
+    elif os.path.exists(source):
+        scheme, path = ('images' if os.path.isdir(source) else 'file'), source
+        options = {}
+    elif scheme in STREAM_SCHEMES:
+        scheme, path = 'file', source
+        options = {}
+    elif len(scheme) > 1:
+        raise ValueError(f"Unknown frame source scheme {scheme!r} in {source!r} "
+                         f"(expected device:, file:, images: or synthetic:)")
+    else:
+        raise ValueError(f"Frame source {source!r} is not a camera index, an existing file or "
+                         f"directory, or a device:, file:, images: or synthetic: URI")
+
+    fps = _number(source, options, 'fps', fps, float)
+    realtime = _flag(source, options, 'realtime', True)
+    loop = _flag(source, options, 'loop', False)
+    cache = _flag(source, options, 'cache', False)
+
+    if scheme == 'device':
+        if path and not path.isdigit():
+            raise ValueError(f"Invalid camera index {path!r} in frame source {source!r}")
+        return DeviceSource(int(path or 0), width, height, fps)
+    if scheme == 'file':
+        return VideoFileSource(path, loop=loop, realtime=realtime, cache=cache)
+    if scheme == 'images':
+        return ImageDirectorySource(path, fps=fps, loop=loop, realtime=realtime, cache=cache)
+    return SyntheticSource(_number(source, options, 'width', width),
+                           _number(source, options, 'height', height),
+                           fps=fps, num_frames=_number(source, options, 'frames', 60),
+                           realtime=realtime)
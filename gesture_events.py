@@ -0,0 +1,153 @@
+import time
+
+import numpy as np
+
+ONSET = 'onset'
+OFFSET = 'offset'
+
+
+class GestureEvent:
+    """A gesture starting (onset) or ending (offset)"""
+
+    def __init__(self, kind, gesture, confidence, timestamp):
+        self.kind = kind
+        self.gesture = gesture
+        self.confidence = confidence
+        self.timestamp = timestamp
+
+    def to_dict(self):
+        return {
+            'event': self.kind,
+            'gesture': self.gesture,
+            'confidence': self.confidence,
+            'timestamp': self.timestamp
+        }
+
+    def __repr__(self):
+        return f"GestureEvent({self.kind!r}, {self.gesture!r}, {self.confidence:.2f})"
+
+
+class GestureEventEngine:
+    """Smooth per-frame predictions and turn them into debounced onset/offset events.
+
+    Each frame's label (with its confidence) is folded into a per-class score,
+    either an exponential moving average ('ema') or the vote share over the
+    last window_size frames ('majority'). Both updates touch only the class
+    that was predicted, so the per-frame cost is O(1) in the number of
+    classes. A gesture starts once its score has stayed above on_threshold for
+    min_onset_frames frames and ends when it drops below off_threshold; the gap
+    between the two thresholds stops the label flickering. The same gesture
+    cannot start again within cooldown seconds of its last onset.
+    """
+
+    def __init__(self, labels, mode='ema', alpha=0.3, window_size=9, on_threshold=0.6,
+                 off_threshold=0.3, min_onset_frames=3, cooldown=2.0):
+        if mode not in ('ema', 'majority'):
+            raise ValueError(f"Unknown smoothing mode: {mode}")
+
+        self.labels = labels
+        self.label_index = {label: i for i, label in enumerate(labels)}
+        self.mode = mode
+        self.alpha = alpha
+        self.window_size = window_size
+        self.on_threshold = on_threshold
+        self.off_threshold = off_threshold
+        self.min_onset_frames = min_onset_frames
+        self.cooldown = cooldown
+
+        # EMA scores are stored divided by a shared decay factor so a frame
+        # only has to update one entry instead of decaying every class
+        self._scores = np.zeros(len(labels), dtype=np.float64)
+        self._scale = 1.0
+
+        # Majority vote: ring buffer of recent class indices and per-class counts
+        self._recent = np.full(window_size, -1, dtype=np.int64)
+        self._counts = np.zeros(len(labels), dtype=np.int64)
+        self._position = 0
+
+        self.active_gesture = None
+        self._candidate = None
+        self._candidate_frames = 0
+        self._last_onset_times = {}
+
+    def score(self, gesture):
+        """Current smoothed score of a gesture"""
+        index = self.label_index.get(gesture)
+        if index is None:
+            return 0.0
+        if self.mode == 'ema':
+            return float(self._scores[index] * self._scale)
+        return float(self._counts[index] / self.window_size)
+
+    def _observe(self, index, confidence):
+        """Fold one frame's prediction (index -1 for no gesture) into the scores"""
+        if self.mode == 'ema':
+            self._scale *= 1.0 - self.alpha
+            if index >= 0:
+                self._scores[index] += self.alpha * confidence / self._scale
+            if self._scale < 1e-6:
+                self._scores *= self._scale
+                self._scale = 1.0
+        else:
+            outgoing = self._recent[self._position]
+            if outgoing >= 0:
+                self._counts[outgoing] -= 1
+            self._recent[self._position] = index
+            if index >= 0:
+                self._counts[index] += 1
+            self._position = (self._position + 1) % self.window_size
+
+    def update(self, gesture, confidence=1.0, timestamp=None):
+        """Feed one frame's label; returns the list of events it triggered.
+
+        Labels that aren't gesture classes ("Unknown gesture", "No model
+        loaded", None) count as frames without a gesture.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        index = self.label_index.get(gesture, -1)
+        self._observe(index, confidence)
+
+        events = []
+        if self.active_gesture is not None:
+            active_score = self.score(self.active_gesture)
+            if active_score < self.off_threshold or (
+                    index >= 0 and gesture != self.active_gesture and
+                    self.score(gesture) > active_score):
+                events.append(GestureEvent(OFFSET, self.active_gesture, active_score, timestamp))
+                self.active_gesture = None
+
+        # Only the class predicted this frame can have crossed the onset threshold
+        if index >= 0 and gesture != self.active_gesture and self.score(gesture) >= self.on_threshold:
+            if gesture == self._candidate:
+                self._candidate_frames += 1
+            else:
+                self._candidate = gesture
+                self._candidate_frames = 1
+        elif gesture != self._candidate:
+            self._candidate = None
+            self._candidate_frames = 0
+
+        if self._candidate is not None and self._candidate_frames >= self.min_onset_frames:
+            last_onset = self._last_onset_times.get(self._candidate)
+            if last_onset is None or timestamp - last_onset > self.cooldown:
+                if self.active_gesture is not None:
+                    events.append(GestureEvent(OFFSET, self.active_gesture,
+                                               self.score(self.active_gesture), timestamp))
+                self.active_gesture = self._candidate
+                self._last_onset_times[self._candidate] = timestamp
+                events.append(GestureEvent(ONSET, self._candidate, self.score(self._candidate), timestamp))
+            self._candidate = None
+            self._candidate_frames = 0
+
+        return events
+
+    def reset(self):
+        """Clear smoothing state and the active gesture"""
+        self._scores[:] = 0
+        self._scale = 1.0
+        self._recent[:] = -1
+        self._counts[:] = 0
+        self._position = 0
+        self.active_gesture = None
+        self._candidate = None
+        self._candidate_frames = 0
@@ -0,0 +1,24 @@
+import json
+import os
+
+
+def labels_path(model_path):
+    """Return the label file saved next to a model (gesture_model.h5 -> gesture_model.labels.json)"""
+    return os.path.splitext(model_path)[0] + '.labels.json'
+
+
+def save_labels(model_path, labels):
+    """Write a model's class names, in output order, next to the model"""
+    path = labels_path(model_path)
+    with open(path, 'w') as f:
+        json.dump({'labels': list(labels)}, f, indent=2)
+    return path
+
+
+def load_labels(model_path):
+    """Load the class names saved with a model, or None for models saved without them"""
+    path = labels_path(model_path)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)['labels']
@@ -1,25 +1,76 @@
 import cv2
-import mediapipe as mp
 import numpy as np
-from tensorflow.keras.models import load_model
-import os
+from hand_landmarks import NUM_LANDMARKS, LandmarkExtractor
+from inference_backend import load_backend
+from gesture_labels import load_labels
+from inference_engine import BatchInferenceEngine, decode_prediction
+from landmark_features import LandmarkTransform
+from metrics import stage_timer
+from prediction_cache import PredictionCache, can_normalize
+from sequence_classifier import StreamingSequenceClassifier
 
 class GestureRecognition:
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, inference_engine=None, backend=None, max_num_hands=1,
+                 scheduler=None, roi_tracker=None, sequence_classifier=None,
+                 prediction_cache=None, static_image_mode=False):
+        # Imported here so importing this module stays cheap (the web servers
+        # construct the recognizer in the background, see startup.py)
+        import mediapipe as mp
+
         # Initialize MediaPipe Hands
         self.mp_hands = mp.solutions.hands
+        self.static_image_mode = static_image_mode
         self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
+            static_image_mode=static_image_mode,
+            max_num_hands=max_num_hands,
             min_detection_confidence=0.7,
             min_tracking_confidence=0.5
         )
         self.mp_draw = mp.solutions.drawing_utils
+        self.landmark_extractor = LandmarkExtractor(max_num_hands)
 
-        # Load the gesture recognition model
+        # Load the gesture recognition model with the configured backend
+        # ('keras', 'numpy' or 'tflite'; see inference_backend.py)
         self.model = None
-        if model_path and os.path.exists(model_path):
-            self.model = load_model(model_path)
+        # Feature transform saved with the model (None: the model takes raw landmarks)
+        self.feature_transform = None
+        if model_path:
+            try:
+                self.model = load_backend(model_path, backend)
+                self.feature_transform = LandmarkTransform.for_model(model_path)
+            except FileNotFoundError as e:
+                print(f"Gesture model not loaded: {e}")
+
+        # Landmarks of every hand found in the last processed frame
+        self.last_hands = None
+        self.last_gesture = None
+        self.last_confidence = 0.0
+
+        # Optional AdaptiveScheduler that skips detection/classification on static frames
+        self.scheduler = scheduler
+
+        # Optional HandROITracker that feeds MediaPipe a crop around the hand
+        self.roi_tracker = roi_tracker
+
+        # Optional StreamingSequenceClassifier for dynamic (motion) signs
+        self.sequence_classifier = sequence_classifier
+        self._last_frame_gesture = None
+        self._last_frame_confidence = 0.0
+
+        # Reused RGB conversion buffers, one per image shape (with an ROI tracker
+        # the detection image alternates between the crop and the search image)
+        self._rgb_buffers = {}
+
+        # Optional shared batching engine (see create_inference_engine)
+        self.inference_engine = inference_engine
+
+        # Optional PredictionCache in front of the classifier
+        if (prediction_cache is not None and prediction_cache.normalize and
+                not can_normalize(self.feature_transform)):
+            raise ValueError("The prediction cache normalizes landmarks, but the model "
+                             "is not position- and scale-invariant")
+        self.prediction_cache = prediction_cache
+        self.confidence_threshold = 0.7
 
         # Define gesture labels
         self.labels = [
@@ -33,43 +84,166 @@ class GestureRecognition:
         isl_signs = ['namaste', 'sorry', 'good', 'bad', 'eat', 'drink']
         self.labels.extend(isl_signs)
 
-    def extract_hand_landmarks(self, image):
-        """Extract hand landmarks from image using MediaPipe"""
-        # Convert BGR to RGB
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        # Class order saved with the model (create_model.py trains on the
+        # dataset's label order); older models use the list above
+        if self.inference_engine is not None:
+            self.labels = self.inference_engine.labels
+        elif self.model is not None:
+            self.labels = load_labels(model_path) or self.labels
+
+    def load_sequence_model(self, model_path, backend=None):
+        """Attach a StreamingSequenceClassifier for dynamic signs; a missing file is only reported"""
+        try:
+            self.sequence_classifier = StreamingSequenceClassifier(
+                model_path, load_labels(model_path) or self.labels, backend,
+                confidence_threshold=self.confidence_threshold)
+        except FileNotFoundError as e:
+            print(f"Sequence model not loaded: {e}")
+        return self.sequence_classifier
+
+    def enable_prediction_cache(self, **kwargs):
+        """Put a PredictionCache in front of the classifier, normalizing keys only if the model allows it"""
+        kwargs.setdefault('normalize', can_normalize(self.feature_transform))
+        self.prediction_cache = PredictionCache(**kwargs)
+        return self.prediction_cache
+
+    def reset(self):
+        """Forget per-stream state before processing an unrelated stream (e.g. the next video).
+
+        Clears MediaPipe's hand tracking, the ROI crop, the scheduler's and the
+        sequence window's history and the last landmarks and labels, so nothing
+        carries over from the previous frames.
+        """
+        if not self.static_image_mode:
+            # Restart MediaPipe's graph so it drops the hands it was tracking
+            self.hands.reset()
+        if self.roi_tracker is not None:
+            self.roi_tracker.reset()
+        if self.scheduler is not None:
+            self.scheduler.reset()
+        if self.sequence_classifier is not None:
+            self.sequence_classifier.reset()
+        self.last_hands = None
+        self.last_gesture = None
+        self.last_confidence = 0.0
+        self._last_frame_gesture = None
+        self._last_frame_confidence = 0.0
+
+    def warm_up(self, frame_shape=(480, 640, 3)):
+        """Run a blank frame through MediaPipe and the classifier so one-time setup
+        (graph initialization, Keras tracing) happens before the first real frame"""
+        self.hands.process(np.zeros(frame_shape, dtype=np.uint8))
+        if self.model is not None:
+            self.predict_batch(np.zeros((1, self.num_features), dtype=np.float32))
+
+    def extract_all_hands(self, image):
+        """Extract landmarks, world landmarks and handedness for every detected hand"""
+        detection_image = image
+        if self.roi_tracker is not None:
+            detection_image, transform = self.roi_tracker.prepare(image)
+
+        # Convert BGR to RGB into the reused buffer
+        with stage_timer('color_convert'):
+            rgb_buffer = self._rgb_buffers.get(detection_image.shape)
+            if rgb_buffer is None:
+                rgb_buffer = self._rgb_buffers[detection_image.shape] = np.empty_like(detection_image)
+            image_rgb = cv2.cvtColor(detection_image, cv2.COLOR_BGR2RGB, dst=rgb_buffer)
 
         # Process the image
-        results = self.hands.process(image_rgb)
+        with stage_timer('mediapipe'):
+            results = self.hands.process(image_rgb)
+        with stage_timer('feature_extraction'):
+            hands = self.landmark_extractor.extract(results)
 
-        if results.multi_hand_landmarks:
-            hand_landmarks = results.multi_hand_landmarks[0]  # Take first hand
+        if self.roi_tracker is not None:
+            if hands is not None:
+                self.roi_tracker.map_to_frame(hands, transform, image.shape)
+            self.roi_tracker.update(hands, image.shape)
+        return hands
 
-            # Extract landmark coordinates
-            landmarks = []
-            for landmark in hand_landmarks.landmark:
-                landmarks.extend([landmark.x, landmark.y, landmark.z])
+    def extract_hand_landmarks(self, image):
+        """Extract hand landmarks from image using MediaPipe.
 
-            return np.array(landmarks), results.multi_hand_landmarks[0]
-        return None, None
+        The landmark vector is a view into the extractor's reused buffer, so
+        the next frame overwrites it; copy it to keep it.
+        """
+        hands = self.extract_all_hands(image)
+        if hands is None:
+            return None, None
 
-    def predict_gesture(self, landmarks):
-        """Predict gesture from landmarks using the trained model"""
-        if self.model is None or landmarks is None:
-            return "No model loaded"
+        # Take first hand
+        return hands.feature_vector(0), hands.hand_landmarks[0]
 
-        # Reshape for model input
-        landmarks = landmarks.reshape(1, -1)
+    @property
+    def num_features(self):
+        """Length of the vectors the model takes"""
+        if self.feature_transform is not None:
+            return self.feature_transform.num_features
+        return 63
 
-        # Make prediction
-        predictions = self.model.predict(landmarks, verbose=0)
-        predicted_class = np.argmax(predictions[0])
-        confidence = predictions[0][predicted_class]
+    def model_features(self, landmarks):
+        """Apply the model's feature transform to a landmark vector or (N, 63) batch"""
+        if self.feature_transform is None:
+            return landmarks
+        return self.feature_transform(landmarks)
 
-        # Return prediction only if confidence is high enough
-        if confidence > 0.7:
-            return self.labels[predicted_class]
-        else:
-            return "Unknown gesture"
+    def predict_batch(self, features_batch):
+        """Run the model on a batch of model features and return class probabilities.
+
+        With the NumPy backend the result is a reused buffer that the next call
+        overwrites; copy it to keep it.
+        """
+        return self.model.predict(features_batch)
+
+    def create_inference_engine(self, max_batch_size=32, max_wait_ms=5.0):
+        """Create a batching engine around this model that other streams can share.
+
+        The engine takes raw landmark vectors and applies this model's feature
+        transform to each batch, so recognizers built with inference_engine=
+        need neither the model nor its transform.
+        """
+        if self.model is None:
+            raise RuntimeError("No model loaded")
+        return BatchInferenceEngine(
+            lambda landmarks_batch: self.predict_batch(self.model_features(landmarks_batch)),
+            self.labels,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            confidence_threshold=self.confidence_threshold,
+            num_features=NUM_LANDMARKS * 3
+        )
+
+    def classify(self, landmarks):
+        """Return (label, confidence) for a landmark vector"""
+        with stage_timer('classify'):
+            if self.prediction_cache is not None:
+                cache_key, result = self.prediction_cache.lookup(landmarks)
+                if result is not None:
+                    return result
+
+            if self.inference_engine is not None:
+                # The engine transforms the whole batch (see create_inference_engine)
+                result = self.inference_engine.predict(landmarks)
+            else:
+                # Make prediction
+                features = self.model_features(landmarks)
+                predictions = self.predict_batch(features.reshape(1, -1))
+                result = decode_prediction(predictions[0], self.labels, self.confidence_threshold)
+
+        if self.prediction_cache is not None:
+            self.prediction_cache.store(cache_key, result)
+        return result
+
+    def predict_with_confidence(self, landmarks):
+        """Return (gesture, confidence) for landmarks; confidence is 0.0 without a model or hand"""
+        if (self.model is None and self.inference_engine is None) or landmarks is None:
+            return "No model loaded", 0.0
+
+        return self.classify(landmarks)
+
+    def predict_gesture(self, landmarks):
+        """Predict gesture from landmarks using the trained model"""
+        return self.predict_with_confidence(landmarks)[0]
 
     def draw_hand_landmarks(self, image, hand_landmarks):
         """Draw hand landmarks on the image"""
@@ -83,12 +257,68 @@ class GestureRecognition:
             )
         return image
 
-    def process_frame(self, frame):
-        """Process a single frame and return gesture prediction"""
-        landmarks, hand_landmarks = self.extract_hand_landmarks(frame)
-        gesture = self.predict_gesture(landmarks)
+    def detect_hands(self, frame):
+        """Run hand detection, or reuse the last landmarks if the scheduler says the frame is static"""
+        if self.scheduler is not None and not self.scheduler.should_detect(frame):
+            return self.last_hands
+
+        hands = self.extract_all_hands(frame)
+        if self.scheduler is not None:
+            self.scheduler.record_detection(hands)
+        self.last_hands = hands
+        return hands
+
+    def classify_hands(self, landmarks):
+        """Predict the gesture for the current frame's landmarks.
+
+        The per-frame label is reused if the scheduler says the landmarks have
+        barely moved; a confident sequence-model label for a dynamic sign takes
+        precedence over it.
+        """
+        sequence_prediction = None
+        if self.sequence_classifier is not None:
+            # The window needs every frame, including ones the scheduler skips
+            if landmarks is None:
+                self.sequence_classifier.reset()
+            else:
+                sequence_prediction = self.sequence_classifier.update(landmarks)
+
+        if (self.scheduler is not None and landmarks is not None and
+                not self.scheduler.should_classify(landmarks)):
+            gesture, confidence = self._last_frame_gesture, self._last_frame_confidence
+        else:
+            if self.scheduler is not None:
+                self.scheduler.record_classification(landmarks)
+            gesture, confidence = self.predict_with_confidence(landmarks)
+        self._last_frame_gesture, self._last_frame_confidence = gesture, confidence
+
+        if sequence_prediction is not None and sequence_prediction[0] != "Unknown gesture":
+            gesture, confidence = sequence_prediction
+
+        self.last_gesture = gesture
+        self.last_confidence = float(confidence)
+        return gesture
+
+    def process_frame(self, frame, out=None):
+        """Process a single frame and return gesture prediction.
+
+        The landmarks are drawn on a copy of the frame, or into out if given
+        (pass the frame itself to annotate it in place without copying).
+        """
+        hands = self.detect_hands(frame)
+        landmarks = hands.feature_vector(0) if hands is not None else None
+        gesture = self.classify_hands(landmarks)
 
         # Draw landmarks on frame
-        frame_with_landmarks = self.draw_hand_landmarks(frame.copy(), hand_landmarks)
+        with stage_timer('draw'):
+            if out is None:
+                out = frame.copy()
+            elif out is not frame:
+                np.copyto(out, frame)
+            frame_with_landmarks = out
+            if hands is not None:
+                for hand_landmarks in hands.hand_landmarks:
+                    frame_with_landmarks = self.draw_hand_landmarks(frame_with_landmarks,
+                                                                    hand_landmarks)
 
         return gesture, frame_with_landmarks
\ No newline at end of file
@@ -0,0 +1,80 @@
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+
+class HandLandmarksResult:
+    """Landmarks for every hand MediaPipe detected in a frame.
+
+    landmarks and world_landmarks are (num_hands, 21, 3) float32 views into the
+    extractor's preallocated buffers and are overwritten by the next frame;
+    copy them if they need to outlive it.
+    """
+
+    def __init__(self, landmarks, world_landmarks, handedness, scores, hand_landmarks):
+        self.landmarks = landmarks
+        self.world_landmarks = world_landmarks
+        self.handedness = handedness
+        self.scores = scores
+        self.hand_landmarks = hand_landmarks
+
+    @property
+    def num_hands(self):
+        return len(self.landmarks)
+
+    def feature_vector(self, hand=0):
+        """Return the flat 63-value (x, y, z per landmark) vector the classifier expects"""
+        return self.landmarks[hand].reshape(-1)
+
+
+def fill_points(out, landmarks):
+    """Copy MediaPipe landmarks into a preallocated (21, 3) array.
+
+    Each coordinate column is filled by np.fromiter straight from the
+    landmark attributes, without building a tuple or list per landmark.
+    """
+    out[:, 0] = np.fromiter((lm.x for lm in landmarks), dtype=np.float32, count=NUM_LANDMARKS)
+    out[:, 1] = np.fromiter((lm.y for lm in landmarks), dtype=np.float32, count=NUM_LANDMARKS)
+    out[:, 2] = np.fromiter((lm.z for lm in landmarks), dtype=np.float32, count=NUM_LANDMARKS)
+    return out
+
+
+class LandmarkExtractor:
+    """Copy MediaPipe hand results into preallocated float32 arrays"""
+
+    def __init__(self, max_num_hands=2):
+        self.max_num_hands = max_num_hands
+        self._landmarks = np.zeros((max_num_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+        self._world_landmarks = np.zeros((max_num_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+
+    def extract(self, results):
+        """Build a HandLandmarksResult from MediaPipe Hands results, or None if no hand was found"""
+        hands = results.multi_hand_landmarks
+        if not hands:
+            return None
+
+        num_hands = min(len(hands), self.max_num_hands)
+        for i in range(num_hands):
+            fill_points(self._landmarks[i], hands[i].landmark)
+
+        world_landmarks = None
+        world_hands = getattr(results, 'multi_hand_world_landmarks', None)
+        if world_hands:
+            for i in range(num_hands):
+                fill_points(self._world_landmarks[i], world_hands[i].landmark)
+            world_landmarks = self._world_landmarks[:num_hands]
+
+        handedness = []
+        scores = []
+        for classification in (getattr(results, 'multi_handedness', None) or [])[:num_hands]:
+            category = classification.classification[0]
+            handedness.append(category.label)
+            scores.append(category.score)
+
+        return HandLandmarksResult(
+            self._landmarks[:num_hands],
+            world_landmarks,
+            handedness,
+            scores,
+            list(hands[:num_hands])
+        )
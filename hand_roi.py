@@ -0,0 +1,115 @@
+import cv2
+import numpy as np
+
+
+class HandROITracker:
+    """Crop and downscale frames to the region around the tracked hand before MediaPipe.
+
+    While a hand is tracked, detection runs on a fixed-size square crop around
+    the last hand position (padded so the hand can move), so its cost does not
+    depend on the camera resolution. When tracking is lost, it searches a
+    downscaled copy of the full frame. Landmarks found in either image are
+    mapped back to normalized full-frame coordinates.
+
+    The crop only moves when the hand gets close to its edge or changes size a
+    lot, which keeps MediaPipe's own frame-to-frame tracking consistent.
+    """
+
+    def __init__(self, padding=0.5, roi_size=256, search_width=320, recenter_margin=0.15):
+        self.padding = padding
+        self.roi_size = roi_size
+        self.search_width = search_width
+        self.recenter_margin = recenter_margin
+
+        # Current crop in pixels: (x0, y0, side), or None to search the full frame
+        self.roi = None
+        self._roi_buffer = np.zeros((roi_size, roi_size, 3), dtype=np.uint8)
+        self._search_buffer = None
+
+        self.stats = {'roi_frames': 0, 'search_frames': 0, 'lost': 0}
+
+    def prepare(self, frame):
+        """Return (detection_image, transform) for this frame.
+
+        transform is (x0, y0, width, height) of the detection image's footprint
+        in the full frame, in pixels.
+        """
+        frame_height, frame_width = frame.shape[:2]
+
+        if self.roi is not None:
+            x0, y0, side = self.roi
+            self.stats['roi_frames'] += 1
+            cv2.resize(frame[y0:y0 + side, x0:x0 + side], (self.roi_size, self.roi_size),
+                       dst=self._roi_buffer, interpolation=cv2.INTER_AREA)
+            return self._roi_buffer, (x0, y0, side, side)
+
+        self.stats['search_frames'] += 1
+        if frame_width <= self.search_width:
+            return frame, (0, 0, frame_width, frame_height)
+
+        search_height = round(frame_height * self.search_width / frame_width)
+        if self._search_buffer is None or self._search_buffer.shape[:2] != (search_height, self.search_width):
+            self._search_buffer = np.zeros((search_height, self.search_width, 3), dtype=np.uint8)
+        cv2.resize(frame, (self.search_width, search_height),
+                   dst=self._search_buffer, interpolation=cv2.INTER_AREA)
+        return self._search_buffer, (0, 0, frame_width, frame_height)
+
+    def map_to_frame(self, hands, transform, frame_shape):
+        """Map landmarks detected in the detection image back to full-frame coordinates (in place)"""
+        x0, y0, width, height = transform
+        frame_height, frame_width = frame_shape[:2]
+        if (x0, y0, width, height) == (0, 0, frame_width, frame_height):
+            return hands
+
+        scale = np.array([width / frame_width, height / frame_height, width / frame_width],
+                         dtype=np.float32)
+        offset = np.array([x0 / frame_width, y0 / frame_height, 0.0], dtype=np.float32)
+        hands.landmarks *= scale
+        hands.landmarks += offset
+
+        # Keep the MediaPipe landmark lists in sync for drawing
+        for hand_landmarks, points in zip(hands.hand_landmarks, hands.landmarks):
+            for landmark, (x, y, z) in zip(hand_landmarks.landmark, points.tolist()):
+                landmark.x = x
+                landmark.y = y
+                landmark.z = z
+        return hands
+
+    def update(self, hands, frame_shape):
+        """Update the crop from full-frame landmarks (None when no hand was found)"""
+        if hands is None:
+            if self.roi is not None:
+                self.stats['lost'] += 1
+            self.roi = None
+            return
+
+        frame_height, frame_width = frame_shape[:2]
+        xy = hands.landmarks[:, :, :2] * np.array([frame_width, frame_height], dtype=np.float32)
+        (hand_x0, hand_y0), (hand_x1, hand_y1) = xy.min(axis=(0, 1)), xy.max(axis=(0, 1))
+        hand_size = max(hand_x1 - hand_x0, hand_y1 - hand_y0)
+
+        side = int(min(hand_size * (1 + 2 * self.padding), frame_width, frame_height))
+        side = max(side, min(self.roi_size // 2, frame_width, frame_height))
+
+        if self.roi is not None:
+            x0, y0, current_side = self.roi
+            margin = current_side * self.recenter_margin
+            inside = (hand_x0 >= x0 + margin and hand_y0 >= y0 + margin and
+                      hand_x1 <= x0 + current_side - margin and hand_y1 <= y0 + current_side - margin)
+            if inside and 0.7 * current_side <= side <= 1.3 * current_side:
+                return
+
+        # Centre a square crop on the hand, shifted to stay inside the frame
+        center_x = (hand_x0 + hand_x1) / 2
+        center_y = (hand_y0 + hand_y1) / 2
+        x0 = int(np.clip(center_x - side / 2, 0, frame_width - side))
+        y0 = int(np.clip(center_y - side / 2, 0, frame_height - side))
+        self.roi = (x0, y0, side)
+
+    def reset(self):
+        """Drop the crop so the next frame searches the full frame"""
+        self.roi = None
+
+    def get_stats(self):
+        """Return counts of ROI and full-frame search frames"""
+        return dict(self.stats)
@@ -0,0 +1,231 @@
+import os
+import sys
+
+import numpy as np
+
+# Backend used when neither the constructor nor the environment selects one
+DEFAULT_BACKEND = os.environ.get('SIGN2TEXT_BACKEND', 'keras')
+BACKENDS = ['keras', 'numpy', 'tflite']
+
+BACKEND_EXTENSIONS = {
+    'keras': '.h5',
+    'numpy': '.npz',
+    'tflite': '.tflite'
+}
+
+ACTIVATIONS = ['linear', 'relu', 'sigmoid', 'tanh', 'softmax']
+
+
+def backend_model_path(model_path, backend):
+    """Return the file a backend loads for a given model path (gesture_model.h5 -> gesture_model.npz)"""
+    root, _ = os.path.splitext(model_path)
+    return root + BACKEND_EXTENSIONS[backend]
+
+
+class KerasBackend:
+    """Run the classifier through the full Keras model"""
+
+    def __init__(self, model_path):
+        from tensorflow.keras.models import load_model
+        self.model = load_model(model_path)
+
+    def predict(self, landmarks_batch):
+        """Return class probabilities for a (N, 63) batch"""
+        return np.asarray(self.model.predict_on_batch(landmarks_batch))
+
+
+class NumpyBackend:
+    """Pure-NumPy forward pass over Dense weights exported by export_numpy_weights().
+
+    Each layer writes into a preallocated output buffer, so a prediction does
+    no allocation once the buffers have grown to the largest batch seen. The
+    returned array is a view into those buffers and is only valid until the
+    next call to predict().
+    """
+
+    def __init__(self, weights_path, max_batch_size=32):
+        data = np.load(weights_path)
+        num_layers = int(data['num_layers'])
+
+        self.layers = []
+        for i in range(num_layers):
+            kernel = np.ascontiguousarray(data[f'kernel_{i}'], dtype=np.float32)
+            bias = np.ascontiguousarray(data[f'bias_{i}'], dtype=np.float32)
+            activation = str(data[f'activation_{i}'])
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation in {weights_path}: {activation}")
+            self.layers.append((kernel, bias, activation))
+
+        self.input_size = self.layers[0][0].shape[0]
+        self.num_classes = self.layers[-1][0].shape[1]
+        self._allocate(max_batch_size)
+
+    def _allocate(self, batch_size):
+        """(Re)allocate per-layer output buffers for up to batch_size rows"""
+        self.max_batch_size = batch_size
+        self._buffers = [np.empty((batch_size, kernel.shape[1]), dtype=np.float32)
+                         for kernel, _, _ in self.layers]
+        self._row_max = np.empty((batch_size, 1), dtype=np.float32)
+
+    def predict(self, landmarks_batch):
+        """Return class probabilities for a (N, 63) batch.
+
+        Unlike the other backends, the returned array is not new: it is a view
+        into the last layer's buffer, and the next predict() call overwrites
+        it. Decode it before predicting again, or copy it.
+        """
+        x = np.asarray(landmarks_batch, dtype=np.float32).reshape(-1, self.input_size)
+        batch_size = x.shape[0]
+        if batch_size > self.max_batch_size:
+            self._allocate(batch_size)
+
+        for (kernel, bias, activation), buffer in zip(self.layers, self._buffers):
+            out = buffer[:batch_size]
+            np.matmul(x, kernel, out=out)
+            out += bias
+
+            if activation == 'relu':
+                np.maximum(out, 0, out=out)
+            elif activation == 'sigmoid':
+                np.negative(out, out=out)
+                np.exp(out, out=out)
+                out += 1
+                np.reciprocal(out, out=out)
+            elif activation == 'tanh':
+                np.tanh(out, out=out)
+            elif activation == 'softmax':
+                row_max = self._row_max[:batch_size]
+                np.max(out, axis=1, keepdims=True, out=row_max)
+                out -= row_max
+                np.exp(out, out=out)
+                np.sum(out, axis=1, keepdims=True, out=row_max)
+                out /= row_max
+            x = out
+
+        return x
+
+
+class TFLiteBackend:
+    """Run the classifier through a TensorFlow Lite interpreter"""
+
+    def __init__(self, model_path):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+
+        self.interpreter = Interpreter(model_path=model_path)
+        self.interpreter.allocate_tensors()
+        self.input_index = self.interpreter.get_input_details()[0]['index']
+        self.output_index = self.interpreter.get_output_details()[0]['index']
+        self.input_shape = list(self.interpreter.get_input_details()[0]['shape'])
+
+    def predict(self, landmarks_batch):
+        """Return class probabilities for a (N, 63) batch"""
+        landmarks_batch = np.asarray(landmarks_batch, dtype=np.float32)
+
+        # Only re-plan the interpreter when the batch size changes
+        if landmarks_batch.shape[0] != self.input_shape[0]:
+            self.input_shape = [landmarks_batch.shape[0], landmarks_batch.shape[1]]
+            self.interpreter.resize_tensor_input(self.input_index, self.input_shape)
+            self.interpreter.allocate_tensors()
+
+        self.interpreter.set_tensor(self.input_index, landmarks_batch)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_index)
+
+
+def load_backend(model_path, backend=None):
+    """Load the classifier for model_path with the selected backend"""
+    if backend is None:
+        # An exported file selects its own backend, otherwise fall back to the default
+        extension = os.path.splitext(model_path)[1]
+        backend = next((name for name, ext in BACKEND_EXTENSIONS.items()
+                        if ext == extension and name != 'keras'), DEFAULT_BACKEND)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend}")
+
+    path = backend_model_path(model_path, backend)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No {backend} model found at {path}")
+
+    if backend == 'numpy':
+        return NumpyBackend(path)
+    elif backend == 'tflite':
+        return TFLiteBackend(path)
+    return KerasBackend(path)
+
+
+def export_numpy_weights(model, weights_path):
+    """Export the Dense layers of a Keras model to an .npz file for NumpyBackend"""
+    arrays = {}
+    num_layers = 0
+    for layer in model.layers:
+        layer_type = type(layer).__name__
+        if layer_type in ('Dropout', 'InputLayer'):
+            # Inactive at inference time
+            continue
+        if layer_type != 'Dense':
+            raise ValueError(f"Cannot export layer {layer.name} of type {layer_type}")
+
+        kernel, bias = layer.get_weights()
+        arrays[f'kernel_{num_layers}'] = kernel.astype(np.float32)
+        arrays[f'bias_{num_layers}'] = bias.astype(np.float32)
+        arrays[f'activation_{num_layers}'] = np.array(layer.get_config()['activation'])
+        num_layers += 1
+
+    np.savez(weights_path, num_layers=np.array(num_layers), **arrays)
+    return weights_path
+
+
+def export_tflite(model, tflite_path):
+    """Convert a Keras model to a TensorFlow Lite flatbuffer"""
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    with open(tflite_path, 'wb') as f:
+        f.write(converter.convert())
+    return tflite_path
+
+
+def check_parity(model, backend, num_samples=256, atol=1e-5):
+    """Compare backend outputs with the Keras model on random landmark vectors.
+
+    Returns the largest absolute difference between the two sets of class
+    probabilities and raises AssertionError if it exceeds atol.
+    """
+    input_size = model.input_shape[-1]
+    samples = np.random.default_rng(0).random((num_samples, input_size), dtype=np.float32)
+
+    expected = np.asarray(model.predict_on_batch(samples))
+    actual = np.array(backend.predict(samples))
+    max_diff = float(np.max(np.abs(expected - actual)))
+
+    if max_diff > atol:
+        raise AssertionError(f"Backend output differs from Keras by {max_diff:.2e} (atol {atol:.0e})")
+    return max_diff
+
+
+def export_model(model_path, tflite=False):
+    """Export a saved Keras model to the lightweight backends and verify parity"""
+    from tensorflow.keras.models import load_model
+
+    model = load_model(model_path)
+
+    weights_path = export_numpy_weights(model, backend_model_path(model_path, 'numpy'))
+    max_diff = check_parity(model, NumpyBackend(weights_path))
+    print(f"NumPy weights saved to {weights_path} (max diff vs Keras: {max_diff:.2e})")
+
+    if tflite:
+        tflite_path = export_tflite(model, backend_model_path(model_path, 'tflite'))
+        max_diff = check_parity(model, TFLiteBackend(tflite_path), atol=1e-4)
+        print(f"TFLite model saved to {tflite_path} (max diff vs Keras: {max_diff:.2e})")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python inference_backend.py <model.h5> [--tflite]")
+        sys.exit(1)
+
+    export_model(sys.argv[1], tflite='--tflite' in sys.argv[2:])
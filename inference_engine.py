@@ -0,0 +1,163 @@
+import threading
+import queue
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+def is_confident(confidence, confidence_threshold):
+    """The acceptance rule for a prediction's confidence (a scalar or an array)"""
+    return confidence > confidence_threshold
+
+
+def decode_prediction(probabilities, labels, confidence_threshold=0.7):
+    """Turn a row of class probabilities into a (label, confidence) pair"""
+    predicted_class = int(np.argmax(probabilities))
+    confidence = float(probabilities[predicted_class])
+
+    # Return the label only if confidence is high enough
+    if is_confident(confidence, confidence_threshold):
+        return labels[predicted_class], confidence
+    return "Unknown gesture", confidence
+
+
+def decode_batch(probabilities, confidence_threshold=0.7):
+    """decode_prediction for an (N, num_classes) batch: (class indices, -1 if unsure; confidences)"""
+    predicted_classes = probabilities.argmax(axis=1)
+    confidences = probabilities[np.arange(len(predicted_classes)), predicted_classes]
+    return (np.where(is_confident(confidences, confidence_threshold), predicted_classes, -1),
+            confidences)
+
+
+class BatchInferenceEngine:
+    """Collect landmark vectors from many streams and classify them in micro-batches.
+
+    Callers submit single landmark vectors from any thread. A background worker
+    groups pending requests into one batch (up to ``max_batch_size`` vectors, or
+    whatever arrived within ``max_wait_ms`` of the first one), runs a single
+    forward pass through ``predict_fn`` and hands each caller its own
+    ``(label, confidence)`` result.
+    """
+
+    def __init__(self, predict_fn, labels, max_batch_size=32, max_wait_ms=5.0,
+                 confidence_threshold=0.7, num_features=63):
+        self.predict_fn = predict_fn
+        self.labels = labels
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.confidence_threshold = confidence_threshold
+
+        self._requests = queue.Queue()
+        # Reused input buffer so batching does not allocate per forward pass
+        self._batch_input = np.zeros((max_batch_size, num_features), dtype=np.float32)
+
+        self._stats_lock = threading.Lock()
+        self._num_requests = 0
+        self._num_batches = 0
+        self._largest_batch = 0
+
+        # Held while submitting and while stopping, so nothing is queued behind the stop sentinel
+        self._submit_lock = threading.Lock()
+        self._running = True
+        self.worker_thread = threading.Thread(target=self._process_batches, daemon=True)
+        self.worker_thread.start()
+
+    def submit(self, landmarks):
+        """Queue a landmark vector and return a Future resolving to (label, confidence)"""
+        future = Future()
+        with self._submit_lock:
+            if not self._running:
+                future.set_exception(RuntimeError("Inference engine has been stopped"))
+                return future
+            self._requests.put((landmarks, future))
+        return future
+
+    def predict(self, landmarks, timeout=None):
+        """Classify a landmark vector, blocking until its batch has run"""
+        return self.submit(landmarks).result(timeout=timeout)
+
+    def _collect_batch(self, first):
+        """Gather requests that arrive before the batch is full or the wait expires"""
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    item = self._requests.get(timeout=remaining)
+                else:
+                    item = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._running = False
+                break
+            batch.append(item)
+
+        return batch
+
+    def _run_batch(self, batch):
+        """Run one forward pass and resolve every future in the batch"""
+        batch_size = len(batch)
+        inputs = self._batch_input[:batch_size]
+        for row, (landmarks, _) in enumerate(batch):
+            inputs[row] = np.ravel(landmarks)
+
+        try:
+            predictions = self.predict_fn(inputs)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for row, (_, future) in enumerate(batch):
+            future.set_result(decode_prediction(predictions[row], self.labels,
+                                                self.confidence_threshold))
+
+        with self._stats_lock:
+            self._num_requests += batch_size
+            self._num_batches += 1
+            self._largest_batch = max(self._largest_batch, batch_size)
+
+    def _process_batches(self):
+        """Process batched inference requests in background thread"""
+        while self._running:
+            try:
+                first = self._requests.get(timeout=1)
+            except queue.Empty:
+                continue
+            if first is None:
+                break
+
+            self._run_batch(self._collect_batch(first))
+
+        # Fail anything still waiting so callers don't block forever
+        while True:
+            try:
+                item = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[1].set_exception(RuntimeError("Inference engine has been stopped"))
+
+    def get_stats(self):
+        """Return batching statistics"""
+        with self._stats_lock:
+            mean_batch = self._num_requests / self._num_batches if self._num_batches else 0.0
+            return {
+                'requests': self._num_requests,
+                'batches': self._num_batches,
+                'mean_batch_size': mean_batch,
+                'largest_batch': self._largest_batch
+            }
+
+    def stop(self):
+        """Stop the worker thread after the current batch"""
+        with self._submit_lock:
+            if not self._running:
+                return
+            self._running = False
+            self._requests.put(None)
+        self.worker_thread.join(timeout=5)
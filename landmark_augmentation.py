@@ -0,0 +1,102 @@
+import threading
+
+import numpy as np
+
+from hand_landmarks import NUM_LANDMARKS
+
+WRIST = 0
+
+
+class LandmarkAugmenter:
+    """Random, label-preserving perturbations of whole landmark batches.
+
+    Every transform draws per-sample parameters as arrays and applies them
+    with broadcast NumPy ops, so a batch of any size costs a handful of array
+    operations and no per-sample Python. Spatial transforms work on
+    (N, 21, 3) landmarks in MediaPipe's normalized image coordinates:
+    rotation in the image plane and scaling about the wrist, Gaussian jitter,
+    and horizontal mirroring (a left hand becomes a right hand). Sequences
+    (N, T, 21, 3) get the same spatial transform on every frame of a sample
+    plus a random monotonic time warp.
+
+    Safe to call from several tf.data map workers at once: each call draws
+    from its own generator spawned from the seed.
+    """
+
+    def __init__(self, rotation=15.0, scale=(0.85, 1.15), jitter=0.005, mirror_prob=0.5,
+                 time_warp=0.2, seed=None):
+        self.rotation = np.deg2rad(rotation)
+        self.scale = scale
+        self.jitter = jitter
+        self.mirror_prob = mirror_prob
+        self.time_warp = time_warp
+        self._seeds = np.random.SeedSequence(seed)
+        self._seed_lock = threading.Lock()
+
+    def _rng(self):
+        with self._seed_lock:
+            return np.random.default_rng(self._seeds.spawn(1)[0])
+
+    def _spatial(self, points, rng):
+        """Apply one random spatial transform per sample to (N, ..., 21, 3) points"""
+        num_samples = points.shape[0]
+        # Per-sample parameters broadcast over every axis after the first
+        broadcast = (num_samples,) + (1,) * (points.ndim - 2)
+
+        wrist = points[..., WRIST:WRIST + 1, :]
+        centered = points - wrist
+
+        angle = rng.uniform(-self.rotation, self.rotation, broadcast)
+        cos, sin = np.cos(angle), np.sin(angle)
+        x, y = centered[..., 0].copy(), centered[..., 1]
+        centered[..., 0] = cos * x - sin * y
+        centered[..., 1] = sin * x + cos * y
+
+        centered *= rng.uniform(self.scale[0], self.scale[1], broadcast)[..., np.newaxis]
+        out = centered + wrist
+
+        if self.mirror_prob > 0:
+            mirror = rng.random(broadcast) < self.mirror_prob
+            out[..., 0] = np.where(mirror, 1.0 - out[..., 0], out[..., 0])
+
+        if self.jitter > 0:
+            out += rng.normal(0, self.jitter, out.shape).astype(np.float32)
+        return out
+
+    def augment(self, landmarks):
+        """Augment a batch of hands: (N, 21, 3) or flat (N, 63); returns the same shape"""
+        landmarks = np.asarray(landmarks, dtype=np.float32)
+        points = landmarks.reshape(len(landmarks), NUM_LANDMARKS, 3)
+        return self._spatial(points, self._rng()).reshape(landmarks.shape)
+
+    def warp_time(self, sequences, rng=None):
+        """Resample (N, T, ...) sequences along a random monotonic time curve per sample.
+
+        Frame positions follow t ** gamma with log(gamma) uniform in
+        [-time_warp, time_warp], so each sample is sped up at its start and
+        slowed down at its end or the other way around; the first and last
+        frames are kept.
+        """
+        rng = rng or self._rng()
+        sequences = np.asarray(sequences, dtype=np.float32)
+        num_samples, num_frames = sequences.shape[:2]
+        flat = sequences.reshape(num_samples, num_frames, -1)
+
+        gamma = np.exp(rng.uniform(-self.time_warp, self.time_warp, (num_samples, 1)))
+        positions = (num_frames - 1) * np.linspace(0.0, 1.0, num_frames)[np.newaxis] ** gamma
+        lower = np.minimum(positions.astype(np.int64), num_frames - 2)
+        fraction = (positions - lower)[..., np.newaxis].astype(np.float32)
+
+        before = np.take_along_axis(flat, lower[..., np.newaxis], axis=1)
+        after = np.take_along_axis(flat, lower[..., np.newaxis] + 1, axis=1)
+        return (before + fraction * (after - before)).reshape(sequences.shape)
+
+    def augment_sequences(self, sequences):
+        """Augment (N, T, 21, 3) or (N, T, 63) sequences; returns the same shape"""
+        rng = self._rng()
+        sequences = np.asarray(sequences, dtype=np.float32)
+        num_samples, num_frames = sequences.shape[:2]
+        if self.time_warp > 0 and num_frames > 1:
+            sequences = self.warp_time(sequences, rng)
+        points = sequences.reshape(num_samples, num_frames, NUM_LANDMARKS, 3)
+        return self._spatial(points, rng).reshape(sequences.shape)
@@ -0,0 +1,237 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from hand_landmarks import NUM_LANDMARKS
+
+DATASET_VERSION = 1
+METADATA_FILE = 'dataset.json'
+
+# Column name -> (file name, dtype, shape of one row)
+COLUMNS = {
+    'landmarks': ('landmarks.f32', np.float32, (NUM_LANDMARKS, 3)),
+    'labels': ('labels.i32', np.int32, ()),
+    'sessions': ('sessions.i32', np.int32, ()),
+    'timestamps': ('timestamps.f64', np.float64, ())
+}
+
+
+def _read_metadata(path):
+    with open(os.path.join(path, METADATA_FILE)) as f:
+        metadata = json.load(f)
+    if metadata.get('version') != DATASET_VERSION:
+        raise ValueError(f"Unsupported landmark dataset version {metadata.get('version')} "
+                         f"in {path} (expected {DATASET_VERSION})")
+    return metadata
+
+
+class LandmarkDatasetWriter:
+    """Append-only writer for a landmark dataset directory.
+
+    Every column is a flat binary file of fixed-dtype rows; rows are staged in
+    preallocated chunk buffers and appended to the files a chunk at a time.
+    The row count, label names and session list live in dataset.json, which
+    is rewritten (atomically) on every flush, so readers only ever see fully
+    written rows and a crash loses at most the unflushed chunk.
+    """
+
+    def __init__(self, path, chunk_size=4096):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        if os.path.exists(os.path.join(path, METADATA_FILE)):
+            metadata = _read_metadata(path)
+        else:
+            metadata = {'version': DATASET_VERSION, 'num_frames': 0, 'labels': [], 'sessions': []}
+        self.num_frames = metadata['num_frames']
+        self.label_names = metadata['labels']
+        self.session_info = metadata['sessions']
+        self._label_index = {label: i for i, label in enumerate(self.label_names)}
+        self.session_id = None
+
+        # Drop rows past the last flush (left behind by a crash) before appending
+        self._files = {}
+        for column, (file_name, dtype, shape) in COLUMNS.items():
+            file_path = os.path.join(path, file_name)
+            row_bytes = np.dtype(dtype).itemsize * int(np.prod(shape))
+            with open(file_path, 'ab') as f:
+                f.truncate(self.num_frames * row_bytes)
+            self._files[column] = open(file_path, 'ab')
+
+        self.chunk_size = chunk_size
+        self._chunk = {column: np.empty((chunk_size,) + shape, dtype=dtype)
+                       for column, (_, dtype, shape) in COLUMNS.items()}
+        self._chunk_rows = 0
+
+    def __len__(self):
+        """Rows appended so far, including ones not flushed yet"""
+        return self.num_frames + self._chunk_rows
+
+    def label_id(self, label):
+        """Return the index of a label name, registering it on first use"""
+        index = self._label_index.get(label)
+        if index is None:
+            index = self._label_index[label] = len(self.label_names)
+            self.label_names.append(label)
+        return index
+
+    def begin_session(self, name=None, **metadata):
+        """Start a new recording session; later rows are tagged with its index"""
+        self.session_id = len(self.session_info)
+        self.session_info.append(dict(metadata, name=name or f"session_{self.session_id}",
+                                  started=time.time()))
+        return self.session_id
+
+    def append(self, landmarks, label, timestamp=None):
+        """Append one (21, 3) / (63,) landmark row, or a batch of rows sharing a label"""
+        if self.session_id is None:
+            self.begin_session()
+
+        landmarks = np.asarray(landmarks, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+        label = self.label_id(label)
+        if timestamp is None:
+            timestamp = time.time()
+
+        start = 0
+        while start < len(landmarks):
+            count = min(len(landmarks) - start, self.chunk_size - self._chunk_rows)
+            rows = slice(self._chunk_rows, self._chunk_rows + count)
+            self._chunk['landmarks'][rows] = landmarks[start:start + count]
+            self._chunk['labels'][rows] = label
+            self._chunk['sessions'][rows] = self.session_id
+            self._chunk['timestamps'][rows] = timestamp
+            self._chunk_rows += count
+            start += count
+            if self._chunk_rows == self.chunk_size:
+                self._write_chunk()
+
+    def _write_chunk(self):
+        for column, f in self._files.items():
+            f.write(self._chunk[column][:self._chunk_rows].tobytes())
+        self.num_frames += self._chunk_rows
+        self._chunk_rows = 0
+
+    def flush(self):
+        """Write buffered rows and commit them to dataset.json"""
+        self._write_chunk()
+        for f in self._files.values():
+            f.flush()
+            os.fsync(f.fileno())
+
+        metadata = {
+            'version': DATASET_VERSION,
+            'num_frames': self.num_frames,
+            'labels': self.label_names,
+            'sessions': self.session_info,
+            'columns': {column: [file_name, np.dtype(dtype).str, list(shape)]
+                        for column, (file_name, dtype, shape) in COLUMNS.items()}
+        }
+        temp_path = os.path.join(self.path, METADATA_FILE + '.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(temp_path, os.path.join(self.path, METADATA_FILE))
+
+    def close(self):
+        if self._files:
+            self.flush()
+            for f in self._files.values():
+                f.close()
+            self._files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkDataset:
+    """Read-only, memory-mapped view of a landmark dataset directory.
+
+    Columns are np.memmap arrays, so opening a dataset costs nothing and
+    batches are read from disk (via the page cache) only when gathered.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        metadata = _read_metadata(path)
+        self.num_frames = metadata['num_frames']
+        self.label_names = metadata['labels']
+        self.session_info = metadata['sessions']
+
+        # self.landmarks, self.labels, self.sessions and self.timestamps
+        for column, (file_name, dtype, shape) in COLUMNS.items():
+            if self.num_frames:
+                array = np.memmap(os.path.join(path, file_name), dtype=dtype, mode='r',
+                                  shape=(self.num_frames,) + shape)
+            else:
+                array = np.empty((0,) + shape, dtype=dtype)
+            setattr(self, column, array)
+
+    def __len__(self):
+        return self.num_frames
+
+    @property
+    def num_classes(self):
+        return len(self.label_names)
+
+    def split(self, test_size=0.2, seed=42):
+        """Return shuffled (train_indices, test_indices), stratified by label.
+
+        Consecutive frames of a session are near-duplicates, so sessions are
+        not split: for each label, whole sessions move to the test set until it
+        holds about test_size of the label's rows, and at least one session
+        stays in training. A label recorded in a single session is split in
+        time instead (its last rows are the test set).
+        """
+        rng = np.random.default_rng(seed)
+        labels = np.asarray(self.labels)
+        sessions = np.asarray(self.sessions)
+        train, test = [], []
+        for label in np.unique(labels):
+            rows = np.flatnonzero(labels == label)
+            num_test = int(round(len(rows) * test_size))
+            label_sessions = rng.permutation(np.unique(sessions[rows]))
+            if len(label_sessions) == 1:
+                test.append(rows[len(rows) - num_test:])
+                train.append(rows[:len(rows) - num_test])
+                continue
+
+            test_sessions = []
+            num_session_rows = 0
+            for session in label_sessions[:-1]:
+                if num_session_rows >= num_test:
+                    break
+                test_sessions.append(session)
+                num_session_rows += np.count_nonzero(sessions[rows] == session)
+            in_test = np.isin(sessions[rows], test_sessions)
+            test.append(rows[in_test])
+            train.append(rows[~in_test])
+        train, test = np.concatenate(train), np.concatenate(test)
+        rng.shuffle(train)
+        rng.shuffle(test)
+        return train, test
+
+    def gather(self, indices):
+        """Return (landmarks (N, 21, 3), labels (N,)) for the given row indices"""
+        # Sorted reads walk the files forward instead of seeking randomly
+        order = np.argsort(indices)
+        rows = np.asarray(indices)[order]
+        landmarks = np.empty((len(rows), NUM_LANDMARKS, 3), dtype=np.float32)
+        labels = np.empty(len(rows), dtype=np.int32)
+        landmarks[order] = self.landmarks[rows]
+        labels[order] = self.labels[rows]
+        return landmarks, labels
+
+    def batches(self, indices=None, batch_size=256, shuffle=True, repeat=False, seed=None):
+        """Yield (landmarks, labels) batches; only one batch is in memory at a time"""
+        indices = np.arange(self.num_frames) if indices is None else np.asarray(indices)
+        rng = np.random.default_rng(seed)
+        while True:
+            order = rng.permutation(indices) if shuffle else indices
+            for start in range(0, len(order), batch_size):
+                yield self.gather(order[start:start + batch_size])
+            if not repeat:
+                return
@@ -0,0 +1,159 @@
+import json
+import os
+
+import numpy as np
+
+from hand_landmarks import NUM_LANDMARKS
+
+# Bump when the feature layout changes so old models refuse a mismatched transform
+TRANSFORM_VERSION = 1
+
+# MediaPipe landmark indices
+WRIST = 0
+MIDDLE_FINGER_MCP = 9
+FINGERTIPS = [4, 8, 12, 16, 20]
+
+# Joint chains from the wrist to each fingertip (thumb, index, middle, ring, pinky)
+FINGER_CHAINS = [
+    [0, 1, 2, 3, 4],
+    [0, 5, 6, 7, 8],
+    [0, 9, 10, 11, 12],
+    [0, 13, 14, 15, 16],
+    [0, 17, 18, 19, 20]
+]
+
+# Pairwise distances between the wrist and the fingertips
+_DISTANCE_POINTS = np.array([WRIST] + FINGERTIPS)
+_PAIR_A, _PAIR_B = (_DISTANCE_POINTS[i] for i in np.triu_indices(len(_DISTANCE_POINTS), 1))
+
+# Bones (start, end) of each chain; a joint angle is measured between consecutive bones
+_CHAINS = np.array(FINGER_CHAINS)
+_BONE_START = _CHAINS[:, :-1]
+_BONE_END = _CHAINS[:, 1:]
+
+NUM_DISTANCES = len(_PAIR_A)
+NUM_ANGLES = _BONE_START.shape[0] * (_BONE_START.shape[1] - 1)
+
+
+def transform_path(model_path):
+    """Return the transform file saved next to a model (gesture_model.h5 -> gesture_model.transform.json)"""
+    return os.path.splitext(model_path)[0] + '.transform.json'
+
+
+def normalize_landmarks(points, translate=True, scale=True, align_rotation=False):
+    """Normalize (N, 21, 3) landmarks: wrist at origin, unit palm length, optionally upright.
+
+    Rotation alignment turns each hand in the image plane so the wrist to
+    middle-finger-MCP direction points up.
+    """
+    points = np.array(points, dtype=np.float32)
+    if translate:
+        points -= points[:, WRIST:WRIST + 1]
+
+    palm = points[:, MIDDLE_FINGER_MCP] - points[:, WRIST]
+    if align_rotation:
+        # Angle that maps the palm direction onto (0, -1), i.e. up in image coordinates
+        angle = np.arctan2(palm[:, 0], -palm[:, 1])
+        cos, sin = np.cos(angle)[:, np.newaxis], np.sin(angle)[:, np.newaxis]
+        x, y = points[:, :, 0].copy(), points[:, :, 1].copy()
+        points[:, :, 0] = cos * x + sin * y
+        points[:, :, 1] = cos * y - sin * x
+
+    if scale:
+        palm_size = np.linalg.norm(palm, axis=1)
+        points /= np.where(palm_size > 1e-6, palm_size, 1.0)[:, np.newaxis, np.newaxis]
+    return points
+
+
+def pairwise_distances(points):
+    """Distances between the wrist and fingertips for (N, 21, 3) landmarks -> (N, 15)"""
+    return np.linalg.norm(points[:, _PAIR_A] - points[:, _PAIR_B], axis=2)
+
+
+def joint_angles(points):
+    """Bend angle in radians at every finger joint for (N, 21, 3) landmarks -> (N, 15)"""
+    bones = points[:, _BONE_END] - points[:, _BONE_START]
+    bones /= np.maximum(np.linalg.norm(bones, axis=3, keepdims=True), 1e-6)
+    cosines = np.sum(bones[:, :, :-1] * bones[:, :, 1:], axis=3)
+    return np.arccos(np.clip(cosines, -1.0, 1.0)).reshape(len(points), -1)
+
+
+class LandmarkTransform:
+    """Map raw MediaPipe landmark vectors to position- and scale-invariant features.
+
+    The same transform runs on the training set in create_model.py and on each
+    frame in GestureRecognition, and is saved as JSON next to the model so a
+    model is always fed the features it was trained on. Output per hand:
+    normalized coordinates (63), then optionally wrist/fingertip distances (15)
+    and joint angles (15).
+    """
+
+    def __init__(self, translate=True, scale=True, align_rotation=False, distances=True,
+                 angles=True):
+        self.translate = translate
+        self.scale = scale
+        self.align_rotation = align_rotation
+        self.distances = distances
+        self.angles = angles
+
+    @property
+    def num_features(self):
+        return (NUM_LANDMARKS * 3 + (NUM_DISTANCES if self.distances else 0) +
+                (NUM_ANGLES if self.angles else 0))
+
+    def transform(self, landmarks):
+        """Transform a (63,) vector or an (N, 63) batch; the output has the same rank"""
+        landmarks = np.asarray(landmarks, dtype=np.float32)
+        single = landmarks.ndim == 1
+        points = landmarks.reshape(-1, NUM_LANDMARKS, 3)
+
+        points = normalize_landmarks(points, self.translate, self.scale, self.align_rotation)
+        parts = [points.reshape(len(points), -1)]
+        if self.distances:
+            parts.append(pairwise_distances(points))
+        if self.angles:
+            parts.append(joint_angles(points))
+
+        features = np.concatenate(parts, axis=1).astype(np.float32, copy=False)
+        return features[0] if single else features
+
+    __call__ = transform
+
+    def to_dict(self):
+        return {
+            'version': TRANSFORM_VERSION,
+            'translate': self.translate,
+            'scale': self.scale,
+            'align_rotation': self.align_rotation,
+            'distances': self.distances,
+            'angles': self.angles,
+            'num_features': self.num_features
+        }
+
+    @classmethod
+    def from_dict(cls, config):
+        version = config.get('version')
+        if version != TRANSFORM_VERSION:
+            raise ValueError(f"Unsupported landmark transform version {version} "
+                             f"(expected {TRANSFORM_VERSION})")
+        return cls(config['translate'], config['scale'], config['align_rotation'],
+                   config['distances'], config['angles'])
+
+    def save(self, path):
+        """Write the transform configuration as JSON"""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def for_model(cls, model_path):
+        """Load the transform saved with a model, or None for models trained on raw landmarks"""
+        path = transform_path(model_path)
+        if not os.path.exists(path):
+            return None
+        return cls.load(path)
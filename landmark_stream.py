@@ -0,0 +1,154 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Message types
+FRAME = 'frame'
+GESTURE = 'gesture'
+STATUS = 'status'
+
+
+def frame_message(hands, gesture, confidence, timestamp, precision=4):
+    """Per-frame message: label, confidence, timestamp and the landmarks of every hand.
+
+    Landmarks are MediaPipe's normalized image coordinates rounded to
+    precision decimals (about a tenth of a pixel at 640x480), which keeps a
+    one-hand message under 1 KB of JSON.
+    """
+    message = {
+        'type': FRAME,
+        'timestamp': round(timestamp, 3),
+        'label': gesture,
+        'confidence': round(float(confidence), 3),
+        'hands': []
+    }
+    if hands is not None:
+        for i in range(hands.num_hands):
+            message['hands'].append({
+                'handedness': hands.handedness[i] if i < len(hands.handedness) else None,
+                'score': round(float(hands.scores[i]), 3) if i < len(hands.scores) else None,
+                'landmarks': np.round(hands.landmarks[i].astype(np.float64), precision).tolist()
+            })
+    return message
+
+
+def sse_message(message):
+    """Format a serialized message as one Server-Sent Event named after its type"""
+    return f"event: {message[0]}\ndata: {message[1]}\n\n"
+
+
+class LandmarkBroadcaster:
+    """Pushes per-frame landmark messages, gesture events and status updates to clients.
+
+    Each message is serialized to JSON once and shared by every client. Like
+    the video stream, a client that falls behind skips straight to the latest
+    frame message and the latest status; gesture events are kept in a short
+    history instead, so a client sees every one unless it falls more than
+    history_size events behind. Clients keep a cursor and call wait() from a
+    thread (Flask) or wait_async() from an event loop (FastAPI); publishing
+    works from any thread.
+    """
+
+    def __init__(self, history_size=64):
+        self._condition = threading.Condition()
+        self.frame_id = 0
+        self.latest_frame = None
+        self.event_id = 0
+        self._events = deque(maxlen=history_size)
+        self.status_id = 0
+        self.latest_status = None
+        self._async_waiters = set()
+        self.messages_published = 0
+
+    def _publish(self, kind, message):
+        data = (kind, json.dumps(message, separators=(',', ':')))
+        with self._condition:
+            if kind == FRAME:
+                self.frame_id += 1
+                self.latest_frame = data
+            elif kind == STATUS:
+                self.status_id += 1
+                self.latest_status = data
+            else:
+                self.event_id += 1
+                self._events.append((self.event_id, data))
+            self.messages_published += 1
+            self._condition.notify_all()
+            waiters = list(self._async_waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def publish_frame(self, recognizer, timestamp=None):
+        """Publish the recognizer's latest hands, label and confidence"""
+        self._publish(FRAME, frame_message(recognizer.last_hands, recognizer.last_gesture,
+                                           recognizer.last_confidence,
+                                           time.time() if timestamp is None else timestamp))
+
+    def publish_event(self, event):
+        """Publish a GestureEvent (onset/offset)"""
+        self._publish(GESTURE, dict(event.to_dict(), type=GESTURE))
+
+    def publish_status(self, **status):
+        """Publish a status update (language, last gesture, readiness, ...)"""
+        self._publish(STATUS, dict(status, type=STATUS))
+
+    def cursor(self):
+        """Starting cursor for a new client: the current status first, then only new messages"""
+        with self._condition:
+            return (self.frame_id, self.event_id, 0)
+
+    def _has_new(self, cursor, frames):
+        frame_id, event_id, status_id = cursor
+        return (self.status_id != status_id or self.event_id != event_id or
+                (frames and self.frame_id != frame_id))
+
+    def _collect(self, cursor, frames):
+        """Messages newer than cursor as (cursor, [(type, json)]); called with the lock held"""
+        frame_id, event_id, status_id = cursor
+        messages = []
+        # Only the newest status matters; events are replayed in order
+        if self.status_id != status_id:
+            messages.append(self.latest_status)
+        messages.extend(data for seq, data in self._events if seq > event_id)
+        if frames and self.frame_id != frame_id:
+            messages.append(self.latest_frame)
+            frame_id = self.frame_id
+        return (frame_id, self.event_id, self.status_id), messages
+
+    def wait(self, cursor, frames=True, timeout=1.0):
+        """Block until there are messages newer than cursor; returns (cursor, messages)"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._has_new(cursor, frames), timeout)
+            return self._collect(cursor, frames)
+
+    async def wait_async(self, cursor, frames=True, timeout=None):
+        """Wait on the running event loop for messages newer than cursor"""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = (loop, event)
+        with self._condition:
+            if self._has_new(cursor, frames):
+                return self._collect(cursor, frames)
+            self._async_waiters.add(waiter)
+        deadline = None if timeout is None else loop.time() + timeout
+        try:
+            while True:
+                remaining = None if deadline is None else deadline - loop.time()
+                try:
+                    await asyncio.wait_for(event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+                # Clear before checking, so a publish in between sets it again
+                event.clear()
+                with self._condition:
+                    # Frame publishes wake every waiter, including frames=False ones
+                    if self._has_new(cursor, frames) or (deadline is not None and
+                                                         loop.time() >= deadline):
+                        return self._collect(cursor, frames)
+        finally:
+            with self._condition:
+                self._async_waiters.discard(waiter)
@@ -1,24 +1,223 @@
-import cv2
+import argparse
+import threading
 import time
+
+import cv2
+import numpy as np
 from camera_capture import CameraCapture
+from gesture_events import GestureEventEngine, ONSET
 from gesture_recognition import GestureRecognition
+from hand_roi import HandROITracker
+from metrics import recognizer_stats
+from recognition_scheduler import AdaptiveScheduler
+from recognition_workers import RecognitionWorkerPool
+from startup import (CAMERA_SOURCE, DEFAULT_MODEL_PATH, PREDICTION_CACHE, ROI_TRACKING,
+                     SEQUENCE_MODEL_PATH)
 from text_to_speech import TextToSpeech
 
+# Seconds before the same gesture is spoken again
+SPEECH_COOLDOWN = 2
+
+
+class CameraStream:
+    """Capture and recognize one camera on a background thread.
+
+    recognize(frame) returns (gesture, confidence, annotated frame) from a
+    local recognizer or from the worker pool. The display
+    loop shows latest_frame, the newest annotated frame. Streams whose
+    recognizers share a BatchInferenceEngine classify concurrently, so their
+    requests end up in the same forward passes.
+    """
+
+    def __init__(self, name, camera, recognize, labels, on_onset):
+        self.name = name
+        self.camera = camera
+        self.recognize = recognize
+        self.on_onset = on_onset
+        # Smoothed onset/offset events decide when to speak
+        self.gesture_events = GestureEventEngine(labels, cooldown=SPEECH_COOLDOWN)
+        self.latest_frame = None
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while self._running:
+            try:
+                frame = self.camera.get_frame()
+            except RuntimeError:
+                if self.camera.finished:
+                    # A recorded source that does not loop has ended
+                    print(f"{self.name}: end of source")
+                    break
+                # No new frame within the capture timeout
+                time.sleep(0.1)
+                continue
+
+            # Process gesture
+            try:
+                gesture, confidence, frame_with_landmarks = self.recognize(frame)
+            except RuntimeError as e:
+                # A failed recognition worker; the pool moves on to the others
+                print(f"{self.name}: {e}")
+                continue
+
+            # Display gesture on frame
+            cv2.putText(frame_with_landmarks, f"Gesture: {gesture}",
+                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+
+            # Speak gesture once it has stably appeared
+            for event in self.gesture_events.update(gesture, confidence):
+                if event.kind == ONSET:
+                    self.on_onset(self, event)
+
+            self.latest_frame = frame_with_landmarks
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.camera.release()
+
+
+def draw_landmark_points(frame, landmarks):
+    """Draw a (63,) normalized landmark vector as dots (worker results carry no MediaPipe objects)"""
+    height, width = frame.shape[:2]
+    for x, y, _ in np.asarray(landmarks).reshape(-1, 3):
+        cv2.circle(frame, (int(x * width), int(y * height)), 3, (0, 255, 0), -1)
+    return frame
+
+
+def pool_recognizer(pool, stream):
+    """recognize() for a CameraStream that runs recognition in a RecognitionWorkerPool"""
+    def recognize(frame):
+        if frame.shape != pool.frame_shape:
+            # Landmarks are normalized, so they still fit the original frame
+            detection_frame = cv2.resize(frame, pool.frame_shape[1::-1])
+        else:
+            detection_frame = frame
+        gesture, confidence, landmarks = pool.process_frame(detection_frame, stream=stream)
+        frame_with_landmarks = frame.copy()
+        if landmarks is not None:
+            draw_landmark_points(frame_with_landmarks, landmarks)
+        return gesture, confidence, frame_with_landmarks
+    return recognize
+
+
+def local_recognizer(recognizer):
+    """recognize() for a CameraStream that runs recognition in this process"""
+    def recognize(frame):
+        gesture, frame_with_landmarks = recognizer.process_frame(frame)
+        return gesture, recognizer.last_confidence, frame_with_landmarks
+    return recognize
+
+
+def make_recognizer(args, model_path, inference_engine=None):
+    recognizer = GestureRecognition(model_path, inference_engine=inference_engine,
+                                    backend=args.backend, scheduler=AdaptiveScheduler(),
+                                    roi_tracker=HandROITracker() if args.roi else None)
+    if args.sequence_model:
+        # Every stream keeps its own window, even with a shared --batch engine
+        recognizer.load_sequence_model(args.sequence_model, args.backend)
+    if args.cache:
+        recognizer.enable_prediction_cache()
+    return recognizer
+
+
+def create_recognizers(args, count):
+    """Build one recognizer per stream (MediaPipe tracking state is per stream).
+
+    With --batch every stream classifies through one BatchInferenceEngine
+    around the first recognizer's model; the others load no model at all.
+    Returns (recognizers, inference_engine or None).
+    """
+    first = make_recognizer(args, args.model)
+    inference_engine = None
+    if args.batch:
+        try:
+            inference_engine = first.create_inference_engine()
+            first.inference_engine = inference_engine
+        except RuntimeError as e:
+            print(f"Batched inference disabled: {e}")
+
+    model_path = None if inference_engine is not None else args.model
+    others = [make_recognizer(args, model_path, inference_engine) for _ in range(count - 1)]
+    return [first] + others, inference_engine
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Sign2Text desktop app with voice output")
+    parser.add_argument('--camera', action='append',
+                        help="camera index, video file or frame source URI (see frame_sources.py); "
+                             "repeat to recognize several cameras (default: SIGN2TEXT_CAMERA or 0)")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help="gesture model path")
+    parser.add_argument('--backend', choices=['keras', 'numpy', 'tflite'],
+                        help="classifier backend (default: SIGN2TEXT_BACKEND or keras)")
+    parser.add_argument('--sequence-model', default=SEQUENCE_MODEL_PATH,
+                        help="also recognize dynamic signs with this sliding-window model, e.g. "
+                             "gesture_sequence_model.h5 (default: SIGN2TEXT_SEQUENCE_MODEL)")
+    parser.add_argument('--batch', action='store_true',
+                        help="classify every camera through one shared model in micro-batches")
+    parser.add_argument('--cache', action='store_true', default=PREDICTION_CACHE,
+                        help="reuse classifier results while a pose is held "
+                             "(default: SIGN2TEXT_PREDICTION_CACHE)")
+    parser.add_argument('--roi', action='store_true', default=ROI_TRACKING,
+                        help="run hand detection on a crop around the tracked hand "
+                             "(default: SIGN2TEXT_ROI)")
+    parser.add_argument('--workers', type=int,
+                        help="recognize in this many worker processes (see recognition_workers.py)")
+    args = parser.parse_args()
+    if args.batch and args.workers:
+        parser.error("--batch and --workers are alternatives")
+    sources = args.camera or [CAMERA_SOURCE or '0']
+
     print("Sign2Text with Voice Output")
     print("===========================")
 
     # Initialize components
+    cameras = []
     try:
-        camera = CameraCapture()
-        camera.start_capture()
+        for source in sources:
+            camera = CameraCapture(source, threaded=True)
+            cameras.append(camera)
+            camera.start_capture()
         print("Camera initialized successfully")
     except Exception as e:
         print(f"Failed to initialize camera: {e}")
+        for camera in cameras:
+            camera.release()
         return
 
-    # Initialize gesture recognition (without model for now - will show hand tracking)
-    gesture_recognizer = GestureRecognition()
+    # Without a model file MediaPipe hand tracking still runs
+    inference_engine = None
+    worker_pool = None
+    local_recognizers = []
+    if args.workers:
+        # Each camera sticks to one worker process, which keeps its tracking state
+        worker_pool = RecognitionWorkerPool(args.workers, cameras[0].get_frame().shape,
+                                            args.model, args.backend)
+        try:
+            worker_pool.wait_until_ready()
+        except RuntimeError as e:
+            print(f"Failed to start recognition workers: {e}")
+            worker_pool.close()
+            for camera in cameras:
+                camera.release()
+            return
+        recognizers = [pool_recognizer(worker_pool, stream) for stream in range(len(cameras))]
+        if args.sequence_model:
+            print("The sequence model is not used with --workers")
+        labels = worker_pool.labels
+    else:
+        local_recognizers, inference_engine = create_recognizers(args, len(cameras))
+        labels = local_recognizers[0].labels
+        recognizers = [local_recognizer(recognizer) for recognizer in local_recognizers]
     print("Gesture recognition initialized (MediaPipe hand tracking active)")
 
     # Initialize text-to-speech
@@ -50,51 +249,24 @@ def main():
     print("\nStarting sign detection...")
     print("Press 'q' to quit, 'l' to change language")
 
-    # Variables for gesture tracking
-    last_gesture = None
-    last_speech_time = 0
-    speech_cooldown = 2  # seconds between speech outputs
+    def speak(stream, event):
+        print(f"Detected: {event.gesture}" if len(cameras) == 1
+              else f"Detected on {stream.name}: {event.gesture}")
+        tts.speak_gesture(event.gesture)
+
+    streams = [CameraStream('Sign2Text' if len(cameras) == 1 else f"Sign2Text [{source}]",
+                            camera, recognize, labels, speak).start()
+               for source, camera, recognize in zip(sources, cameras, recognizers)]
 
     try:
         while True:
-            # Capture frame
-            frame = camera.get_frame()
-
-            # Process gesture
-            gesture, frame_with_landmarks = gesture_recognizer.process_frame(frame)
-
-            # Display gesture on frame
-            cv2.putText(frame_with_landmarks, f"Gesture: {gesture}",
-                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-
-            # Speak gesture if it's different and enough time has passed
-            current_time = time.time()
-            if (gesture != last_gesture and
-                gesture not in ["No model loaded", "Unknown gesture"] and
-                current_time - last_speech_time > speech_cooldown):
-
-                # Translate common gestures to Hindi if needed
-                if tts.hindi_voice and hasattr(tts, 'hindi_voice') and tts.engine.getProperty('voice') == tts.hindi_voice.id:
-                    # Basic translations (would need more comprehensive translation system)
-                    translations = {
-                        'hello': 'नमस्ते',
-                        'thank you': 'धन्यवाद',
-                        'please': 'कृपया'
-                    }
-                    speech_text = translations.get(gesture.lower(), gesture)
-                else:
-                    speech_text = gesture
-
-                print(f"Detected: {gesture}")
-                tts.speak(f"This is {speech_text}")
-                last_gesture = gesture
-                last_speech_time = current_time
-
-            # Show frame
-            cv2.imshow('Sign2Text', frame_with_landmarks)
+            # Show frames
+            for stream in streams:
+                if stream.latest_frame is not None:
+                    cv2.imshow(stream.name, stream.latest_frame)
 
             # Check for key presses
-            key = cv2.waitKey(1) & 0xFF
+            key = cv2.waitKey(10) & 0xFF
             if key == ord('q'):
                 break
             elif key == ord('l'):
@@ -117,9 +289,18 @@ def main():
         print(f"Error during execution: {e}")
     finally:
         # Cleanup
-        camera.release()
+        for stream in streams:
+            stream.stop()
+        for source, recognizer in zip(sources, local_recognizers):
+            for component, stats in recognizer_stats(recognizer).items():
+                print(f"{component} [{source}]: {stats}")
+        if inference_engine is not None:
+            print(f"Batched inference: {inference_engine.get_stats()}")
+            inference_engine.stop()
+        if worker_pool is not None:
+            worker_pool.close()
         cv2.destroyAllWindows()
         print("Application closed")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,266 @@
+import bisect
+import threading
+import time
+
+# Upper bounds in seconds; the +Inf bucket is implicit
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+STAGE_METRIC = 'sign2text_stage_seconds'
+STAGE_HELP = "Time spent in each frame processing stage"
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in items) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Timer:
+    """Context manager that observes its elapsed time into a histogram"""
+
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Histogram:
+    """Fixed-bucket histogram; memory does not grow with the number of observations"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        """Return a context manager that times its block into this histogram"""
+        return _Timer(self)
+
+    def samples(self, name, labels):
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+            cumulative += bucket_count
+            yield f"{name}_bucket{_format_labels(labels, ('le', bound))} {cumulative}"
+        yield f"{name}_sum{_format_labels(labels)} {_format_value(total)}"
+        yield f"{name}_count{_format_labels(labels)} {count}"
+
+
+class Counter:
+    """Monotonic counter, either incremented directly or read from a callback"""
+
+    def __init__(self, fn=None):
+        self.value = 0
+        self.fn = fn
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labels):
+        value = self.fn() if self.fn is not None else self.value
+        yield f"{name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value that can go up and down (e.g. a queue depth), set directly or read from a callback"""
+
+    def set(self, value):
+        self.value = value
+
+
+class MetricsRegistry:
+    """Named metrics rendered in the Prometheus text exposition format.
+
+    Metrics are created on first use and identified by name plus label
+    values, e.g. histogram('sign2text_stage_seconds', ..., stage='capture').
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._families = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind, name, help_text, labels, factory):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = factory()
+                    self._families.setdefault(name, (kind, help_text, []))[2].append(key[1])
+        return metric
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS, **labels):
+        return self._get('histogram', name, help_text, labels, lambda: Histogram(buckets))
+
+    def counter(self, name, help_text, fn=None, **labels):
+        return self._get('counter', name, help_text, labels, lambda: Counter(fn))
+
+    def gauge(self, name, help_text, fn=None, **labels):
+        return self._get('gauge', name, help_text, labels, lambda: Gauge(fn))
+
+    def render(self):
+        """Return every metric in the Prometheus text format"""
+        lines = []
+        with self._lock:
+            families = [(name, kind, help_text, list(label_sets))
+                        for name, (kind, help_text, label_sets) in self._families.items()]
+        for name, kind, help_text, label_sets in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels in label_sets:
+                try:
+                    lines.extend(self._metrics[(name, labels)].samples(name, labels))
+                except Exception as e:
+                    # A failing callback (e.g. a released camera) shouldn't break the scrape
+                    print(f"Error reading metric {name}: {e}")
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry served by the /metrics routes
+REGISTRY = MetricsRegistry()
+
+
+def stage_timer(stage):
+    """Time a block as one frame processing stage (capture, mediapipe, classify, ...)"""
+    return REGISTRY.histogram(STAGE_METRIC, STAGE_HELP, stage=stage).time()
+
+
+def observe_stage(stage, seconds):
+    """Record a stage duration measured elsewhere (e.g. time spent waiting in a queue)"""
+    REGISTRY.histogram(STAGE_METRIC, STAGE_HELP, stage=stage).observe(seconds)
+
+
+# Recognizer components (attribute on GestureRecognition) and the
+# get_stats() counters each one reports
+RECOGNIZER_COUNTERS = (
+    ('scheduler', 'frames', 'sign2text_scheduler_frames_total',
+     "Frames seen by the adaptive scheduler"),
+    ('scheduler', 'detections', 'sign2text_scheduler_detections_total',
+     "Frames the adaptive scheduler sent to hand detection"),
+    ('scheduler', 'reused_landmarks', 'sign2text_scheduler_reused_landmarks_total',
+     "Frames that reused the previous landmarks instead of running detection"),
+    ('scheduler', 'classifications', 'sign2text_scheduler_classifications_total',
+     "Landmark sets the adaptive scheduler sent to the classifier"),
+    ('scheduler', 'skipped_classifications', 'sign2text_scheduler_skipped_classifications_total',
+     "Landmark sets that reused the previous label instead of being classified"),
+    ('roi_tracker', 'roi_frames', 'sign2text_roi_frames_total',
+     "Frames whose hand detection ran on a cropped region of interest"),
+    ('roi_tracker', 'search_frames', 'sign2text_roi_search_frames_total',
+     "Frames whose hand detection searched the full frame"),
+    ('roi_tracker', 'lost', 'sign2text_roi_lost_total',
+     "Times the tracked hand was lost from its region of interest"),
+    ('prediction_cache', 'hits', 'sign2text_prediction_cache_hits_total',
+     "Classifications answered by an exact prediction cache hit"),
+    ('prediction_cache', 'near_hits', 'sign2text_prediction_cache_near_hits_total',
+     "Classifications answered by a neighbouring prediction cache entry"),
+    ('prediction_cache', 'misses', 'sign2text_prediction_cache_misses_total',
+     "Classifications that missed the prediction cache"),
+    ('prediction_cache', 'evictions', 'sign2text_prediction_cache_evictions_total',
+     "Entries evicted from the prediction cache"),
+)
+
+
+def recognizer_stats(recognizer):
+    """Return {component: get_stats()} for the recognizer's optional components.
+
+    Only the scheduler, ROI tracker and prediction cache that are actually
+    enabled are included.
+    """
+    stats = {}
+    for name in ('scheduler', 'roi_tracker', 'prediction_cache'):
+        component = getattr(recognizer, name, None) if recognizer is not None else None
+        if component is not None:
+            stats[name] = component.get_stats()
+    return stats
+
+
+def register_component_metrics(get_camera, get_pipeline, get_tts, startup=None, pipeline_stages=(),
+                               landmark_stream=None, get_recognizer=None):
+    """Expose camera, video pipeline and TTS statistics as callback metrics.
+
+    The get_* arguments return the current component or None, so components
+    created later (or never) are read at scrape time. pipeline_stages names
+    the stages whose drop counts and queue depths the pipeline's get_stats()
+    reports (AsyncFramePipeline). get_recognizer adds the adaptive
+    scheduler, ROI tracker and prediction cache counters of the recognizer.
+    """
+    # stream_encoder times its encodes with this module, so import it late
+    from stream_encoder import STREAM_PROFILES
+
+    def stat(get_component, key, stage=None):
+        component = get_component()
+        if component is None:
+            return 0
+        value = component.get_stats().get(key, 0)
+        return value.get(stage, 0) if stage is not None else value
+
+    REGISTRY.counter('sign2text_camera_frames_captured_total', "Frames read from the camera",
+                     fn=lambda: stat(get_camera, 'frames_captured'))
+    REGISTRY.counter('sign2text_camera_frames_dropped_total',
+                     "Camera frames overwritten before anything read them",
+                     fn=lambda: stat(get_camera, 'frames_dropped'))
+    REGISTRY.counter('sign2text_frames_published_total', "Frames published to video viewers",
+                     fn=lambda: stat(get_pipeline, 'frames_published'))
+    REGISTRY.counter('sign2text_frame_errors_total', "Frames that failed to process",
+                     fn=lambda: stat(get_pipeline, 'errors'))
+    REGISTRY.gauge('sign2text_video_viewers', "Connected video stream viewers",
+                   fn=lambda: stat(get_pipeline, 'subscribers'))
+    REGISTRY.counter('sign2text_jpeg_encodes_total', "Frames JPEG-encoded for video viewers",
+                     fn=lambda: stat(get_pipeline, 'frames_encoded'))
+    REGISTRY.counter('sign2text_jpeg_encodes_reused_total',
+                     "Viewer frames served from another viewer's encoding",
+                     fn=lambda: stat(get_pipeline, 'encodes_reused'))
+    for profile in STREAM_PROFILES:
+        REGISTRY.gauge('sign2text_video_viewers_by_profile', "Video viewers per stream profile",
+                       fn=lambda name=profile.name: stat(get_pipeline, 'viewer_profiles', name),
+                       profile=profile.name)
+    for stage in pipeline_stages:
+        REGISTRY.counter('sign2text_pipeline_frames_dropped_total',
+                         "Frames dropped because a pipeline stage fell behind",
+                         fn=lambda stage=stage: stat(get_pipeline, 'dropped_frames', stage), stage=stage)
+        REGISTRY.gauge('sign2text_pipeline_queue_depth', "Frames waiting for a pipeline stage",
+                       fn=lambda stage=stage: stat(get_pipeline, 'queue_depths', stage), stage=stage)
+    REGISTRY.gauge('sign2text_tts_queue_depth', "Phrases waiting to be spoken",
+                   fn=lambda: get_tts().speech_queue.qsize() if get_tts() is not None else 0)
+    if landmark_stream is not None:
+        REGISTRY.counter('sign2text_landmark_messages_total',
+                         "Landmark, gesture event and status messages pushed to clients",
+                         fn=lambda: landmark_stream.messages_published)
+    if get_recognizer is not None:
+        def recognizer_stat(component, key):
+            return recognizer_stats(get_recognizer()).get(component, {}).get(key, 0)
+
+        for component, key, name, help_text in RECOGNIZER_COUNTERS:
+            REGISTRY.counter(name, help_text,
+                             fn=lambda component=component, key=key: recognizer_stat(component, key))
+        REGISTRY.gauge('sign2text_prediction_cache_size', "Entries in the prediction cache",
+                       fn=lambda: recognizer_stat('prediction_cache', 'size'))
+    if startup is not None:
+        REGISTRY.gauge('sign2text_ready', "1 once startup has finished",
+                       fn=lambda: int(startup.is_ready))
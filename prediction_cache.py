@@ -0,0 +1,139 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from hand_landmarks import NUM_LANDMARKS
+from landmark_features import MIDDLE_FINGER_MCP, WRIST, normalize_landmarks
+
+# Raw keys scale the grid by the palm length snapped to steps of 2**(1/4)
+# (about 19%), so a held hand keeps the same cells despite size jitter
+PALM_STEPS_PER_OCTAVE = 4
+
+
+def normalize_for_cache(landmarks):
+    """Make a landmark vector translation- and scale-invariant (wrist at origin, unit palm length)"""
+    points = np.asarray(landmarks, dtype=np.float32).reshape(1, NUM_LANDMARKS, 3)
+    return normalize_landmarks(points).reshape(-1)
+
+
+def palm_length(landmarks):
+    """Wrist to middle finger MCP distance of a landmark vector, in its own units"""
+    points = np.asarray(landmarks, dtype=np.float32).reshape(NUM_LANDMARKS, 3)
+    return float(np.linalg.norm(points[MIDDLE_FINGER_MCP] - points[WRIST]))
+
+
+def can_normalize(feature_transform):
+    """Whether a model with this feature transform may share results across hand positions and sizes.
+
+    Only a model whose own features are translated and scaled gives the same
+    label for the same pose anywhere in the frame; a model on raw landmarks
+    (feature_transform None) does not.
+    """
+    return (feature_transform is not None and
+            feature_transform.translate and feature_transform.scale)
+
+
+class PredictionCache:
+    """LRU cache of classifier results keyed on quantized landmarks.
+
+    A held pose gives nearly the same landmark vector frame after frame, so
+    after snapping to a grid of cell size ``grid`` it maps to the same key and
+    the classifier result can be reused. With ``normalize`` the key is also
+    made position- and scale-invariant, which lets a moving hand hit the
+    cache; that is only correct for models that are invariant themselves
+    (see can_normalize). With a non-zero
+    ``tolerance``, a key miss also checks the most recently stored vectors and
+    counts as a hit if one is within ``tolerance`` on every coordinate; this
+    catches jitter that straddles a grid boundary, which exact keys miss often
+    with 63 coordinates. Set tolerance=0 for exact-key lookups only.
+
+    ``grid`` and ``tolerance`` are fractions of the palm length (wrist to
+    middle finger MCP). Normalized keys are already in palm lengths; raw keys
+    scale both by the hand's palm length, so a small or distant hand in a
+    different pose does not fall into the same cell.
+    """
+
+    def __init__(self, capacity=1024, grid=0.05, tolerance=0.05, neighbor_candidates=32,
+                 normalize=False):
+        self.capacity = capacity
+        self.grid = grid
+        self.tolerance = tolerance
+        self.normalize = normalize
+
+        self._entries = OrderedDict()
+
+        # Ring of recently stored vectors for the nearest-neighbour check
+        self._neighbor_vectors = None
+        self._neighbor_keys = [None] * neighbor_candidates
+        self._neighbor_position = 0
+
+        self.stats = {'hits': 0, 'near_hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _prepare(self, landmarks):
+        """Return (vector, key_prefix, cell_size, tolerance) for a landmark vector"""
+        if self.normalize:
+            return normalize_for_cache(landmarks), b'', self.grid, self.tolerance
+        vector = np.asarray(landmarks, dtype=np.float32).reshape(-1)
+        palm = max(palm_length(vector), 1e-6)
+        step = round(np.log2(palm) * PALM_STEPS_PER_OCTAVE)
+        cell_size = self.grid * 2.0 ** (step / PALM_STEPS_PER_OCTAVE)
+        return vector, np.int32(step).tobytes(), cell_size, self.tolerance * palm
+
+    def lookup(self, landmarks):
+        """Return (key, cached_result); cached_result is None on a miss.
+
+        Pass the key to store() after computing the result for a miss.
+        """
+        vector, prefix, cell_size, tolerance = self._prepare(landmarks)
+        key = (prefix + np.rint(vector / cell_size).astype(np.int32).tobytes(), vector)
+
+        result = self._entries.get(key[0])
+        if result is not None:
+            self._entries.move_to_end(key[0])
+            self.stats['hits'] += 1
+            return key, result
+
+        if self.tolerance > 0 and self._neighbor_vectors is not None:
+            distances = np.abs(self._neighbor_vectors - vector).max(axis=1)
+            nearest = int(np.argmin(distances))
+            neighbor_key = self._neighbor_keys[nearest]
+            if distances[nearest] <= tolerance and neighbor_key in self._entries:
+                self._entries.move_to_end(neighbor_key)
+                self.stats['near_hits'] += 1
+                return key, self._entries[neighbor_key]
+
+        self.stats['misses'] += 1
+        return key, None
+
+    def store(self, key, result):
+        """Cache a classifier result under a key returned by lookup()"""
+        cache_key, vector = key
+        self._entries[cache_key] = result
+        self._entries.move_to_end(cache_key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+        if self.tolerance > 0:
+            if self._neighbor_vectors is None:
+                # Unused rows never match: they are infinitely far away
+                self._neighbor_vectors = np.full((len(self._neighbor_keys), vector.size),
+                                                 np.inf, dtype=np.float32)
+            self._neighbor_vectors[self._neighbor_position] = vector
+            self._neighbor_keys[self._neighbor_position] = cache_key
+            self._neighbor_position = (self._neighbor_position + 1) % len(self._neighbor_keys)
+
+    def clear(self):
+        """Drop all cached results"""
+        self._entries.clear()
+        self._neighbor_vectors = None
+        self._neighbor_keys = [None] * len(self._neighbor_keys)
+        self._neighbor_position = 0
+
+    def get_stats(self):
+        """Return hit/miss/eviction counts and the current size"""
+        stats = dict(self.stats)
+        stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['near_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['near_hits']) / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,140 @@
+import cv2
+import numpy as np
+
+
+class AdaptiveScheduler:
+    """Decide per frame whether MediaPipe detection and classification need to run.
+
+    Cheap signals gate the expensive work:
+    - frame-diff energy on a small grayscale thumbnail, measured inside the
+      region around the last tracked hand and over the whole frame
+    - landmark velocity since the last classified frame
+
+    When the hand region is still, the last landmarks are reused instead of
+    running MediaPipe; when the landmarks barely moved, the last label is reused
+    instead of running the classifier. Budgets force a full detection or
+    classification after a number of consecutive skipped frames so a wrong
+    decision can't persist.
+    """
+
+    def __init__(self, motion_threshold=4.0, scene_motion_threshold=8.0,
+                 velocity_threshold=0.01, max_reuse_frames=5, max_skip_classify=10,
+                 thumbnail_size=(64, 48)):
+        self.motion_threshold = motion_threshold
+        self.scene_motion_threshold = scene_motion_threshold
+        self.velocity_threshold = velocity_threshold
+        self.max_reuse_frames = max_reuse_frames
+        self.max_skip_classify = max_skip_classify
+        self.thumbnail_size = thumbnail_size
+
+        width, height = thumbnail_size
+        self._small = None
+        self._thumbnail = np.zeros((height, width), dtype=np.uint8)
+        self._previous_thumbnail = np.zeros((height, width), dtype=np.uint8)
+        self._diff = np.zeros((height, width), dtype=np.uint8)
+        self._has_previous = False
+
+        # Normalized (x0, y0, x1, y1) box around the last detected hand
+        self._hand_box = None
+        self._has_detection = False
+        self._classified_landmarks = None
+        self._reused_frames = 0
+        self._skipped_classifications = 0
+
+        self.stats = {
+            'frames': 0,
+            'detections': 0,
+            'reused_landmarks': 0,
+            'classifications': 0,
+            'skipped_classifications': 0
+        }
+
+    def motion_energy(self, frame):
+        """Return (hand_region_energy, scene_energy) between this frame and the previous one"""
+        if self._small is None or self._small.shape[2] != frame.shape[2]:
+            width, height = self.thumbnail_size
+            self._small = np.zeros((height, width, frame.shape[2]), dtype=frame.dtype)
+
+        cv2.resize(frame, self.thumbnail_size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._thumbnail)
+
+        if not self._has_previous:
+            self._has_previous = True
+            self._thumbnail, self._previous_thumbnail = self._previous_thumbnail, self._thumbnail
+            return float('inf'), float('inf')
+
+        cv2.absdiff(self._thumbnail, self._previous_thumbnail, dst=self._diff)
+        self._thumbnail, self._previous_thumbnail = self._previous_thumbnail, self._thumbnail
+
+        scene_energy = float(self._diff.mean())
+        if self._hand_box is None:
+            return scene_energy, scene_energy
+
+        width, height = self.thumbnail_size
+        x0, y0, x1, y1 = self._hand_box
+        region = self._diff[int(y0 * height):int(np.ceil(y1 * height)),
+                            int(x0 * width):int(np.ceil(x1 * width))]
+        region_energy = float(region.mean()) if region.size else scene_energy
+        return region_energy, scene_energy
+
+    def should_detect(self, frame):
+        """Return True if MediaPipe should run on this frame, False to reuse the last landmarks"""
+        self.stats['frames'] += 1
+        region_energy, scene_energy = self.motion_energy(frame)
+
+        if (not self._has_detection or
+                self._reused_frames >= self.max_reuse_frames or
+                region_energy > self.motion_threshold or
+                scene_energy > self.scene_motion_threshold):
+            self._reused_frames = 0
+            self.stats['detections'] += 1
+            return True
+
+        self._reused_frames += 1
+        self.stats['reused_landmarks'] += 1
+        return False
+
+    def record_detection(self, hands):
+        """Remember where the detected hands are for the next motion check"""
+        self._has_detection = True
+        if hands is None:
+            self._hand_box = None
+            return
+
+        xy = hands.landmarks[:, :, :2]
+        x0, y0 = np.clip(xy.min(axis=(0, 1)) - 0.05, 0.0, 1.0)
+        x1, y1 = np.clip(xy.max(axis=(0, 1)) + 0.05, 0.0, 1.0)
+        self._hand_box = (x0, y0, x1, y1)
+
+    def should_classify(self, landmarks):
+        """Return True if the classifier should run, False to reuse the last label"""
+        if (self._classified_landmarks is None or
+                self._skipped_classifications >= self.max_skip_classify or
+                float(np.abs(landmarks - self._classified_landmarks).mean()) > self.velocity_threshold):
+            self._skipped_classifications = 0
+            self.stats['classifications'] += 1
+            return True
+
+        self._skipped_classifications += 1
+        self.stats['skipped_classifications'] += 1
+        return False
+
+    def record_classification(self, landmarks):
+        """Remember the landmarks the last label was computed from (None when no hand was seen)"""
+        if landmarks is None:
+            self._classified_landmarks = None
+            return
+        if self._classified_landmarks is None or self._classified_landmarks.shape != landmarks.shape:
+            self._classified_landmarks = np.empty_like(landmarks)
+        np.copyto(self._classified_landmarks, landmarks)
+
+    def reset(self):
+        """Forget tracked state so the next frame runs full detection"""
+        self._has_previous = False
+        self._has_detection = False
+        self._hand_box = None
+        self._classified_landmarks = None
+
+    def get_stats(self):
+        """Return counts of work done and skipped"""
+        return dict(self.stats)
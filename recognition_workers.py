@@ -0,0 +1,240 @@
+import itertools
+import multiprocessing as mp
+import threading
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+
+import numpy as np
+
+from frame_buffers import FrameBufferPool
+
+STARTING = 'starting'
+READY = 'ready'
+DEAD = 'dead'
+
+
+def _recognition_worker(pool_name, frame_shape, num_slots, model_path, backend,
+                        task_conn, result_conn):
+    """Worker process: own a GestureRecognition and process frames from shared memory"""
+    try:
+        from gesture_recognition import GestureRecognition
+
+        frame_pool = FrameBufferPool.attach(pool_name, frame_shape, num_slots)
+        recognizer = GestureRecognition(model_path, backend=backend)
+    except Exception as e:
+        result_conn.send(('failed', f"{type(e).__name__}: {e}"))
+        return
+    result_conn.send(('ready', recognizer.labels))
+
+    while True:
+        try:
+            task = task_conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+
+        task_id, slot = task
+        try:
+            landmarks, _ = recognizer.extract_hand_landmarks(frame_pool.buffers[slot])
+            gesture, confidence = recognizer.predict_with_confidence(landmarks)
+            result_conn.send(('result', task_id, slot, (gesture, float(confidence), landmarks), None))
+        except Exception as e:
+            result_conn.send(('result', task_id, slot, None, str(e)))
+
+    frame_pool.close()
+
+
+class RecognitionWorkerPool:
+    """Pool of processes that each own a GestureRecognition instance.
+
+    MediaPipe and the classifier run outside the server process, so several
+    cameras can be recognized in parallel on separate cores. Frames are copied
+    once into a shared-memory slot and only the slot index travels over the
+    worker's task pipe; workers send back the gesture label, its confidence
+    and the landmark vector. Frames submitted with the same stream id always go to the same
+    worker, so MediaPipe keeps tracking that camera's hand between frames.
+    When every slot is busy, submit() blocks until a worker frees one.
+
+    Each worker has its own pipes, so a worker that dies cannot leave behind a
+    lock the others need, and its death shows up as the end of its result
+    pipe. Its frames then fail with its error and later frames go to the
+    remaining workers. A worker that fails to start makes wait_until_ready()
+    raise.
+    """
+
+    def __init__(self, num_workers=None, frame_shape=(480, 640, 3), model_path=None,
+                 backend=None, slots_per_worker=2):
+        self.num_workers = num_workers or mp.cpu_count()
+        self.frame_shape = tuple(frame_shape)
+        self.num_slots = self.num_workers * slots_per_worker
+        self.labels = None
+
+        self.frame_pool = FrameBufferPool(self.frame_shape, capacity=self.num_slots, shared=True)
+
+        self._task_ids = itertools.count()
+        # task_id -> (future, worker_id, slot)
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._states = [STARTING] * self.num_workers
+        self._errors = [None] * self.num_workers
+        self._closing = False
+
+        # Spawn so workers don't inherit the server's threads and TF state
+        ctx = mp.get_context('spawn')
+        self._workers = []
+        self._task_conns = []
+        self._result_conns = []
+        for _ in range(self.num_workers):
+            task_reader, task_writer = ctx.Pipe(duplex=False)
+            result_reader, result_writer = ctx.Pipe(duplex=False)
+            worker = ctx.Process(target=_recognition_worker,
+                                 args=(self.frame_pool.name, self.frame_shape, self.num_slots,
+                                       model_path, backend, task_reader, result_writer),
+                                 daemon=True)
+            worker.start()
+            # Only the worker may hold these ends, or its exit would go unnoticed
+            task_reader.close()
+            result_writer.close()
+            self._workers.append(worker)
+            self._task_conns.append(task_writer)
+            self._result_conns.append(result_reader)
+
+        self._result_thread = threading.Thread(target=self._collect_results, daemon=True)
+        self._result_thread.start()
+
+    def wait_until_ready(self, timeout=None):
+        """Block until every worker has loaded its models.
+
+        Returns False on timeout and raises RuntimeError as soon as a worker
+        fails to start.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: STARTING not in self._states, timeout)
+            for worker_id, state in enumerate(self._states):
+                if state == DEAD:
+                    raise RuntimeError(f"Recognition worker {worker_id} failed: "
+                                       f"{self._errors[worker_id]}")
+            return STARTING not in self._states
+
+    def _pick_worker(self, stream):
+        """Worker for a frame: the stream's own worker, else the least busy one; call with the lock held"""
+        alive = [worker_id for worker_id, state in enumerate(self._states) if state != DEAD]
+        if not alive:
+            return None
+        if stream is not None:
+            return alive[stream % len(alive)]
+        load = {worker_id: 0 for worker_id in alive}
+        for _, worker_id, _ in self._pending.values():
+            load[worker_id] += 1
+        return min(alive, key=load.get)
+
+    def submit(self, frame, stream=None):
+        """Queue a BGR frame and return a Future resolving to (gesture, confidence, landmarks)"""
+        if not self.frame_pool.fits(frame):
+            raise ValueError(f"Expected frame of shape {self.frame_shape}, got {frame.shape}")
+
+        slot = self.frame_pool.acquire()
+        np.copyto(self.frame_pool.buffers[slot], frame)
+
+        future = Future()
+        with self._condition:
+            worker_id = None if self._closing else self._pick_worker(stream)
+            if worker_id is None:
+                self.frame_pool.release(slot)
+                future.set_exception(RuntimeError("No recognition worker is running"))
+                return future
+            task_id = next(self._task_ids)
+            self._pending[task_id] = (future, worker_id, slot)
+            try:
+                self._task_conns[worker_id].send((task_id, slot))
+            except OSError as e:
+                self._worker_died(worker_id, f"task pipe closed ({e})")
+        return future
+
+    def process_frame(self, frame, timeout=None, stream=None):
+        """Recognize a frame in a worker process, blocking until it is done"""
+        return self.submit(frame, stream).result(timeout=timeout)
+
+    def _worker_died(self, worker_id, error):
+        """Mark a worker dead and fail the frames it was given; call with the lock held"""
+        if self._states[worker_id] == DEAD:
+            return
+        self._states[worker_id] = DEAD
+        self._errors[worker_id] = error
+        if not self._closing:
+            print(f"Recognition worker {worker_id} failed: {error}")
+
+        for task_id, (future, owner, slot) in list(self._pending.items()):
+            if owner == worker_id:
+                del self._pending[task_id]
+                self.frame_pool.release(slot)
+                future.set_exception(RuntimeError(f"Recognition worker {worker_id} failed: {error}"))
+        self._condition.notify_all()
+
+    def _handle_message(self, worker_id, message):
+        """Apply one worker message; returns (future, result or exception) to resolve, or None"""
+        with self._condition:
+            if message[0] == 'ready':
+                self._states[worker_id] = READY
+                self.labels = message[1]
+                self._condition.notify_all()
+                return None
+            if message[0] == 'failed':
+                self._worker_died(worker_id, message[1])
+                return None
+
+            _, task_id, slot, result, error = message
+            pending = self._pending.pop(task_id, None)
+            if pending is None:
+                return None
+            self.frame_pool.release(slot)
+        if error is not None:
+            return pending[0], RuntimeError(error)
+        return pending[0], result
+
+    def _collect_results(self):
+        """Resolve futures from worker results in background thread"""
+        conns = {conn: worker_id for worker_id, conn in enumerate(self._result_conns)}
+        while conns:
+            for conn in wait(list(conns)):
+                worker_id = conns[conn]
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    # The worker exited: it crashed, was killed or was stopped by close()
+                    del conns[conn]
+                    self._workers[worker_id].join(timeout=1)
+                    with self._condition:
+                        self._worker_died(worker_id, f"exited with code "
+                                                     f"{self._workers[worker_id].exitcode}")
+                    continue
+
+                resolved = self._handle_message(worker_id, message)
+                if resolved is not None:
+                    future, outcome = resolved
+                    if isinstance(outcome, Exception):
+                        future.set_exception(outcome)
+                    else:
+                        future.set_result(outcome)
+
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        with self._condition:
+            self._closing = True
+            for conn in self._task_conns:
+                try:
+                    conn.send(None)
+                except OSError:
+                    pass
+        for worker in self._workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+
+        # Every result pipe has ended now, failing any frame still in flight
+        self._result_thread.join(timeout=5)
+        for conn in self._task_conns + self._result_conns:
+            conn.close()
+
+        self.frame_pool.close()
@@ -0,0 +1,187 @@
+import argparse
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+from camera_capture import CameraCapture
+from gesture_recognition import GestureRecognition
+from landmark_dataset import LandmarkDatasetWriter
+
+
+class LandmarkRecorder:
+    """Write labelled landmark frames to a landmark dataset on a background thread.
+
+    record() only copies the landmarks (and optionally the frame) onto a
+    bounded queue, so the capture loop never waits on disk. If the writer
+    falls behind and the queue fills up, new frames are dropped and counted
+    instead of stalling capture. Frames are saved as JPEGs next to the
+    dataset only when save_frames is set.
+    """
+
+    def __init__(self, dataset_path, label, session_name=None, save_frames=False,
+                 queue_size=256, flush_interval=1.0, **metadata):
+        self.dataset_path = dataset_path
+        self.label = label
+        self.save_frames = save_frames
+        self.flush_interval = flush_interval
+
+        self.writer = LandmarkDatasetWriter(dataset_path)
+        self.session_id = self.writer.begin_session(session_name, label=label, **metadata)
+        self.frames_dir = None
+        if save_frames:
+            self.frames_dir = os.path.join(dataset_path, 'frames', f"session_{self.session_id}")
+            os.makedirs(self.frames_dir, exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._started_at = None
+
+        self.stats = {'frames_seen': 0, 'frames_queued': 0, 'frames_written': 0,
+                      'frames_dropped': 0, 'frames_without_hand': 0}
+
+    def start(self):
+        self._started_at = time.time()
+        self._thread = threading.Thread(target=self._write_frames, daemon=True)
+        self._thread.start()
+        return self
+
+    def record(self, landmarks, timestamp, frame=None):
+        """Queue one frame's landmarks (None when no hand was found) for writing"""
+        self.stats['frames_seen'] += 1
+        if landmarks is None:
+            self.stats['frames_without_hand'] += 1
+            return
+
+        # Landmarks and camera frames are reused buffers; the writer needs its own copies
+        item = (landmarks.copy(), timestamp,
+                frame.copy() if self.save_frames and frame is not None else None)
+        try:
+            self._queue.put_nowait(item)
+            self.stats['frames_queued'] += 1
+        except queue.Full:
+            self.stats['frames_dropped'] += 1
+
+    def _write_frames(self):
+        last_flush = time.time()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            landmarks, timestamp, frame = item
+            if frame is not None:
+                # Named after the dataset row the landmarks go to
+                cv2.imwrite(os.path.join(self.frames_dir, f"{len(self.writer):08d}.jpg"), frame)
+            self.writer.append(landmarks, self.label, timestamp)
+            self.stats['frames_written'] += 1
+
+            if time.time() - last_flush >= self.flush_interval:
+                self.writer.flush()
+                last_flush = time.time()
+
+    def get_stats(self):
+        """Return frame counters plus the writer queue depth"""
+        stats = dict(self.stats)
+        stats['queue_depth'] = self._queue.qsize()
+        return stats
+
+    def stop(self):
+        """Drain the queue, record the session summary and close the dataset"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+        session = self.writer.session_info[self.session_id]
+        session['duration'] = round(time.time() - self._started_at, 3) if self._started_at else 0.0
+        session.update(self.stats)
+        self.writer.close()
+        return session
+
+
+def record_session(camera, recognizer, recorder, duration=None, preview=False):
+    """Capture frames at camera rate and feed their landmarks to the recorder.
+
+    Prints throughput once per second; stops after duration seconds, at the
+    end of a recorded source, on 'q' in the preview window, or on Ctrl+C.
+    """
+    start = time.time()
+    last_report = start
+    last_stats = recorder.get_stats()
+    try:
+        while duration is None or time.time() - start < duration:
+            try:
+                frame, _, timestamp = camera.read_latest()
+            except RuntimeError:
+                if camera.finished:
+                    print("End of source reached")
+                    break
+                raise
+            landmarks, hand_landmarks = recognizer.extract_hand_landmarks(frame)
+            recorder.record(landmarks, timestamp, frame)
+
+            if preview:
+                frame = recognizer.draw_hand_landmarks(frame.copy(), hand_landmarks)
+                cv2.putText(frame, f"Recording: {recorder.label}", (10, 30),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+                cv2.imshow('Sign2Text recorder', frame)
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+
+            now = time.time()
+            if now - last_report >= 1.0:
+                stats = recorder.get_stats()
+                elapsed = now - last_report
+                print(f"[{now - start:5.1f}s] "
+                      f"{(stats['frames_seen'] - last_stats['frames_seen']) / elapsed:5.1f} fps captured, "
+                      f"{(stats['frames_written'] - last_stats['frames_written']) / elapsed:5.1f} fps written, "
+                      f"{stats['frames_without_hand']} without hand, "
+                      f"{stats['frames_dropped']} dropped, queue {stats['queue_depth']}")
+                last_report, last_stats = now, stats
+    except KeyboardInterrupt:
+        print("\nRecording interrupted")
+    finally:
+        if preview:
+            cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record labelled hand landmarks for training")
+    parser.add_argument('label', help="gesture label for this session")
+    parser.add_argument('--dataset', default='landmark_data', help="landmark dataset directory")
+    parser.add_argument('--duration', type=float, help="seconds to record (default: until 'q'/Ctrl+C)")
+    parser.add_argument('--countdown', type=float, default=3.0, help="seconds to wait before recording")
+    parser.add_argument('--camera', default='0',
+                        help="camera index, video file or frame source URI (see frame_sources.py)")
+    parser.add_argument('--session', help="session name (default: session_<n>)")
+    parser.add_argument('--signer', help="signer name or id stored with the session")
+    parser.add_argument('--save-frames', action='store_true',
+                        help="also save camera frames as JPEGs (landmarks only by default)")
+    parser.add_argument('--no-preview', action='store_true', help="don't show the camera window")
+    args = parser.parse_args()
+
+    camera = CameraCapture(args.camera, threaded=True)
+    camera.start_capture()
+    recognizer = GestureRecognition()
+
+    if args.countdown > 0:
+        print(f"Recording '{args.label}' in {args.countdown:.0f}s...")
+        time.sleep(args.countdown)
+
+    frame_height, frame_width = camera.get_frame().shape[:2]
+    recorder = LandmarkRecorder(args.dataset, args.label, session_name=args.session,
+                                save_frames=args.save_frames, signer=args.signer,
+                                camera=args.camera, width=frame_width,
+                                height=frame_height).start()
+    try:
+        record_session(camera, recognizer, recorder, args.duration, preview=not args.no_preview)
+    finally:
+        camera.release()
+        session = recorder.stop()
+
+    print(f"Session '{session['name']}' saved to {args.dataset}: "
+          f"{session['frames_written']} frames in {session['duration']:.1f}s "
+          f"({session['frames_dropped']} dropped, {session['frames_without_hand']} without hand)")
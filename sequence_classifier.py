@@ -0,0 +1,189 @@
+import json
+import os
+
+import numpy as np
+
+from inference_backend import load_backend
+from inference_engine import decode_prediction
+
+# Per-frame summaries concatenated into one window feature vector:
+# current frame, window mean, window std, net displacement, mean |velocity|
+NUM_SUMMARIES = 5
+
+# Window used for sequence models saved without their settings
+DEFAULT_WINDOW_SIZE = 30
+
+
+def sequence_config_path(model_path):
+    """Return the settings file saved next to a sequence model (gesture_sequence_model.h5 -> gesture_sequence_model.sequence.json)"""
+    return os.path.splitext(model_path)[0] + '.sequence.json'
+
+
+def save_sequence_config(model_path, window_size, num_features=63):
+    """Write the window a sequence model was trained on next to the model"""
+    path = sequence_config_path(model_path)
+    with open(path, 'w') as f:
+        json.dump({'window_size': window_size, 'num_features': num_features}, f, indent=2)
+    return path
+
+
+def load_sequence_config(model_path):
+    """Load the settings saved with a sequence model, or None if there are none"""
+    path = sequence_config_path(model_path)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def window_features(windows):
+    """Compute sequence features for a batch of windows shaped (N, window_size, num_features).
+
+    This is the reference (vectorized, training-time) version of what
+    SequenceBuffer.features() maintains incrementally for a live stream.
+    """
+    windows = np.asarray(windows, dtype=np.float64)
+    current = windows[:, -1]
+    mean = windows.mean(axis=1)
+    std = np.sqrt(np.maximum((windows ** 2).mean(axis=1) - mean ** 2, 0.0))
+    displacement = windows[:, -1] - windows[:, 0]
+    velocity = np.abs(np.diff(windows, axis=1)).sum(axis=1) / (windows.shape[1] - 1)
+    return np.concatenate([current, mean, std, displacement, velocity], axis=1).astype(np.float32)
+
+
+class SequenceBuffer:
+    """Ring buffer of the last window_size landmark vectors with running window statistics.
+
+    Pushing a frame updates the running sums in O(num_features), so the window
+    features never need the whole window to be rescanned. The sums are rebuilt
+    from the buffer once per window to stop floating-point drift.
+    """
+
+    def __init__(self, window_size=30, num_features=63):
+        self.window_size = window_size
+        self.num_features = num_features
+        self._frames = np.zeros((window_size, num_features), dtype=np.float64)
+        self._sum = np.zeros(num_features, dtype=np.float64)
+        self._sum_squares = np.zeros(num_features, dtype=np.float64)
+        self._velocity_sum = np.zeros(num_features, dtype=np.float64)
+        self._step = np.zeros(num_features, dtype=np.float64)
+        self._features = np.zeros(NUM_SUMMARIES * num_features, dtype=np.float32)
+        self.count = 0
+        self._head = 0
+
+    @property
+    def is_full(self):
+        return self.count >= self.window_size
+
+    def reset(self):
+        """Forget all buffered frames"""
+        self._sum[:] = 0
+        self._sum_squares[:] = 0
+        self._velocity_sum[:] = 0
+        self.count = 0
+        self._head = 0
+
+    def _oldest(self):
+        return self._frames[self._head] if self.is_full else self._frames[0]
+
+    def _newest(self):
+        return self._frames[(self._head - 1) % self.window_size]
+
+    def push(self, landmarks):
+        """Add a landmark vector, evicting the oldest one when the window is full"""
+        landmarks = np.ravel(landmarks)
+
+        if self.count > 0:
+            np.subtract(landmarks, self._newest(), out=self._step)
+            np.abs(self._step, out=self._step)
+            self._velocity_sum += self._step
+
+        if self.is_full:
+            outgoing = self._frames[self._head]
+            self._sum -= outgoing
+            self._sum_squares -= outgoing ** 2
+            # The step from the outgoing frame to its successor leaves the window too
+            np.subtract(self._frames[(self._head + 1) % self.window_size], outgoing, out=self._step)
+            np.abs(self._step, out=self._step)
+            self._velocity_sum -= self._step
+
+        self._frames[self._head] = landmarks
+        self._sum += self._frames[self._head]
+        self._sum_squares += self._frames[self._head] ** 2
+        self._head = (self._head + 1) % self.window_size
+        self.count += 1
+
+        if self._head == 0 and self.is_full:
+            self._rebuild_sums()
+
+    def _rebuild_sums(self):
+        """Recompute the running sums exactly from the buffered frames"""
+        ordered = np.roll(self._frames, -self._head, axis=0)
+        self._sum[:] = ordered.sum(axis=0)
+        self._sum_squares[:] = (ordered ** 2).sum(axis=0)
+        self._velocity_sum[:] = np.abs(np.diff(ordered, axis=0)).sum(axis=0)
+
+    def features(self):
+        """Return the window feature vector (see window_features) for the buffered frames"""
+        n = min(self.count, self.window_size)
+        size = self.num_features
+        mean = self._sum / n
+        std = np.sqrt(np.maximum(self._sum_squares / n - mean ** 2, 0.0))
+
+        out = self._features
+        out[:size] = self._newest()
+        out[size:2 * size] = mean
+        out[2 * size:3 * size] = std
+        out[3 * size:4 * size] = self._newest() - self._oldest()
+        out[4 * size:] = self._velocity_sum / max(n - 1, 1)
+        return out
+
+
+class StreamingSequenceClassifier:
+    """Classify dynamic signs from a sliding window of landmark vectors.
+
+    Each frame is pushed into a SequenceBuffer; once the window is full, the
+    temporal model runs every stride frames on the incrementally maintained
+    window features and the latest (label, confidence) is returned.
+
+    The window size defaults to the one saved with the model (see
+    save_sequence_config). The window features have the same length for
+    every window size, so a mismatched window would not fail, only
+    misclassify.
+    """
+
+    def __init__(self, model_path, labels, backend=None, window_size=None, stride=1,
+                 confidence_threshold=0.7, num_features=63):
+        config = load_sequence_config(model_path)
+        if config is not None:
+            if window_size is not None and window_size != config['window_size']:
+                raise ValueError(f"{model_path} was trained on {config['window_size']}-frame "
+                                 f"windows, not {window_size}")
+            window_size = config['window_size']
+            num_features = config['num_features']
+        elif window_size is None:
+            window_size = DEFAULT_WINDOW_SIZE
+
+        self.model = load_backend(model_path, backend)
+        self.labels = labels
+        self.stride = stride
+        self.confidence_threshold = confidence_threshold
+        self.buffer = SequenceBuffer(window_size, num_features)
+        self.last_prediction = None
+
+    def update(self, landmarks):
+        """Push a frame; returns (label, confidence) or None while the window is filling"""
+        self.buffer.push(landmarks)
+        if not self.buffer.is_full:
+            return None
+
+        if self.last_prediction is None or self.buffer.count % self.stride == 0:
+            predictions = self.model.predict(self.buffer.features()[np.newaxis])
+            self.last_prediction = decode_prediction(predictions[0], self.labels,
+                                                     self.confidence_threshold)
+        return self.last_prediction
+
+    def reset(self):
+        """Start a new window (e.g. when the hand leaves the frame)"""
+        self.buffer.reset()
+        self.last_prediction = None
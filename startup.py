@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+def env_flag(name, default=False):
+    """Read an on/off setting such as SIGN2TEXT_ROI=1 from the environment"""
+    value = os.environ.get(name)
+    return default if value is None else value.lower() in ('1', 'true', 'yes', 'on')
+
+# Model the web servers load in the background (missing file: run without a classifier)
+DEFAULT_MODEL_PATH = os.environ.get('SIGN2TEXT_MODEL', 'gesture_model.h5')
+
+# Frame source the web servers capture from: a camera index, a path or a URI
+# such as 'file:clip.mp4?loop=1' (see frame_sources.open_source); unset means
+# the local camera
+CAMERA_SOURCE = os.environ.get('SIGN2TEXT_CAMERA')
+
+# Sliding-window model for dynamic signs (see sequence_classifier.py); unset means
+# only the per-frame model runs
+SEQUENCE_MODEL_PATH = os.environ.get('SIGN2TEXT_SEQUENCE_MODEL')
+
+# Reuse classifier results for a held pose (see prediction_cache.py); off by default
+PREDICTION_CACHE = env_flag('SIGN2TEXT_PREDICTION_CACHE')
+
+# Run MediaPipe on a crop around the tracked hand (see hand_roi.py); off by default
+ROI_TRACKING = env_flag('SIGN2TEXT_ROI')
+
+STARTING = 'starting'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class StartupTracker:
+    """Run slow component setup on a background thread and report its progress.
+
+    The loader is split into named phases (e.g. 'recognizer', 'warmup'); the
+    current phase and the time each phase took are available at any point
+    through get_status(), so a status endpoint can answer while heavy imports
+    and model loading are still running.
+    """
+
+    def __init__(self):
+        self.phase = STARTING
+        self.error = None
+        self.timings = {}
+        self._started_at = time.time()
+        self._ready = threading.Event()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def is_ready(self):
+        return self._ready.is_set()
+
+    @property
+    def failed(self):
+        return self.phase == FAILED
+
+    @contextmanager
+    def step(self, name):
+        """Time one startup phase and make it the current phase while it runs"""
+        with self._lock:
+            self.phase = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.timings[name] = round(time.perf_counter() - start, 3)
+
+    def start(self, load, on_done=None):
+        """Call load(tracker) on a background thread; the tracker is ready when it returns.
+
+        on_done(tracker), if given, is called once startup is ready or has failed.
+        """
+        self._thread = threading.Thread(target=self._run, args=(load, on_done), daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self, load, on_done):
+        try:
+            load(self)
+        except Exception as e:
+            print(f"Startup failed in phase '{self.phase}': {e}")
+            with self._lock:
+                self.error = str(e)
+                self.phase = FAILED
+        else:
+            with self._lock:
+                self.timings['total'] = round(time.time() - self._started_at, 3)
+                self.phase = READY
+            self._ready.set()
+            print(f"Startup complete in {self.timings['total']:.2f}s: {self.timings}")
+        finally:
+            self._done.set()
+            if on_done is not None:
+                on_done(self)
+
+    def wait_until_ready(self, timeout=None):
+        """Block until loading finishes; returns True if it succeeded"""
+        self._done.wait(timeout)
+        return self.is_ready
+
+    def get_status(self):
+        """Return the current phase, per-phase timings and any error"""
+        with self._lock:
+            return {
+                'phase': self.phase,
+                'ready': self.is_ready,
+                'error': self.error,
+                'timings': dict(self.timings),
+                'uptime': round(time.time() - self._started_at, 3)
+            }
@@ -0,0 +1,213 @@
+import socket
+import threading
+
+import cv2
+
+from metrics import stage_timer
+
+
+class StreamProfile:
+    """JPEG quality, resolution scale and frame rate cap for one video viewer"""
+
+    def __init__(self, name, quality, scale=1.0, max_fps=None):
+        self.name = name
+        self.quality = quality
+        self.scale = scale
+        self.max_fps = max_fps
+
+    def __repr__(self):
+        return (f"StreamProfile({self.name!r}, quality={self.quality}, scale={self.scale}, "
+                f"max_fps={self.max_fps})")
+
+
+# Best first; viewers move one step at a time between neighbouring profiles.
+# max_fps None means as fast as the pipeline publishes frames.
+STREAM_PROFILES = (
+    StreamProfile('high', quality=85, scale=1.0),
+    StreamProfile('medium', quality=70, scale=0.75),
+    StreamProfile('low', quality=55, scale=0.5, max_fps=5),
+    StreamProfile('minimal', quality=40, scale=0.5, max_fps=2),
+)
+DEFAULT_PROFILE = 'medium'
+
+# Kernel send buffer for video sockets, roughly one full-size frame. With the
+# default (autotuned to megabytes) a slow viewer's writes only block after
+# seconds of video have queued up, so its profile would adapt far too late.
+STREAM_SEND_BUFFER = 128 * 1024
+
+
+def encode_jpeg(frame, profile=None):
+    """JPEG-encode a frame, downscaled and at the quality of profile (OpenCV defaults if None)"""
+    with stage_timer('jpeg_encode'):
+        if profile is None:
+            return cv2.imencode('.jpg', frame)[1].tobytes()
+        if profile.scale != 1.0:
+            # INTER_AREA is only fast for integer factors; at 0.75 it costs more than the encode
+            interpolation = cv2.INTER_AREA if (1 / profile.scale).is_integer() else cv2.INTER_LINEAR
+            frame = cv2.resize(frame, None, fx=profile.scale, fy=profile.scale,
+                               interpolation=interpolation)
+        return cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, profile.quality])[1].tobytes()
+
+
+def limit_send_buffer(sock, size=STREAM_SEND_BUFFER):
+    """Shrink a streaming socket's send buffer; a no-op if the server doesn't expose the socket"""
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, size)
+    except (AttributeError, OSError):
+        pass
+
+
+class SharedFrameEncoder:
+    """Encodes each published frame at most once per profile, on demand.
+
+    Viewers ask for (frame_id, profile); the first one encodes and the rest
+    get the same bytes, so the encode cost grows with the number of profiles
+    in use rather than the number of viewers, and profiles nobody is watching
+    are never encoded. Only the newest frame's encoding is kept per profile.
+    """
+
+    def __init__(self, profiles=STREAM_PROFILES):
+        self._locks = {profile.name: threading.Lock() for profile in profiles}
+        self._latest = {profile.name: (None, None) for profile in profiles}
+        self.frames_encoded = 0
+        self.encodes_reused = 0
+
+    def encode(self, frame_id, frame, profile):
+        with self._locks[profile.name]:
+            latest_id, frame_bytes = self._latest[profile.name]
+            if latest_id == frame_id:
+                self.encodes_reused += 1
+                return frame_bytes
+
+            frame_bytes = encode_jpeg(frame, profile)
+            self.frames_encoded += 1
+            # A viewer still on an older frame must not evict the newer encoding
+            if latest_id is None or frame_id > latest_id:
+                self._latest[profile.name] = (frame_id, frame_bytes)
+            return frame_bytes
+
+    def get_stats(self):
+        return {'frames_encoded': self.frames_encoded, 'encodes_reused': self.encodes_reused}
+
+
+class FrameRateMeter:
+    """Smoothed rate at which a pipeline actually publishes frames.
+
+    Stream controllers need the real frame rate rather than the configured
+    cap: a pipeline slower than its cap would otherwise make cheaper profiles
+    skip too many frames and make send times look like a larger share of the
+    frame interval than they are. Gaps longer than max_gap (the producer
+    idling without viewers) are not counted.
+    """
+
+    def __init__(self, default_fps=30, smoothing=0.1, max_gap=5.0):
+        self.default_fps = default_fps
+        self.smoothing = smoothing
+        self.max_gap = max_gap
+        self.interval = None
+        self._last_at = None
+
+    def tick(self, now):
+        """Record a published frame at time now (seconds)"""
+        if self._last_at is not None:
+            gap = now - self._last_at
+            if 0 < gap <= self.max_gap:
+                if self.interval is None:
+                    self.interval = gap
+                else:
+                    self.interval += self.smoothing * (gap - self.interval)
+        self._last_at = now
+
+    @property
+    def fps(self):
+        """Measured frames per second, or default_fps until two frames have been published"""
+        return 1.0 / self.interval if self.interval else self.default_fps
+
+
+class AdaptiveStreamController:
+    """Chooses one viewer's stream profile from how fast its frames are sent.
+
+    The caller reports each frame's size and how long sending it took (the
+    time the server spent writing it to the socket, which grows once the
+    client's connection is saturated). Send time as a fraction of the
+    interval between the viewer's frames is smoothed; above downgrade_at the
+    viewer drops to the next cheaper profile, and after upgrade_after seconds
+    below upgrade_below it moves back up. An upgrade that has to be undone
+    doubles the wait before the next one (up to max_upgrade_after), so a
+    connection just below a profile's bitrate doesn't flap. Changes are at
+    least min_dwell seconds apart so a profile is measured before it is judged.
+    pipeline_fps is the rate frames are published at; callers keep it current
+    from a FrameRateMeter. send_rate is the achieved bytes per second, for
+    monitoring.
+    """
+
+    def __init__(self, profiles=STREAM_PROFILES, start=DEFAULT_PROFILE, pipeline_fps=10,
+                 downgrade_at=0.5, upgrade_below=0.15, upgrade_after=3.0, max_upgrade_after=60.0,
+                 min_dwell=1.0, smoothing=0.3):
+        self.profiles = profiles
+        self.index = [profile.name for profile in profiles].index(start)
+        self.pipeline_fps = pipeline_fps
+        self.downgrade_at = downgrade_at
+        self.upgrade_below = upgrade_below
+        self.upgrade_after = upgrade_after
+        self.max_upgrade_after = max_upgrade_after
+        self.min_dwell = min_dwell
+        self.smoothing = smoothing
+
+        self.utilization = 0.0
+        self.send_rate = 0.0
+        self._upgrade_wait = upgrade_after
+        self._last_switch_was_upgrade = False
+        self._changed_at = None
+        self._idle_since = None
+        self._last_sent_at = None
+
+    @property
+    def profile(self):
+        return self.profiles[self.index]
+
+    @property
+    def frame_stride(self):
+        """Published frames per frame sent to this viewer (profiles with a lower max_fps skip frames)"""
+        if not self.profile.max_fps:
+            return 1
+        return max(1, round(self.pipeline_fps / self.profile.max_fps))
+
+    @property
+    def frame_interval(self):
+        """Expected seconds between this viewer's frames"""
+        return self.frame_stride / self.pipeline_fps
+
+    def frame_sent(self, num_bytes, send_seconds, now):
+        """Record one sent frame and adapt the profile; returns the profile for the next frame"""
+        if self._changed_at is None:
+            self._changed_at = now
+
+        self.utilization += self.smoothing * (send_seconds / self.frame_interval - self.utilization)
+        if self._last_sent_at is not None and now > self._last_sent_at:
+            self.send_rate += self.smoothing * (num_bytes / (now - self._last_sent_at) - self.send_rate)
+        self._last_sent_at = now
+
+        if now - self._changed_at < self.min_dwell:
+            return self.profile
+
+        if self.utilization > self.downgrade_at and self.index < len(self.profiles) - 1:
+            if self._last_switch_was_upgrade:
+                self._upgrade_wait = min(2 * self._upgrade_wait, self.max_upgrade_after)
+            self._switch(self.index + 1, now)
+        elif self.utilization < self.upgrade_below and self.index > 0:
+            if self._idle_since is None:
+                self._idle_since = now
+            elif now - self._idle_since >= self._upgrade_wait:
+                self._switch(self.index - 1, now)
+        else:
+            self._idle_since = None
+        return self.profile
+
+    def _switch(self, index, now):
+        self._last_switch_was_upgrade = index < self.index
+        self.index = index
+        self._changed_at = now
+        self._idle_since = None
+        # The old measurements describe a different frame size and rate
+        self.utilization = (self.downgrade_at + self.upgrade_below) / 2
@@ -0,0 +1,95 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import batch_process
+from batch_process import find_videos, output_paths, process_videos, split_segments
+
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+    return str(path)
+
+
+def write_video(path, num_frames=10, size=(160, 120)):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), 10.0, size)
+    for _ in range(num_frames):
+        writer.write(np.zeros((size[1], size[0], 3), dtype=np.uint8))
+    writer.release()
+    return str(path)
+
+
+class TrackingRecognizer:
+    """Counts the frames seen since the last reset()"""
+    model = None
+
+    def __init__(self):
+        self.frames_since_reset = 0
+        self.frames_before_reset = []
+
+    def reset(self):
+        self.frames_before_reset.append(self.frames_since_reset)
+        self.frames_since_reset = 0
+
+    def extract_all_hands(self, frame):
+        self.frames_since_reset += 1
+        return None
+
+
+def test_output_names_keep_the_relative_path(tmp_path):
+    root = tmp_path / 'recordings'
+    first = touch(root / 'a' / 'session.mp4')
+    second = touch(root / 'b' / 'session.mp4')
+    touch(root / 'notes.txt')
+
+    videos = find_videos([str(root)])
+    assert videos == [(first, os.path.join('a', 'session.mp4')),
+                      (second, os.path.join('b', 'session.mp4'))]
+    assert output_paths(videos, 'out') == [os.path.join('out', 'a', 'session.npz'),
+                                           os.path.join('out', 'b', 'session.npz')]
+
+
+def test_colliding_outputs_are_rejected(tmp_path):
+    videos = find_videos([touch(tmp_path / 'a' / 'session.mp4'),
+                          touch(tmp_path / 'b' / 'session.mp4')])
+    with pytest.raises(ValueError, match="would both be written"):
+        output_paths(videos, 'out')
+
+
+def test_segments_cover_the_video_on_stride_boundaries():
+    segments = split_segments(250, 10.0, 6.0, stride=4)
+    assert segments[0] == (0, 60)
+    assert segments[-1][1] == 250
+    assert all(end == next_start for (_, end), (next_start, _) in zip(segments, segments[1:]))
+    assert split_segments(0, 30.0, 60.0, 1) == [(0, None)]
+
+
+def test_unreadable_videos_are_skipped(tmp_path):
+    pytest.importorskip('mediapipe')
+    good = write_video(tmp_path / 'good.avi')
+    bad = tmp_path / 'bad.avi'
+    bad.write_bytes(b'not a video')
+
+    videos = find_videos([good, str(bad)])
+    outputs = process_videos(videos, str(tmp_path / 'out'), model_path=None, num_workers=1)
+
+    assert outputs == [str(tmp_path / 'out' / 'good.npz')]
+    results = np.load(outputs[0])
+    assert len(results['frame']) == 10
+    assert (results['label'] == -1).all()
+
+
+def test_each_segment_starts_with_fresh_recognizer_state(tmp_path, monkeypatch):
+    recognizer = TrackingRecognizer()
+    monkeypatch.setattr(batch_process, '_recognizer', recognizer)
+    first = write_video(tmp_path / 'first.avi', num_frames=6)
+    second = write_video(tmp_path / 'second.avi', num_frames=4)
+
+    for path, start, end in [(first, 0, 3), (first, 3, 6), (second, 0, None)]:
+        batch_process._process_segment(path, start, end, 1, 4, 8)
+
+    # Reset before every segment, so tracking never spans segments or videos
+    assert recognizer.frames_before_reset == [0, 3, 3]
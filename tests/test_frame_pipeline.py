@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+import numpy as np
+
+from async_pipeline import AsyncFramePipeline
+from frame_pipeline import FramePipeline
+from landmark_stream import FRAME, LandmarkBroadcaster
+
+CAPTURE_TIME = 1234.5
+
+
+class StubRecognizer:
+    last_hands = None
+    last_gesture = 'A'
+    last_confidence = 0.9
+
+    def process_frame(self, frame, out=None):
+        return 'A', frame.copy() if out is None else out
+
+
+def capture_frame():
+    return np.zeros((48, 64, 3), dtype=np.uint8), CAPTURE_TIME
+
+
+def latest_frame_message(landmark_stream):
+    _, messages = landmark_stream.wait((0, 0, 0), timeout=5.0)
+    kinds = [kind for kind, _ in messages]
+    return json.loads(messages[kinds.index(FRAME)][1])
+
+
+def test_landmark_messages_carry_the_capture_time():
+    landmark_stream = LandmarkBroadcaster()
+    pipeline = FramePipeline(capture_frame, StubRecognizer(), landmark_stream=landmark_stream)
+    pipeline.subscribe()
+    try:
+        _, frame = pipeline.wait_for_frame(0, timeout=5.0)
+        assert frame is not None
+    finally:
+        pipeline.unsubscribe()
+        pipeline.stop()
+
+    message = latest_frame_message(landmark_stream)
+    assert message['timestamp'] == CAPTURE_TIME
+    assert message['label'] == 'A'
+
+
+def test_async_pipeline_passes_the_capture_time_through_its_queue():
+    landmark_stream = LandmarkBroadcaster()
+    pipeline = AsyncFramePipeline(FramePipeline(capture_frame, StubRecognizer(),
+                                                landmark_stream=landmark_stream))
+
+    async def first_frame():
+        pipeline.subscribe()
+        try:
+            return await asyncio.wait_for(pipeline.wait_for_frame(0), 5.0)
+        finally:
+            pipeline.unsubscribe()
+            await pipeline.stop()
+
+    _, frame = asyncio.run(first_frame())
+    assert frame is not None
+    assert latest_frame_message(landmark_stream)['timestamp'] == CAPTURE_TIME
@@ -0,0 +1,124 @@
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+import frame_sources
+from camera_capture import CameraCapture
+from frame_sources import ImageDirectorySource, SyntheticSource, VideoFileSource, open_source
+
+SMALL_SYNTHETIC = 'synthetic:?width=64&height=48&frames=8'
+
+
+class FakeDevice:
+    def __init__(self, index, width, height, fps):
+        self.index = index
+        self.fps = fps
+
+
+@pytest.fixture
+def devices(monkeypatch):
+    monkeypatch.setattr(frame_sources, 'DeviceSource', FakeDevice)
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / 'clip.avi')
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10.0, (64, 48))
+    for i in range(3):
+        writer.write(np.full((48, 64, 3), i * 50, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    for i in range(3):
+        cv2.imwrite(str(tmp_path / f'{i:03d}.png'), np.full((48, 64, 3), i, dtype=np.uint8))
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize('source, index', [(0, 0), ('1', 1), ('device:2', 2), ('device:', 0)])
+def test_device_indices(devices, source, index):
+    assert open_source(source).index == index
+
+
+def test_device_fps_option(devices):
+    assert open_source('device:1?fps=15').fps == 15.0
+
+
+def test_video_files(video):
+    source = open_source(f'file:{video}?loop=1&realtime=0&cache=1')
+    assert isinstance(source, VideoFileSource)
+    assert (source.loop, source.realtime, source.cache) == (True, False, True)
+    assert not source.live
+
+    plain = open_source(video)
+    assert isinstance(plain, VideoFileSource)
+    assert (plain.loop, plain.realtime) == (False, True)
+    assert plain.live
+
+
+def test_image_directories(image_dir):
+    source = open_source(f'images:{image_dir}?fps=15&loop=1')
+    assert isinstance(source, ImageDirectorySource)
+    assert (source.fps, source.loop, source.realtime) == (15.0, True, True)
+    assert len(source.paths) == 3
+    assert isinstance(open_source(image_dir), ImageDirectorySource)
+
+
+def test_synthetic_options():
+    source = open_source('synthetic:?width=32&height=24&frames=5&fps=10&realtime=0')
+    assert isinstance(source, SyntheticSource)
+    assert source.frames.shape == (5, 24, 32, 3)
+    assert (source.fps, source.realtime, source.loop) == (10.0, False, True)
+
+
+@pytest.mark.parametrize('source, message', [
+    ('0x', "not a camera index"),
+    ('missing.mp4', "not a camera index"),
+    ('foo:bar', "Unknown frame source scheme 'foo'"),
+    ('device:abc', "Invalid camera index"),
+    ('synthetic:?widht=32', "Unknown option 'widht'"),
+    ('synthetic:?width=abc', "Invalid width='abc'"),
+    ('synthetic:?fps=0', "Invalid fps='0'"),
+    ('file:clip.mp4?loop=maybe', "Invalid loop='maybe'"),
+    ('images:no/such/dir', "No image directory"),
+])
+def test_malformed_sources_are_rejected(source, message):
+    with pytest.raises(ValueError, match=message):
+        open_source(source)
+
+
+def read_timed(source, count, pause=0.0):
+    """Read frames through a threaded CameraCapture: (indices, timestamps, seconds)"""
+    camera = CameraCapture(source, threaded=True)
+    camera.start_capture()
+    indices, timestamps = [], []
+    start = time.perf_counter()
+    try:
+        for _ in range(count):
+            _, index, timestamp = camera.read_latest()
+            indices.append(index)
+            timestamps.append(timestamp)
+            time.sleep(pause)
+    finally:
+        camera.release()
+    return indices, timestamps, time.perf_counter() - start
+
+
+def test_unpaced_sources_deliver_every_frame_at_stream_timestamps():
+    indices, timestamps, seconds = read_timed(SMALL_SYNTHETIC + '&fps=10&realtime=0', 6, pause=0.01)
+    assert indices == [1, 2, 3, 4, 5, 6]
+    np.testing.assert_allclose(np.diff(timestamps), 0.1, atol=1e-6)
+    # Six frames 0.1 s apart in stream time, read far faster than that
+    assert seconds < 0.4
+
+
+def test_realtime_sources_are_paced_and_drop_frames_for_slow_readers():
+    indices, timestamps, seconds = read_timed(SMALL_SYNTHETIC + '&fps=50', 4, pause=0.05)
+    assert seconds >= 0.15
+    assert indices[-1] > len(indices)
+    # Skipped frames still advance the stream clock
+    np.testing.assert_allclose(np.diff(timestamps), np.diff(indices) / 50, atol=1e-6)
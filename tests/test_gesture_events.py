@@ -0,0 +1,102 @@
+import pytest
+
+from gesture_events import OFFSET, ONSET, GestureEventEngine
+
+LABELS = ['A', 'B', 'C']
+
+
+def feed(engine, gestures, start=0.0, step=0.1):
+    """Feed labels one frame apart; returns [(frame, kind, gesture)] for every event"""
+    events = []
+    for frame, gesture in enumerate(gestures):
+        for event in engine.update(gesture, timestamp=start + frame * step):
+            events.append((frame, event.kind, event.gesture))
+    return events
+
+
+def test_ema_scores_follow_the_moving_average():
+    engine = GestureEventEngine(LABELS, mode='ema', alpha=0.5)
+    expected = 0.0
+    for gesture, confidence in [('A', 1.0), ('A', 0.8), (None, 1.0), ('B', 1.0)]:
+        engine.update(gesture, confidence, timestamp=0.0)
+        expected = 0.5 * expected + (0.5 * confidence if gesture == 'A' else 0.0)
+        assert engine.score('A') == pytest.approx(expected)
+    assert engine.score('B') == pytest.approx(0.5)
+    assert engine.score('not a gesture') == 0.0
+
+
+def test_ema_scores_survive_long_runs():
+    # The shared decay factor is renormalised before it underflows
+    engine = GestureEventEngine(LABELS, mode='ema', alpha=0.3)
+    feed(engine, [None] * 500 + ['A'] * 100)
+    assert engine.score('A') == pytest.approx(1.0)
+    assert engine.score('B') == 0.0
+
+
+def test_majority_scores_are_vote_shares_over_the_window():
+    engine = GestureEventEngine(LABELS, mode='majority', window_size=4)
+    feed(engine, ['A', 'A', 'B'])
+    assert engine.score('A') == 0.5
+    assert engine.score('B') == 0.25
+
+    feed(engine, ['B', 'B', 'Unknown gesture'])
+    assert engine.score('A') == 0.0
+    assert engine.score('B') == 0.75
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        GestureEventEngine(LABELS, mode='median')
+
+
+def test_onset_needs_consecutive_frames_above_the_on_threshold():
+    engine = GestureEventEngine(LABELS, alpha=0.5, on_threshold=0.6, off_threshold=0.3,
+                                min_onset_frames=2)
+    # Scores: 0.5, 0.75, 0.875 -> above on_threshold from the second frame
+    assert feed(engine, ['A', 'A', 'A']) == [(2, ONSET, 'A')]
+    assert engine.active_gesture == 'A'
+
+
+def test_offset_waits_for_the_off_threshold():
+    engine = GestureEventEngine(LABELS, alpha=0.5, on_threshold=0.6, off_threshold=0.3,
+                                min_onset_frames=1)
+    # 0.5, 0.75 (onset), then 0.375 stays active between the thresholds, 0.1875 ends it
+    assert feed(engine, ['A', 'A', None, None]) == [(1, ONSET, 'A'), (3, OFFSET, 'A')]
+    assert engine.active_gesture is None
+
+
+def test_flicker_between_thresholds_does_not_retrigger():
+    engine = GestureEventEngine(LABELS, mode='majority', window_size=4, on_threshold=0.75,
+                                off_threshold=0.25, min_onset_frames=1, cooldown=0.0)
+    events = feed(engine, ['A', 'A', 'A', None, 'A', None, 'A', None])
+    assert events == [(2, ONSET, 'A')]
+
+
+def test_stronger_gesture_replaces_the_active_one():
+    engine = GestureEventEngine(LABELS, mode='majority', window_size=4, on_threshold=0.5,
+                                off_threshold=0.25, min_onset_frames=1)
+    events = feed(engine, ['A', 'A', 'B', 'B'])
+    assert events == [(1, ONSET, 'A'), (3, OFFSET, 'A'), (3, ONSET, 'B')]
+    assert engine.active_gesture == 'B'
+
+
+def test_cooldown_suppresses_repeated_onsets():
+    engine = GestureEventEngine(LABELS, alpha=0.5, on_threshold=0.6, off_threshold=0.3,
+                                min_onset_frames=1, cooldown=2.0)
+    gesture_then_pause = ['A', 'A', None, None, None]
+    assert feed(engine, gesture_then_pause, start=0.0) == [(1, ONSET, 'A'), (3, OFFSET, 'A')]
+
+    # Within 2s of the first onset (at 0.1s) the same gesture is ignored...
+    assert feed(engine, gesture_then_pause, start=1.0) == []
+    # ...but a different one is not
+    assert feed(engine, ['B', 'B', None, None, None], start=1.5) == [(1, ONSET, 'B'), (3, OFFSET, 'B')]
+    # and after the cooldown the gesture can start again
+    assert feed(engine, gesture_then_pause, start=3.0) == [(1, ONSET, 'A'), (3, OFFSET, 'A')]
+
+
+def test_reset_clears_scores_and_the_active_gesture():
+    engine = GestureEventEngine(LABELS, alpha=0.5, min_onset_frames=1)
+    feed(engine, ['A', 'A'])
+    engine.reset()
+    assert engine.active_gesture is None
+    assert engine.score('A') == 0.0
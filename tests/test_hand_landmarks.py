@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from hand_landmarks import NUM_LANDMARKS, LandmarkExtractor
+
+
+def mediapipe_hand(points):
+    """A MediaPipe-like NormalizedLandmarkList for a (21, 3) array"""
+    return SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in points])
+
+
+def mediapipe_results(hands, world_hands=None, labels=('Right', 'Left')):
+    handedness = [SimpleNamespace(classification=[SimpleNamespace(label=label, score=0.9)])
+                  for label in labels[:len(hands)]]
+    return SimpleNamespace(
+        multi_hand_landmarks=[mediapipe_hand(points) for points in hands],
+        multi_hand_world_landmarks=(None if world_hands is None
+                                    else [mediapipe_hand(points) for points in world_hands]),
+        multi_handedness=handedness)
+
+
+def test_extract_copies_every_coordinate():
+    rng = np.random.default_rng(0)
+    hands = rng.random((2, NUM_LANDMARKS, 3), dtype=np.float32)
+    world = rng.random((2, NUM_LANDMARKS, 3), dtype=np.float32)
+
+    result = LandmarkExtractor(max_num_hands=2).extract(mediapipe_results(hands, world))
+
+    assert result.num_hands == 2
+    np.testing.assert_array_equal(result.landmarks, hands)
+    np.testing.assert_array_equal(result.world_landmarks, world)
+    np.testing.assert_array_equal(result.feature_vector(1), hands[1].reshape(-1))
+    assert result.handedness == ['Right', 'Left']
+
+
+def test_extract_reuses_its_buffers():
+    extractor = LandmarkExtractor(max_num_hands=1)
+    first = extractor.extract(mediapipe_results(np.zeros((1, NUM_LANDMARKS, 3))))
+    second = extractor.extract(mediapipe_results(np.ones((1, NUM_LANDMARKS, 3))))
+
+    assert np.shares_memory(first.landmarks, second.landmarks)
+    assert (first.landmarks == 1).all()
+
+
+def test_no_hand_gives_none():
+    assert LandmarkExtractor().extract(SimpleNamespace(multi_hand_landmarks=None)) is None
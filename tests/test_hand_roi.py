@@ -0,0 +1,62 @@
+import cv2
+import numpy as np
+
+from hand_landmarks import NUM_LANDMARKS, LandmarkExtractor
+from hand_roi import HandROITracker
+from test_hand_landmarks import mediapipe_results
+
+FRAME_SHAPE = (480, 640, 3)
+
+
+def hand_in_box(x0, y0, x1, y1):
+    """Landmarks spread over a pixel box of a FRAME_SHAPE frame, in normalized coordinates"""
+    points = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+    points[:, 0] = np.linspace(x0, x1, NUM_LANDMARKS) / FRAME_SHAPE[1]
+    points[:, 1] = np.linspace(y0, y1, NUM_LANDMARKS) / FRAME_SHAPE[0]
+    return LandmarkExtractor(max_num_hands=1).extract(mediapipe_results([points]))
+
+
+def test_crop_covers_the_tracked_hand():
+    tracker = HandROITracker(padding=0.5, roi_size=128)
+    tracker.update(hand_in_box(300, 200, 400, 300), FRAME_SHAPE)
+    assert tracker.roi == (250, 150, 200)
+
+    frame = np.random.default_rng(0).integers(0, 256, FRAME_SHAPE, dtype=np.uint8)
+    image, transform = tracker.prepare(frame)
+
+    assert transform == (250, 150, 200, 200)
+    expected = cv2.resize(frame[150:350, 250:450], (128, 128), interpolation=cv2.INTER_AREA)
+    np.testing.assert_array_equal(image, expected)
+    assert tracker.get_stats()['roi_frames'] == 1
+
+
+def test_crop_landmarks_map_back_to_the_frame():
+    tracker = HandROITracker(padding=0.5, roi_size=128)
+    tracker.update(hand_in_box(300, 200, 400, 300), FRAME_SHAPE)
+    _, transform = tracker.prepare(np.zeros(FRAME_SHAPE, dtype=np.uint8))
+
+    # Corners and centre of the crop, as MediaPipe would report them in the crop
+    crop_points = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+    crop_points[:3] = [[0.0, 0.0, 0.1], [1.0, 1.0, 0.2], [0.5, 0.5, 0.0]]
+    hands = LandmarkExtractor(max_num_hands=1).extract(mediapipe_results([crop_points]))
+
+    tracker.map_to_frame(hands, transform, FRAME_SHAPE)
+
+    expected = np.array([[250 / 640, 150 / 480, 0.1 * 200 / 640],
+                         [450 / 640, 350 / 480, 0.2 * 200 / 640],
+                         [350 / 640, 250 / 480, 0.0]], dtype=np.float32)
+    np.testing.assert_allclose(hands.landmarks[0, :3], expected, rtol=1e-6)
+    drawn = hands.hand_landmarks[0].landmark[1]
+    np.testing.assert_allclose((drawn.x, drawn.y, drawn.z), expected[1], rtol=1e-6)
+
+
+def test_lost_hand_falls_back_to_a_full_frame_search():
+    tracker = HandROITracker(search_width=320)
+    tracker.update(hand_in_box(300, 200, 400, 300), FRAME_SHAPE)
+    tracker.update(None, FRAME_SHAPE)
+
+    image, transform = tracker.prepare(np.zeros(FRAME_SHAPE, dtype=np.uint8))
+
+    assert image.shape == (240, 320, 3)
+    assert transform == (0, 0, 640, 480)
+    assert tracker.get_stats() == {'roi_frames': 0, 'search_frames': 1, 'lost': 1}
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+
+from inference_backend import (KerasBackend, NumpyBackend, TFLiteBackend, backend_model_path,
+                               export_numpy_weights, export_tflite, load_backend)
+
+NUM_CLASSES = 7
+
+
+@pytest.fixture(scope='module')
+def keras_model(tmp_path_factory):
+    """A small classifier shaped like create_model()'s, with random weights, saved to disk"""
+    tf.keras.utils.set_random_seed(0)
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(63,)),
+        tf.keras.layers.Dense(32, activation='relu'),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.Dense(16, activation='tanh'),
+        tf.keras.layers.Dense(NUM_CLASSES, activation='softmax')
+    ])
+    model_path = str(tmp_path_factory.mktemp('model') / 'gesture_model.h5')
+    model.save(model_path)
+    return model, model_path
+
+
+@pytest.fixture(scope='module')
+def landmarks():
+    return np.random.default_rng(1).random((64, 63), dtype=np.float32)
+
+
+def test_numpy_backend_matches_keras(keras_model, landmarks):
+    model, model_path = keras_model
+    backend = NumpyBackend(export_numpy_weights(model, backend_model_path(model_path, 'numpy')))
+
+    expected = model.predict_on_batch(landmarks)
+    np.testing.assert_allclose(backend.predict(landmarks), expected, atol=1e-5)
+    # Single rows and batches larger than the preallocated buffers
+    np.testing.assert_allclose(backend.predict(landmarks[:1]), expected[:1], atol=1e-5)
+    np.testing.assert_allclose(backend.predict(np.tile(landmarks, (2, 1))),
+                               np.tile(expected, (2, 1)), atol=1e-5)
+
+
+def test_tflite_backend_matches_keras(keras_model, landmarks):
+    model, model_path = keras_model
+    backend = TFLiteBackend(export_tflite(model, backend_model_path(model_path, 'tflite')))
+
+    expected = model.predict_on_batch(landmarks)
+    np.testing.assert_allclose(backend.predict(landmarks), expected, atol=1e-4)
+    np.testing.assert_allclose(backend.predict(landmarks[:3]), expected[:3], atol=1e-4)
+
+
+def test_keras_backend_matches_model(keras_model, landmarks):
+    model, model_path = keras_model
+    np.testing.assert_allclose(KerasBackend(model_path).predict(landmarks),
+                               model.predict_on_batch(landmarks), atol=1e-6)
+
+
+def test_load_backend_picks_exported_file(keras_model):
+    model, model_path = keras_model
+    export_numpy_weights(model, backend_model_path(model_path, 'numpy'))
+    assert isinstance(load_backend(backend_model_path(model_path, 'numpy')), NumpyBackend)
+    assert isinstance(load_backend(model_path, 'numpy'), NumpyBackend)
+    with pytest.raises(FileNotFoundError):
+        load_backend(model_path.replace('gesture_model', 'missing'), 'numpy')
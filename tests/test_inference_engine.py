@@ -0,0 +1,81 @@
+import threading
+
+import numpy as np
+import pytest
+
+from inference_engine import BatchInferenceEngine, decode_batch, decode_prediction
+
+LABELS = ['A', 'B', 'C']
+
+
+def one_hot_predict(landmarks_batch):
+    """Fake model: the class is the first coordinate, with confidence 0.9"""
+    probabilities = np.full((len(landmarks_batch), len(LABELS)), 0.05, dtype=np.float32)
+    probabilities[np.arange(len(landmarks_batch)), landmarks_batch[:, 0].astype(int)] = 0.9
+    return probabilities
+
+
+def landmarks_for(class_index):
+    landmarks = np.zeros(63, dtype=np.float32)
+    landmarks[0] = class_index
+    return landmarks
+
+
+def test_decode_prediction_threshold_is_exclusive():
+    assert decode_prediction(np.array([0.7, 0.2, 0.1]), LABELS, 0.7)[0] == "Unknown gesture"
+    assert decode_prediction(np.array([0.71, 0.2, 0.09]), LABELS, 0.7)[0] == 'A'
+
+
+def test_decode_batch_matches_decode_prediction():
+    probabilities = np.array([[0.7, 0.2, 0.1], [0.71, 0.2, 0.09], [0.1, 0.1, 0.8]])
+    classes, confidences = decode_batch(probabilities, 0.7)
+    np.testing.assert_array_equal(classes, [-1, 0, 2])
+    np.testing.assert_allclose(confidences, [0.7, 0.71, 0.8])
+
+
+def test_concurrent_requests_share_batches():
+    engine = BatchInferenceEngine(one_hot_predict, LABELS, max_wait_ms=50.0)
+    results = {}
+    barrier = threading.Barrier(6)
+
+    def classify(i):
+        barrier.wait()
+        results[i] = engine.predict(landmarks_for(i % 3), timeout=5)
+
+    threads = [threading.Thread(target=classify, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.stop()
+
+    assert {i: label for i, (label, _) in results.items()} == {i: LABELS[i % 3] for i in range(6)}
+    stats = engine.get_stats()
+    assert stats['requests'] == 6
+    assert stats['largest_batch'] > 1
+
+
+def test_submit_after_stop_fails_instead_of_hanging():
+    engine = BatchInferenceEngine(one_hot_predict, LABELS)
+    engine.stop()
+    future = engine.submit(landmarks_for(0))
+    with pytest.raises(RuntimeError):
+        future.result(timeout=1)
+
+
+def test_requests_racing_stop_all_resolve():
+    engine = BatchInferenceEngine(one_hot_predict, LABELS, max_wait_ms=1.0)
+    futures = []
+
+    def submit_many():
+        for _ in range(200):
+            futures.append(engine.submit(landmarks_for(1)))
+
+    thread = threading.Thread(target=submit_many)
+    thread.start()
+    engine.stop()
+    thread.join()
+
+    for future in futures:
+        # Either classified or failed by the stop, but never left pending
+        assert future.exception(timeout=1) is None or isinstance(future.exception(), RuntimeError)
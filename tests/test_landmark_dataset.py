@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from hand_landmarks import NUM_LANDMARKS
+from landmark_dataset import LandmarkDataset, LandmarkDatasetWriter
+
+# Deliberately not in create_model.GESTURES order
+LABELS = ['hello', 'B', 'A']
+ROWS_PER_SESSION = 30
+
+
+def poses(seed):
+    """One distinct base pose per label, as (21, 3) arrays"""
+    rng = np.random.default_rng(seed)
+    return {label: rng.random((NUM_LANDMARKS, 3), dtype=np.float32) for label in LABELS}
+
+
+def write_sessions(path, num_sessions=2, noise=0.01):
+    base = poses(0)
+    rng = np.random.default_rng(1)
+    with LandmarkDatasetWriter(str(path), chunk_size=16) as writer:
+        for session in range(num_sessions):
+            writer.begin_session(f'take_{session}')
+            for label in LABELS:
+                rows = base[label] + rng.normal(0, noise, (ROWS_PER_SESSION, NUM_LANDMARKS, 3))
+                writer.append(rows, label, timestamp=float(session))
+    return base
+
+
+def test_sessions_reopen_with_their_labels(tmp_path):
+    base = write_sessions(tmp_path, num_sessions=1)
+    # A second writer appends a session to the existing dataset
+    with LandmarkDatasetWriter(str(tmp_path)) as writer:
+        writer.begin_session('extra')
+        writer.append(base['A'], 'A')
+        writer.append(base['B'], 'Z')
+
+    dataset = LandmarkDataset(str(tmp_path))
+
+    assert len(dataset) == len(LABELS) * ROWS_PER_SESSION + 2
+    assert dataset.label_names == LABELS + ['Z']
+    assert [session['name'] for session in dataset.session_info] == ['take_0', 'extra']
+    expected_labels = np.repeat(np.arange(len(LABELS)), ROWS_PER_SESSION)
+    np.testing.assert_array_equal(dataset.labels[:len(expected_labels)], expected_labels)
+    np.testing.assert_array_equal(dataset.labels[-2:], [LABELS.index('A'), 3])
+    np.testing.assert_array_equal(dataset.sessions[-2:], [1, 1])
+
+    landmarks, labels = dataset.gather([ROWS_PER_SESSION, 0])
+    np.testing.assert_array_equal(labels, [1, 0])
+    np.testing.assert_array_equal(landmarks[0], dataset.landmarks[ROWS_PER_SESSION])
+
+
+def test_split_keeps_sessions_on_one_side(tmp_path):
+    write_sessions(tmp_path, num_sessions=4)
+    dataset = LandmarkDataset(str(tmp_path))
+
+    train, test = dataset.split(test_size=0.25, seed=3)
+
+    assert sorted(np.concatenate([train, test]).tolist()) == list(range(len(dataset)))
+    train_pairs = set(zip(dataset.labels[train].tolist(), dataset.sessions[train].tolist()))
+    test_pairs = set(zip(dataset.labels[test].tolist(), dataset.sessions[test].tolist()))
+    assert not train_pairs & test_pairs
+    # One of the four sessions of every label is held out
+    assert len(test) == len(LABELS) * ROWS_PER_SESSION
+    assert set(dataset.labels[test].tolist()) == {0, 1, 2}
+
+
+def test_single_session_labels_are_split_in_time(tmp_path):
+    write_sessions(tmp_path, num_sessions=1)
+    dataset = LandmarkDataset(str(tmp_path))
+
+    train, test = dataset.split(test_size=0.2)
+
+    for label in range(len(LABELS)):
+        label_train = train[dataset.labels[train] == label]
+        label_test = test[dataset.labels[test] == label]
+        assert len(label_test) == 6
+        assert label_train.max() < label_test.min()
+
+
+def test_trained_model_decodes_dataset_labels(tmp_path):
+    pytest.importorskip('tensorflow')
+    pytest.importorskip('mediapipe')
+    from create_model import GESTURES, train_and_save_model
+    from gesture_labels import load_labels
+    from gesture_recognition import GestureRecognition
+
+    base = write_sessions(tmp_path / 'dataset')
+    model_path = str(tmp_path / 'gesture_model.h5')
+    train_and_save_model(str(tmp_path / 'dataset'), augment=False, model_path=model_path,
+                         epochs=40)
+
+    assert load_labels(model_path) == LABELS
+    recognizer = GestureRecognition(model_path, backend='numpy')
+    assert recognizer.labels == LABELS != GESTURES[:len(LABELS)]
+    for label in LABELS:
+        gesture, _ = recognizer.predict_with_confidence(base[label].reshape(-1))
+        assert gesture == label
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from hand_landmarks import NUM_LANDMARKS
+from landmark_features import TRANSFORM_VERSION, LandmarkTransform, transform_path
+
+
+def hand():
+    """A fixed 21-point hand as a (21, 3) array"""
+    return np.random.default_rng(1).random((NUM_LANDMARKS, 3), dtype=np.float32) * 0.2 + 0.3
+
+
+def moved(points, offset=(0.0, 0.0, 0.0), size=1.0, angle=0.0):
+    """Rotate a hand in the image plane about its wrist, scale it and shift it"""
+    wrist = points[0]
+    cos, sin = np.cos(angle), np.sin(angle)
+    rotation = np.array([[cos, -sin, 0.0], [sin, cos, 0.0], [0.0, 0.0, 1.0]], dtype=np.float32)
+    return ((points - wrist) @ rotation.T * size + wrist + np.asarray(offset)).astype(np.float32)
+
+
+def test_features_are_translation_and_scale_invariant():
+    transform = LandmarkTransform()
+    expected = transform(hand().reshape(-1))
+    assert expected.shape == (transform.num_features,)
+
+    for copy in (moved(hand(), offset=(0.2, -0.1, 0.05)), moved(hand(), size=2.5),
+                 moved(hand(), offset=(-0.3, 0.1, 0.0), size=0.4)):
+        np.testing.assert_allclose(transform(copy.reshape(-1)), expected, atol=1e-4)
+
+
+def test_rotation_is_only_removed_when_aligned():
+    rotated = moved(hand(), offset=(0.1, 0.1, 0.0), size=1.5, angle=0.7).reshape(-1)
+
+    aligned = LandmarkTransform(align_rotation=True)
+    np.testing.assert_allclose(aligned(rotated), aligned(hand().reshape(-1)), atol=1e-4)
+
+    unaligned = LandmarkTransform()
+    assert not np.allclose(unaligned(rotated), unaligned(hand().reshape(-1)), atol=1e-3)
+
+
+def test_batches_match_single_vectors():
+    transform = LandmarkTransform(align_rotation=True)
+    batch = np.stack([hand().reshape(-1), moved(hand(), angle=1.0).reshape(-1)])
+    features = transform(batch)
+    assert features.shape == (2, transform.num_features)
+    np.testing.assert_allclose(features[1], transform(batch[1]))
+
+
+def test_optional_features_set_the_feature_count():
+    assert LandmarkTransform().num_features == 63 + 15 + 15
+    assert LandmarkTransform(distances=False, angles=False).num_features == 63
+    assert LandmarkTransform(angles=False)(hand().reshape(-1)).shape == (63 + 15,)
+
+
+def test_transform_round_trips_through_its_model_file(tmp_path):
+    model_path = str(tmp_path / 'gesture_model.h5')
+    assert transform_path(model_path) == str(tmp_path / 'gesture_model.transform.json')
+    assert LandmarkTransform.for_model(model_path) is None
+
+    original = LandmarkTransform(translate=True, scale=False, align_rotation=True, angles=False)
+    original.save(transform_path(model_path))
+    loaded = LandmarkTransform.for_model(model_path)
+
+    assert loaded.to_dict() == original.to_dict()
+    np.testing.assert_array_equal(loaded(hand().reshape(-1)), original(hand().reshape(-1)))
+
+
+def test_other_transform_versions_are_rejected():
+    config = LandmarkTransform().to_dict()
+    config['version'] = TRANSFORM_VERSION + 1
+    with pytest.raises(ValueError, match="Unsupported landmark transform version"):
+        LandmarkTransform.from_dict(config)
@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip('flask')
+
+import web_app
+
+
+class CountingPipeline:
+    def __init__(self):
+        self.num_subscribers = 0
+
+    def subscribe(self, controller=None):
+        self.num_subscribers += 1
+
+    def unsubscribe(self, controller=None):
+        self.num_subscribers -= 1
+
+
+class ReadyStartup:
+    is_ready = True
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    pipeline = CountingPipeline()
+    monkeypatch.setattr(web_app, 'startup', ReadyStartup())
+    monkeypatch.setattr(web_app, 'get_pipeline', lambda: pipeline)
+    return pipeline
+
+
+@pytest.mark.parametrize('frames, subscribers', [(True, 1), (False, 0)])
+def test_only_frame_clients_run_the_pipeline(pipeline, frames, subscribers):
+    events = web_app.generate_landmark_events(frames)
+    web_app.landmark_stream.publish_status(ready=True)
+    assert next(events).startswith('event: status')
+    assert pipeline.num_subscribers == subscribers
+
+    events.close()
+    assert pipeline.num_subscribers == 0
@@ -0,0 +1,23 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from metrics import recognizer_stats
+from prediction_cache import PredictionCache
+from recognition_scheduler import AdaptiveScheduler
+
+
+def test_recognizer_stats_only_reports_enabled_components():
+    cache = PredictionCache()
+    key, _ = cache.lookup(np.zeros(63, dtype=np.float32))
+    cache.store(key, ('A', 0.9))
+    cache.lookup(np.zeros(63, dtype=np.float32))
+    recognizer = SimpleNamespace(scheduler=AdaptiveScheduler(), roi_tracker=None,
+                                 prediction_cache=cache)
+
+    stats = recognizer_stats(recognizer)
+
+    assert set(stats) == {'scheduler', 'prediction_cache'}
+    assert stats['prediction_cache']['hits'] == 1
+    assert stats['prediction_cache']['misses'] == 1
+    assert recognizer_stats(None) == {}
@@ -0,0 +1,53 @@
+import numpy as np
+
+from landmark_features import LandmarkTransform
+from prediction_cache import PredictionCache, can_normalize
+
+
+def hand(offset=0.0, size=1.0):
+    """A fixed 21-point hand, shifted and scaled"""
+    points = np.random.default_rng(0).random((21, 3), dtype=np.float32) * 0.2
+    return (points * size + offset).reshape(-1)
+
+
+def test_raw_keys_tell_hand_positions_apart():
+    cache = PredictionCache()
+    key, result = cache.lookup(hand())
+    assert result is None
+    cache.store(key, ('A', 0.9))
+
+    assert cache.lookup(hand())[1] == ('A', 0.9)
+    assert cache.lookup(hand(offset=0.3))[1] is None
+    assert cache.lookup(hand(size=2.0))[1] is None
+
+
+def test_normalized_keys_match_moved_and_scaled_hands():
+    cache = PredictionCache(normalize=True)
+    key, _ = cache.lookup(hand())
+    cache.store(key, ('A', 0.9))
+
+    assert cache.lookup(hand(offset=0.3))[1] == ('A', 0.9)
+    assert cache.lookup(hand(size=2.0))[1] == ('A', 0.9)
+
+
+def test_can_normalize_only_for_invariant_models():
+    assert can_normalize(LandmarkTransform())
+    assert not can_normalize(None)
+    assert not can_normalize(LandmarkTransform(translate=False))
+    assert not can_normalize(LandmarkTransform(scale=False))
+
+
+def test_raw_keys_tell_poses_at_the_same_wrist_position_apart():
+    # A hand with a palm length of 0.1 (64 px across a 640 px frame)
+    pose = hand(offset=0.4, size=0.5)
+    palm = np.linalg.norm(pose[27:30] - pose[:3])
+    assert 0.05 < palm < 0.2
+    other_pose = pose.copy()
+    other_pose[3 * 8:3 * 9] += 0.3 * palm  # index fingertip moved by 30% of the palm
+
+    cache = PredictionCache()
+    key, _ = cache.lookup(pose)
+    cache.store(key, ('A', 0.9))
+
+    assert cache.lookup(other_pose)[1] is None
+    assert cache.lookup(pose + 0.002 * palm)[1] == ('A', 0.9)
@@ -0,0 +1,53 @@
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip('mediapipe')
+
+from recognition_workers import RecognitionWorkerPool
+
+FRAME_SHAPE = (120, 160, 3)
+
+
+def test_frames_are_recognized_in_workers():
+    pool = RecognitionWorkerPool(2, FRAME_SHAPE)
+    try:
+        assert pool.wait_until_ready(timeout=60)
+        assert 'hello' in pool.labels
+        gesture, confidence, _ = pool.process_frame(np.zeros(FRAME_SHAPE, dtype=np.uint8), timeout=10, stream=1)
+        assert isinstance(gesture, str)
+    finally:
+        pool.close()
+
+
+def test_worker_that_fails_to_start_is_reported():
+    # An unknown backend makes every worker's recognizer raise
+    pool = RecognitionWorkerPool(1, FRAME_SHAPE, model_path='gesture_model.h5', backend='bogus')
+    try:
+        start = time.monotonic()
+        with pytest.raises(RuntimeError, match="Unknown inference backend"):
+            pool.wait_until_ready(timeout=60)
+        assert time.monotonic() - start < 30
+
+        future = pool.submit(np.zeros(FRAME_SHAPE, dtype=np.uint8))
+        with pytest.raises(RuntimeError):
+            future.result(timeout=1)
+    finally:
+        pool.close()
+
+
+def test_frames_of_a_dead_worker_fail():
+    pool = RecognitionWorkerPool(1, FRAME_SHAPE)
+    try:
+        assert pool.wait_until_ready(timeout=60)
+        pool._workers[0].kill()
+        pool._workers[0].join(timeout=5)
+
+        future = pool.submit(np.zeros(FRAME_SHAPE, dtype=np.uint8))
+        with pytest.raises(RuntimeError, match="Recognition worker 0 failed"):
+            future.result(timeout=5)
+        # Its frame slot was given back
+        assert pool.frame_pool.available() == pool.num_slots
+    finally:
+        pool.close()
@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+import pytest
+
+from camera_capture import CameraCapture
+from record_landmarks import record_session
+
+NUM_FRAMES = 5
+
+
+@pytest.fixture
+def image_source(tmp_path):
+    """A finite, unpaced frame source: a directory of NUM_FRAMES images"""
+    for i in range(NUM_FRAMES):
+        cv2.imwrite(str(tmp_path / f'{i:03d}.png'), np.full((48, 64, 3), i, dtype=np.uint8))
+    return f'images:{tmp_path}?realtime=0'
+
+
+class NoHandRecognizer:
+    def extract_hand_landmarks(self, frame):
+        return None, None
+
+
+class CountingRecorder:
+    label = 'test'
+
+    def __init__(self):
+        self.timestamps = []
+
+    def record(self, landmarks, timestamp, frame):
+        self.timestamps.append(timestamp)
+
+    def get_stats(self):
+        return {'frames_seen': len(self.timestamps), 'frames_written': 0,
+                'frames_without_hand': 0, 'frames_dropped': 0, 'queue_depth': 0}
+
+
+@pytest.mark.parametrize('threaded', [False, True])
+def test_camera_reports_finished_after_last_frame(image_source, threaded):
+    camera = CameraCapture(image_source, threaded=threaded)
+    camera.start_capture()
+    try:
+        for _ in range(NUM_FRAMES):
+            assert not camera.finished
+            camera.read_latest()
+        with pytest.raises(RuntimeError):
+            camera.read_latest()
+        assert camera.finished
+    finally:
+        camera.release()
+
+
+def test_record_session_stops_at_end_of_source(image_source):
+    camera = CameraCapture(image_source, threaded=True)
+    camera.start_capture()
+    recorder = CountingRecorder()
+    try:
+        record_session(camera, NoHandRecognizer(), recorder)
+    finally:
+        camera.release()
+    assert len(recorder.timestamps) == NUM_FRAMES
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from sequence_classifier import (NUM_SUMMARIES, SequenceBuffer, StreamingSequenceClassifier,
+                                 save_sequence_config, sequence_config_path, window_features)
+
+LABELS = ['hello', 'sorry', 'J']
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    """A one-layer sequence model in NumpyBackend's .npz format"""
+    rng = np.random.default_rng(0)
+    path = tmp_path / 'gesture_sequence_model.h5'
+    np.savez(tmp_path / 'gesture_sequence_model.npz', num_layers=np.array(1),
+             kernel_0=rng.random((NUM_SUMMARIES * 63, len(LABELS)), dtype=np.float32),
+             bias_0=np.zeros(len(LABELS), dtype=np.float32),
+             activation_0=np.array('softmax'))
+    return str(path)
+
+
+def test_buffer_features_match_window_features():
+    frames = np.random.default_rng(1).random((50, 63))
+    buffer = SequenceBuffer(window_size=20)
+    for frame in frames:
+        buffer.push(frame)
+
+    expected = window_features(frames[np.newaxis, -20:])[0]
+    np.testing.assert_allclose(buffer.features(), expected, atol=1e-5)
+
+
+def test_window_size_is_read_from_saved_config(model_path):
+    save_sequence_config(model_path, 12)
+    assert sequence_config_path(model_path).endswith('gesture_sequence_model.sequence.json')
+
+    classifier = StreamingSequenceClassifier(model_path, LABELS, backend='numpy')
+    assert classifier.buffer.window_size == 12
+
+    frames = np.random.default_rng(2).random((12, 63))
+    assert all(classifier.update(frame) is None for frame in frames[:-1])
+    assert classifier.update(frames[-1]) is not None
+
+
+def test_mismatched_window_size_is_rejected(model_path):
+    save_sequence_config(model_path, 12)
+    with pytest.raises(ValueError, match="12-frame windows"):
+        StreamingSequenceClassifier(model_path, LABELS, backend='numpy', window_size=30)
+
+
+def test_model_without_config_uses_default_window(model_path):
+    classifier = StreamingSequenceClassifier(model_path, LABELS, backend='numpy')
+    assert classifier.buffer.window_size == 30
@@ -0,0 +1,36 @@
+import pytest
+
+from stream_encoder import AdaptiveStreamController, FrameRateMeter
+
+
+def test_meter_reports_default_until_frames_are_published():
+    meter = FrameRateMeter(default_fps=10)
+    assert meter.fps == 10
+    meter.tick(0.0)
+    assert meter.fps == 10
+
+
+def test_meter_follows_the_publish_interval():
+    meter = FrameRateMeter(default_fps=30)
+    for i in range(50):
+        meter.tick(i * 0.2)
+    assert meter.fps == pytest.approx(5.0)
+
+
+def test_meter_ignores_idle_gaps():
+    meter = FrameRateMeter(default_fps=30, max_gap=5.0)
+    meter.tick(0.0)
+    meter.tick(0.1)
+    meter.tick(60.0)
+    meter.tick(60.1)
+    assert meter.fps == pytest.approx(10.0)
+
+
+def test_slow_pipeline_does_not_make_low_profile_skip_frames():
+    controller = AdaptiveStreamController(start='low', pipeline_fps=30)
+    assert controller.frame_stride == 6
+
+    # A pipeline capped at 30 fps that only manages 5 fps
+    controller.pipeline_fps = 5.0
+    assert controller.frame_stride == 1
+    assert controller.frame_interval == pytest.approx(0.2)
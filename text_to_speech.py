@@ -2,6 +2,17 @@ import threading
 import queue
 import time
 
+from metrics import observe_stage
+
+# Basic translations (would need more comprehensive translation system)
+GESTURE_TRANSLATIONS = {
+    'hindi': {
+        'hello': 'नमस्ते',
+        'thank you': 'धन्यवाद',
+        'please': 'कृपया'
+    }
+}
+
 class TextToSpeech:
     def __init__(self):
         self.speech_queue = queue.Queue()
@@ -29,13 +40,20 @@ class TextToSpeech:
 
     def speak(self, text):
         """Add text to speech queue"""
-        self.speech_queue.put(text)
+        self.speech_queue.put((text, time.perf_counter()))
+
+    def speak_gesture(self, gesture):
+        """Announce a recognized gesture, translated to the current language if possible"""
+        translations = GESTURE_TRANSLATIONS.get(self.current_language, {})
+        speech_text = translations.get(gesture.lower(), gesture)
+        self.speak(f"This is {speech_text}")
 
     def _process_speech_queue(self):
         """Process speech queue in background thread"""
         while True:
             try:
-                text = self.speech_queue.get(timeout=1)
+                text, queued_at = self.speech_queue.get(timeout=1)
+                observe_stage('tts_queue_wait', time.perf_counter() - queued_at)
                 self.is_speaking = True
 
                 # Mock speech - just print with language indicator
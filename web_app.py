@@ -5,7 +5,16 @@ import time
 import json
 import numpy as np
 from camera_capture import CameraCapture
+from frame_pipeline import FramePipeline, make_error_frame, make_message_frame, multipart_chunk
+from gesture_events import GestureEventEngine, ONSET
 from gesture_recognition import GestureRecognition
+from landmark_stream import LandmarkBroadcaster, sse_message
+from metrics import REGISTRY, register_component_metrics
+from hand_roi import HandROITracker
+from recognition_scheduler import AdaptiveScheduler
+from startup import (CAMERA_SOURCE, DEFAULT_MODEL_PATH, PREDICTION_CACHE, ROI_TRACKING,
+                     SEQUENCE_MODEL_PATH, StartupTracker)
+from stream_encoder import encode_jpeg, limit_send_buffer
 from text_to_speech import TextToSpeech
 
 app = Flask(__name__)
@@ -13,15 +22,54 @@ app = Flask(__name__)
 # Global variables for shared state
 camera = None
 gesture_recognizer = None
+gesture_events = None
 tts = None
 current_language = "english"
 last_gesture = ""
-last_speech_time = 0
 speech_cooldown = 2
+pipeline = None
+pipeline_lock = threading.Lock()
+startup = StartupTracker()
+# Landmarks, gesture events and status pushed to /landmarks clients
+landmark_stream = LandmarkBroadcaster()
+
+# Camera indices probed when SIGN2TEXT_CAMERA is not set (Docker hosts differ)
+DEFAULT_CAMERA_SOURCES = [0, 1, 2, -1]
+# Seconds before probing again after no camera could be opened
+CAMERA_RETRY_INTERVAL = 10.0
+camera_retry_at = 0.0
+
+register_component_metrics(lambda: camera, lambda: pipeline, lambda: tts, startup,
+                           landmark_stream=landmark_stream, get_recognizer=lambda: gesture_recognizer)
+
+def publish_status():
+    """Push the language, last gesture and readiness to /landmarks clients"""
+    landmark_stream.publish_status(language=current_language, last_gesture=last_gesture,
+                                   ready=startup.is_ready, phase=startup.phase)
+
+def load_recognizer(tracker):
+    """Build the recognizer (MediaPipe, model) and warm it up; runs on the startup thread"""
+    global gesture_recognizer, gesture_events
+
+    with tracker.step('recognizer'):
+        recognizer = GestureRecognition(DEFAULT_MODEL_PATH, scheduler=AdaptiveScheduler(),
+                                        roi_tracker=HandROITracker() if ROI_TRACKING else None)
+        if SEQUENCE_MODEL_PATH:
+            recognizer.load_sequence_model(SEQUENCE_MODEL_PATH)
+        if PREDICTION_CACHE:
+            recognizer.enable_prediction_cache()
+
+    with tracker.step('warmup'):
+        recognizer.warm_up()
+
+    # Smoothed onset/offset events decide when to speak
+    gesture_events = GestureEventEngine(recognizer.labels, cooldown=speech_cooldown)
+    gesture_recognizer = recognizer
+    print("Gesture recognition initialized")
 
 def initialize_components():
     """Initialize camera, gesture recognition, and TTS components"""
-    global camera, gesture_recognizer, tts
+    global camera, tts
 
     # Initialize camera immediately - try multiple indices for Docker compatibility
     try:
@@ -33,112 +81,107 @@ def initialize_components():
         print(f"Camera initialization setup failed: {e}")
         camera = None
 
-    gesture_recognizer = GestureRecognition()
-    print("Gesture recognition initialized")
-
     tts = TextToSpeech()
     print("Text-to-speech initialized")
 
+    # MediaPipe and the model load in the background so the server (and
+    # /status) is up immediately; /video_feed waits for them
+    publish_status()
+    startup.start(load_recognizer, on_done=lambda tracker: publish_status())
+
     return True
 
 def get_camera():
-    """Lazy camera initialization - only when actually needed"""
-    global camera
+    """Lazy camera initialization - only when actually needed.
+
+    Opens SIGN2TEXT_CAMERA if set, otherwise probes DEFAULT_CAMERA_SOURCES.
+    After a failure nothing is probed again for CAMERA_RETRY_INTERVAL seconds,
+    so a missing camera doesn't cost a round of failing opens on every frame.
+    """
+    global camera, camera_retry_at
 
     if camera is not None:
         return camera
-
-    try:
-        # Try different camera indices
-        for camera_index in [0, 1, 2, -1]:
-            try:
-                camera = CameraCapture(camera_index)
-                camera.start_capture()
-                print(f"Camera initialized successfully with index {camera_index}")
-                return camera
-            except Exception as e:
-                print(f"Failed to initialize camera with index {camera_index}: {e}")
-                continue
-        else:
-            print("Warning: No camera found. Application will run without camera.")
-            camera = None
-            return None
-    except Exception as e:
-        print(f"Camera initialization failed: {e}")
-        camera = None
+    if time.time() < camera_retry_at:
         return None
 
+    for source in [CAMERA_SOURCE] if CAMERA_SOURCE else DEFAULT_CAMERA_SOURCES:
+        try:
+            candidate = CameraCapture(source, threaded=True)
+            candidate.start_capture()
+            camera = candidate
+            print(f"Camera initialized successfully with source {source}")
+            return camera
+        except Exception as e:
+            print(f"Failed to initialize camera with source {source}: {e}")
+
+    print("Warning: No camera found. Application will run without camera.")
+    camera_retry_at = time.time() + CAMERA_RETRY_INTERVAL
+    return None
+
+def read_frame():
+    """Read (frame, capture_timestamp) from the camera, or a placeholder frame when no camera is available"""
+    # Try to get camera if not initialized
+    cam = get_camera()
+
+    if cam is None:
+        # Create a placeholder frame when no camera is available
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        cv2.putText(frame, "Camera Not Available", (50, 200),
+                  cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 2)
+        cv2.putText(frame, "Please check camera connection", (50, 250),
+                  cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 1)
+        cv2.putText(frame, "Try refreshing the page", (50, 300),
+                  cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 1)
+        return frame, time.time()
+
+    frame, _, timestamp = cam.read_latest()
+    return frame, timestamp
+
+def draw_overlay(frame_with_landmarks, gesture):
+    """Display gesture and language on frame"""
+    cv2.putText(frame_with_landmarks, f"Gesture: {gesture}",
+               (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    cv2.putText(frame_with_landmarks, f"Language: {current_language}",
+               (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
+def speak_gesture(gesture):
+    """Speak a gesture once it has stably appeared"""
+    global last_gesture
+
+    for event in gesture_events.update(gesture, gesture_recognizer.last_confidence):
+        landmark_stream.publish_event(event)
+        if event.kind == ONSET:
+            print(f"Detected: {event.gesture}")
+            tts.speak_gesture(event.gesture)
+            last_gesture = event.gesture
+            publish_status()
+
+def get_pipeline():
+    """Create the shared frame producer on first use"""
+    global pipeline
+
+    with pipeline_lock:
+        if pipeline is None:
+            # One producer serves every /video_feed client (same pacing as the old per-client loop)
+            pipeline = FramePipeline(read_frame, gesture_recognizer,
+                                     annotate=draw_overlay, on_gesture=speak_gesture,
+                                     max_fps=10, landmark_stream=landmark_stream)
+        return pipeline
+
 def generate_frames():
     """Generate video frames for web streaming"""
-    global last_gesture, last_speech_time
+    # Show the startup phase until the recognizer is ready
+    while not startup.wait_until_ready(timeout=0.5):
+        if startup.failed:
+            frame = make_error_frame(f"startup failed ({startup.error})")
+        else:
+            frame = make_message_frame(f"Starting up: {startup.phase}...")
+        yield multipart_chunk(encode_jpeg(frame))
+        if startup.failed:
+            return
 
-    while True:
-        try:
-            # Try to get camera if not initialized
-            cam = get_camera()
-
-            if cam is None:
-                # Create a placeholder frame when no camera is available
-                frame = np.zeros((480, 640, 3), dtype=np.uint8)
-                cv2.putText(frame, "Camera Not Available", (50, 200),
-                          cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 2)
-                cv2.putText(frame, "Please check camera connection", (50, 250),
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 1)
-                cv2.putText(frame, "Try refreshing the page", (50, 300),
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 1)
-            else:
-                frame = cam.get_frame()
-
-            gesture, frame_with_landmarks = gesture_recognizer.process_frame(frame)
-
-            # Display gesture on frame
-            cv2.putText(frame_with_landmarks, f"Gesture: {gesture}",
-                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            cv2.putText(frame_with_landmarks, f"Language: {current_language}",
-                       (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-
-            # Speak gesture if it's different and enough time has passed
-            current_time = time.time()
-            if (gesture != last_gesture and
-                gesture not in ["No model loaded", "Unknown gesture"] and
-                current_time - last_speech_time > speech_cooldown):
-
-                # Translate common gestures to Hindi if needed
-                if current_language == 'hindi':
-                    translations = {
-                        'hello': 'नमस्ते',
-                        'thank you': 'धन्यवाद',
-                        'please': 'कृपया'
-                    }
-                    speech_text = translations.get(gesture.lower(), gesture)
-                else:
-                    speech_text = gesture
-
-                print(f"Detected: {gesture}")
-                tts.speak(f"This is {speech_text}")
-                last_gesture = gesture
-                last_speech_time = current_time
-
-            # Encode frame for web streaming
-            ret, buffer = cv2.imencode('.jpg', frame_with_landmarks)
-            frame_bytes = buffer.tobytes()
-
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-
-            time.sleep(0.1)  # Small delay to prevent overwhelming
-
-        except Exception as e:
-            print(f"Error generating frame: {e}")
-            # Create error frame
-            error_frame = np.zeros((480, 640, 3), dtype=np.uint8)
-            cv2.putText(error_frame, f"Error: {str(e)}", (50, 240),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-            ret, buffer = cv2.imencode('.jpg', error_frame)
-            frame_bytes = buffer.tobytes()
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-            time.sleep(1)
+    yield from get_pipeline().frames()
 
 @app.route('/')
 def index():
@@ -148,9 +191,46 @@ def index():
 @app.route('/video_feed')
 def video_feed():
     """Video streaming route"""
+    # The development server exposes the connection; keep its send queue short
+    limit_send_buffer(request.environ.get('werkzeug.socket'))
     return Response(generate_frames(),
                    mimetype='multipart/x-mixed-replace; boundary=frame')
 
+def generate_landmark_events(frames=True):
+    """Yield Server-Sent Events from the landmark stream.
+
+    A client that wants per-frame messages counts as a pipeline subscriber
+    once startup is ready, so recognition runs (without any JPEG encoding)
+    even if nobody watches the video. Events-only clients (frames=False)
+    never start the camera themselves.
+    """
+    cursor = landmark_stream.cursor()
+    subscribed = None
+    try:
+        while True:
+            if frames and subscribed is None and startup.is_ready:
+                subscribed = get_pipeline()
+                subscribed.subscribe()
+            cursor, messages = landmark_stream.wait(cursor, frames, timeout=15.0)
+            if not messages:
+                # Comment line; keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+            for message in messages:
+                yield sse_message(message)
+    finally:
+        if subscribed is not None:
+            subscribed.unsubscribe()
+
+@app.route('/landmarks')
+def landmarks():
+    """Push per-frame landmarks, gesture events and status updates as Server-Sent Events.
+
+    ?frames=0 leaves out the per-frame messages (events and status only).
+    """
+    frames = request.args.get('frames', '1') != '0'
+    return Response(generate_landmark_events(frames), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/set_language', methods=['POST'])
 def set_language():
     """Set the language for speech output"""
@@ -162,6 +242,7 @@ def set_language():
         if language in ['english', 'hindi']:
             tts.set_language(language)
             current_language = language
+            publish_status()
             return jsonify({'success': True, 'language': language})
         else:
             return jsonify({'success': False, 'error': 'Invalid language'})
@@ -178,9 +259,16 @@ def get_status():
         'language': current_language,
         'last_gesture': last_gesture,
         'available_languages': tts.get_available_languages() if tts else [],
-        'camera_status': camera_status
+        'camera_status': camera_status,
+        'ready': startup.is_ready,
+        'startup': startup.get_status()
     })
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics: per-stage latency histograms, frame and queue counters"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     success = initialize_components()
     if success: